@@ -0,0 +1,115 @@
+"""
+bench_cache_set.py
+
+Benchmark `Cache.set` latency of the storage backends at growing cache sizes.
+
+Compares:
+- "json": `JsonFileStore` with "strict" durability, which rewrites the whole
+  JSON file on every set.
+- "json-wb": `JsonFileStore` with write-behind ("fsync" durability): sets only
+  mark the store dirty and a background thread rewrites the file.
+- "log": `LogStructuredStore`, which appends one record per set.
+
+Each store is pre-filled with N entries, then a number of fresh keys are
+inserted one by one and the per-set latency is reported.
+
+Usage
+-----
+    python -m benchmarks.bench_cache_set
+    python -m benchmarks.bench_cache_set --sizes 10000 100000 --sets 50
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+
+from src.cache.json_store import JsonFileStore
+from src.cache.log_store import LogStructuredStore
+
+
+def _entry(i: int) -> dict:
+    return {
+        "zodiac": "Leo",
+        "insight": f"User{i}, Your charisma draws people closer today.",
+        "language": "English",
+    }
+
+
+def _prefill_json(path: str, size: int, durability: str = "strict"):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {f"User{i}_1995-08-20": _entry(i) for i in range(size)},
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+    return JsonFileStore(path, durability=durability)
+
+
+def _prefill_log(path: str, size: int):
+    with open(path, "wb") as f:
+        for i in range(size):
+            f.write(LogStructuredStore._encode(f"User{i}_1995-08-20", _entry(i)))
+    return LogStructuredStore(path, compaction_interval=0)
+
+
+def _time_sets(store, start: int, count: int) -> list[float]:
+    latencies = []
+    for i in range(start, start + count):
+        t0 = time.perf_counter()
+        store.put(f"User{i}_1995-08-20", _entry(i))
+        latencies.append(time.perf_counter() - t0)
+    return latencies
+
+
+def _report(backend: str, size: int, latencies: list[float]):
+    latencies = sorted(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(
+        f"{backend:>7} | {size:>9,} entries | {len(latencies):>5} sets | "
+        f"median {statistics.median(latencies) * 1e3:10.3f} ms | "
+        f"p99 {p99 * 1e3:10.3f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--sets", type=int, default=1000, help="timed sets (log)")
+    parser.add_argument(
+        "--json-sets",
+        type=int,
+        default=5,
+        help="timed sets (json); each one rewrites the whole file",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            json_path = os.path.join(tmp, f"cache_{size}.json")
+            store = _prefill_json(json_path, size)
+            _report("json", size, _time_sets(store, size, args.json_sets))
+            store.close()
+            os.remove(json_path)
+
+            store = _prefill_json(json_path, size, durability="fsync")
+            _report("json-wb", size, _time_sets(store, size, args.sets))
+            t0 = time.perf_counter()
+            store.close()
+            print(f"{'':>7} final flush {(time.perf_counter() - t0) * 1e3:10.3f} ms")
+            os.remove(json_path)
+
+            log_path = os.path.join(tmp, f"cache_{size}.log")
+            store = _prefill_log(log_path, size)
+            _report("log", size, _time_sets(store, size, args.sets))
+            store.close()
+            os.remove(log_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+bench_gazetteer.py
+
+Benchmark `Gazetteer` lookups per second and the resident memory it costs.
+
+Measures, on the bundled index or on a synthetic one of N places:
+- resident memory before and after opening the index,
+- uncached lookups/sec for exact, prefix and fuzzy queries,
+- cached lookups/sec (repeated queries served by the LRU cache),
+- resident memory after the lookups (pages of the index touched so far).
+
+Usage
+-----
+    python -m benchmarks.bench_gazetteer
+    python -m benchmarks.bench_gazetteer --synthetic 1000000 --lookups 50000
+"""
+
+import argparse
+import os
+import random
+import string
+import tempfile
+import time
+
+from src.geo.build_gazetteer import DEFAULT_PATH, build_index
+from src.geo.gazetteer import Gazetteer
+
+
+def _rss_mib() -> float:
+    try:
+        with open("/proc/self/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource  # peak RSS; Linux reports KiB, macOS bytes
+
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _synthetic_places(n: int, rng: random.Random):
+    timezones = ["Asia/Kolkata", "Europe/London", "America/New_York", "UTC"]
+    for i in range(n):
+        name = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 12)))
+        yield {
+            "name": f"{name.capitalize()} {i}",
+            "alternates": [],
+            "country_code": "XX",
+            "country_name": "Synthetia",
+            "admin1": f"Region {i % 50}",
+            "latitude": rng.uniform(-90, 90),
+            "longitude": rng.uniform(-180, 180),
+            "population": rng.randint(0, 1_000_000),
+            "timezone": rng.choice(timezones),
+        }
+
+
+def _typo(name: str, rng: random.Random) -> str:
+    i = rng.randrange(1, len(name) - 1)
+    return name[:i] + name[i + 1] + name[i] + name[i + 2 :]
+
+
+def _time_lookups(lookup, queries: list[str], count: int) -> float:
+    t0 = time.perf_counter()
+    for i in range(count):
+        lookup(queries[i % len(queries)])
+    return count / (time.perf_counter() - t0)
+
+
+def _run(path: str, lookups: int, rng: random.Random):
+    rss_before = _rss_mib()
+    t0 = time.perf_counter()
+    gazetteer = Gazetteer(path)
+    open_ms = (time.perf_counter() - t0) * 1e3
+    rss_open = _rss_mib()
+
+    names = [gazetteer._place(rng.randrange(len(gazetteer))).name for _ in range(500)]
+    long_names = [name for name in names if len(name) > 4]
+    qualifiers = ["India", "IN", "Rajasthan"]
+    queries = {
+        "exact": names,
+        "exact+country": [f"{name}, {rng.choice(qualifiers)}" for name in names],
+        "prefix": [name[: max(3, len(name) - 2)] for name in names],
+        "fuzzy": [_typo(name, rng) for name in long_names],
+    }
+
+    print(f"index: {path} ({os.path.getsize(path) / 1024:,.0f} KiB)")
+    print(f"places: {len(gazetteer):,} | open: {open_ms:.2f} ms")
+    for kind, qs in queries.items():
+        rate = _time_lookups(gazetteer._lookup, qs, lookups)
+        print(f"{kind:>14} | uncached | {rate:12,.0f} lookups/s")
+    rate = _time_lookups(gazetteer.lookup, names, lookups)
+    print(f"{'exact':>14} |   cached | {rate:12,.0f} lookups/s")
+    print(
+        f"RSS: {rss_before:.1f} MiB before open, {rss_open:.1f} MiB after open, "
+        f"{_rss_mib():.1f} MiB after lookups"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--index", default=DEFAULT_PATH)
+    parser.add_argument(
+        "--synthetic", type=int, help="build and benchmark an index of N places"
+    )
+    parser.add_argument("--lookups", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    if not args.synthetic:
+        _run(args.index, args.lookups, rng)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.gaz")
+        build_index(_synthetic_places(args.synthetic, rng), path)
+        _run(path, args.lookups, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""
+bench_metrics.py
+
+Benchmark the overhead of the request metrics.
+
+Measures:
+- the cost of one `Counter.inc`, `Histogram.observe` and timed block, through
+  label lookup and on a bound series, with timing enabled and disabled,
+- the time to render a registry with many series,
+- cached `/predict` requests per second through the Flask test client with
+  `Config.METRICS["ENABLED"]` on and off (dummy mode, no network).
+
+Usage
+-----
+    python -m benchmarks.bench_metrics
+    python -m benchmarks.bench_metrics --ops 1000000 --requests 20000
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from config.config import Config
+from src.utils.metrics import Metrics
+
+
+def _ns_per_op(fn, ops: int) -> float:
+    t0 = time.perf_counter()
+    for _ in range(ops):
+        fn()
+    return (time.perf_counter() - t0) / ops * 1e9
+
+
+def bench_primitives(ops: int):
+    for enabled in (True, False):
+        metrics = Metrics("bench", enabled=enabled)
+        counter = metrics.counter("events_total", "Events.", ("kind",))
+        histogram = metrics.histogram("stage_seconds", "Stages.", ("stage",))
+
+        series = counter.labels(kind="a")
+        stage = histogram.labels(stage="parse")
+
+        def timed():
+            with metrics.timer(stage):
+                pass
+
+        print(f"timing {'enabled' if enabled else 'disabled'}:")
+        results = {
+            "counter.inc (labels)": lambda: counter.inc(kind="a"),
+            "counter.inc (bound)": series.inc,
+            "histogram.observe (labels)": lambda: histogram.observe(0.003, stage="p"),
+            "histogram.observe (bound)": lambda: stage.observe(0.003),
+            "timed block (bound)": timed,
+        }
+        for name, fn in results.items():
+            print(f"  {name:28} {_ns_per_op(fn, ops):8.0f} ns")
+
+
+def bench_render(series: int):
+    metrics = Metrics("bench")
+    histogram = metrics.histogram("stage_seconds", "Stages.", ("stage",))
+    counter = metrics.counter("events_total", "Events.", ("kind",))
+    for i in range(series):
+        histogram.observe(i / series, stage=f"s{i}")
+        counter.inc(kind=f"k{i}")
+    t0 = time.perf_counter()
+    text = metrics.render()
+    elapsed = (time.perf_counter() - t0) * 1e3
+    print(f"render {2 * series} series: {elapsed:8.2f} ms, {len(text) / 1024:.0f} KiB")
+
+
+def _app(enabled: bool):
+    tmp = tempfile.mkdtemp()
+    Config.USE_DUMMY_LLM = True
+    Config.USE_DUMMY_TRANSLATION = True
+    Config.CACHE_BACKEND = "json"
+    Config.CACHE_FILE = os.path.join(tmp, "cache.json")
+    Config.TRANSLATION_CACHE["FILE"] = os.path.join(tmp, "translations.log")
+    Config.PROMPT_CACHE["FILE"] = os.path.join(tmp, "responses.log")
+    Config.SIGN_TEMPLATES["FILE"] = os.path.join(tmp, "sign_templates.json")
+    Config.METRICS["ENABLED"] = enabled
+    Metrics._shared = None
+
+    from src.interface.ui_main import UIStarter
+
+    return UIStarter().ui_interface.app.test_client()
+
+
+def bench_predict(requests: int):
+    payload = {
+        "name": "Ritika",
+        "birth_date": "1995-08-20",
+        "birth_time": "14:30",
+        "birth_place": "Jaipur, India",
+        "language": "Hindi",
+    }
+    for enabled in (False, True):
+        client = _app(enabled)
+        client.post("/predict", json=payload)  # warm the cache
+        t0 = time.perf_counter()
+        for _ in range(requests):
+            client.post("/predict", json=payload)
+        rate = requests / (time.perf_counter() - t0)
+        state = "on " if enabled else "off"
+        print(f"cached /predict, metrics {state}: {rate:8.0f} req/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--ops", type=int, default=300_000)
+    parser.add_argument("--series", type=int, default=1000)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    bench_primitives(args.ops)
+    bench_render(args.series)
+    bench_predict(args.requests)
+
+
+if __name__ == "__main__":
+    main()
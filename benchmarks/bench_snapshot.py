@@ -0,0 +1,131 @@
+"""
+bench_snapshot.py
+
+Benchmark cache startup time and resident memory: JSON file vs snapshot.
+
+For each cache size N, a synthetic ``cache.json`` is written and converted to
+a snapshot (compressed and uncompressed). Every loader then runs in a fresh
+interpreter, which reports:
+- the time to open the cache (``JsonFileStore`` parses the whole file,
+  ``Snapshot`` maps it),
+- the resident memory added by opening it,
+- the mean latency of random ``get`` calls, and the resident memory after
+  them (pages of the snapshot touched so far).
+
+Usage
+-----
+    python -m benchmarks.bench_snapshot
+    python -m benchmarks.bench_snapshot --sizes 100000 1000000 --gets 20000
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.cache.snapshot_store import convert_json
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_PROBE = """
+import json, os, random, sys, time
+sys.path.insert(0, {root!r})
+
+def rss_mib():
+    with open("/proc/self/status", "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+loader, path, size, gets = {loader!r}, {path!r}, {size}, {gets}
+if loader == "json":
+    from src.cache.json_store import JsonFileStore as Store
+else:
+    from src.cache.snapshot_store import Snapshot as Store
+before = rss_mib()
+started = time.perf_counter()
+store = Store(path)
+opened = time.perf_counter() - started
+after_open = rss_mib()
+
+rng = random.Random(0)
+keys = [f"User{{rng.randrange(size)}}_1995-08-20" for _ in range(gets)]
+started = time.perf_counter()
+for key in keys:
+    assert store.get(key) is not None
+per_get = (time.perf_counter() - started) / max(gets, 1)
+print(json.dumps({{
+    "open_ms": opened * 1e3,
+    "open_rss": after_open - before,
+    "get_us": per_get * 1e6,
+    "get_rss": rss_mib() - before,
+}}))
+"""
+
+
+def _entry(i: int, expires_at: float) -> dict:
+    return {
+        "zodiac": "Leo",
+        "insight": f"User{i}, Your charisma draws people closer today.",
+        "language": "English",
+        "expires_at": expires_at,
+    }
+
+
+def _write_json(path: str, size: int):
+    expires_at = time.time() + 86_400
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {f"User{i}_1995-08-20": _entry(i, expires_at) for i in range(size)},
+            f,
+            ensure_ascii=False,
+            indent=2,
+        )
+
+
+def _probe(loader: str, path: str, size: int, gets: int) -> dict:
+    code = _PROBE.format(root=ROOT, loader=loader, path=path, size=size, gets=gets)
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--gets", type=int, default=10_000)
+    args = parser.parse_args()
+
+    print(
+        f"{'loader':>16} | {'entries':>9} | {'file MiB':>8} | {'open ms':>9} | "
+        f"{'open RSS MiB':>12} | {'get us':>7} | {'RSS after gets MiB':>18}"
+    )
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            json_path = os.path.join(tmp, f"cache_{size}.json")
+            _write_json(json_path, size)
+            candidates = [("json", "json", json_path)]
+            for compress in (True, False):
+                label = "snapshot" if compress else "snapshot (raw)"
+                path = os.path.join(tmp, f"cache_{size}_{int(compress)}.snap")
+                convert_json(json_path, path, compress=compress)
+                candidates.append((label, "snapshot", path))
+
+            for label, loader, path in candidates:
+                result = _probe(loader, path, size, args.gets)
+                print(
+                    f"{label:>16} | {size:>9,} | "
+                    f"{os.path.getsize(path) / 2**20:>8.1f} | "
+                    f"{result['open_ms']:>9.1f} | {result['open_rss']:>12.1f} | "
+                    f"{result['get_us']:>7.1f} | {result['get_rss']:>18.1f}"
+                )
+                os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+bench_startup.py
+
+Benchmark cold start of the application and guard against regressions.
+
+Measures, in fresh interpreter processes started from the repository root:
+- import time of the application (`python -X importtime`), with the slowest
+  top-level imports,
+- process-to-first-response: time from spawning a server process until its
+  first `/predict` request is answered,
+- which heavy optional modules (torch, the Gemini SDK, googletrans) a dummy-mode
+  boot imports; none of them should be needed before first use.
+
+The app boots in dummy mode (`USE_DUMMY_LLM`, `USE_DUMMY_TRANSLATION`) with its
+cache files in a temporary directory, so no API key or network is needed.
+
+Exits with status 1 if a budget given on the command line is exceeded or a
+heavy module is imported at boot, so it can run as a CI check.
+
+Usage
+-----
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --runs 5 --max-import-ms 500 \\
+        --max-first-response-ms 1500
+"""
+
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ["torch", "google.genai", "googletrans", "httpx"]
+
+# Builds the app the way `app.py` does, in dummy mode with throwaway cache files.
+_BOOT = """
+import os, sys, tempfile
+from config.config import Config
+tmp = tempfile.mkdtemp()
+Config.USE_DUMMY_LLM = True
+Config.USE_DUMMY_TRANSLATION = True
+Config.CACHE_BACKEND = "json"
+Config.CACHE_FILE = os.path.join(tmp, "cache.json")
+Config.TRANSLATION_CACHE["FILE"] = os.path.join(tmp, "translations.log")
+Config.PROMPT_CACHE["FILE"] = os.path.join(tmp, "responses.log")
+Config.SIGN_TEMPLATES["FILE"] = os.path.join(tmp, "sign_templates.json")
+from src.interface.ui_main import UIStarter
+starter = UIStarter()
+"""
+
+_SERVE = """
+import logging
+logging.getLogger("werkzeug").setLevel(logging.ERROR)
+starter.ui_interface.app.run(host="127.0.0.1", port={port}, debug=False)
+"""
+
+_HEAVY = """
+import json
+print(json.dumps(sorted(m for m in {modules!r} if m in sys.modules)))
+"""
+
+_PAYLOAD = {
+    "name": "Ritika",
+    "birth_date": "1995-08-20",
+    "birth_time": "14:30",
+    "birth_place": "Jaipur, India",
+    "language": "Hindi",
+}
+
+
+def _python(code: str, *flags: str, **kwargs):
+    return subprocess.run(
+        [sys.executable, *flags, "-c", code],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+        **kwargs,
+    )
+
+
+def measure_imports(top: int) -> tuple[float, list[tuple[float, str]]]:
+    """
+    Returns
+    -------
+    tuple[float, list[tuple[float, str]]]
+        Total import time of the app in ms, and the ``top`` slowest top-level
+        imports as (cumulative ms, module) pairs.
+    """
+
+    stderr = _python(_BOOT, "-X", "importtime").stderr
+    top_level = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        if name.startswith("  "):
+            continue  # nested import, already counted by its parent
+        top_level.append((int(cumulative) / 1e3, name.strip()))
+    total = sum(ms for ms, _ in top_level)
+    return total, sorted(top_level, reverse=True)[:top]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def measure_first_response(timeout: float = 60.0) -> float:
+    """
+    Returns
+    -------
+    float
+        Milliseconds from spawning a server process to its first answered
+        `/predict` request.
+    """
+
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}/predict"
+    body = json.dumps(_PAYLOAD).encode("utf-8")
+
+    t0 = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-c", _BOOT + _SERVE.format(port=port)],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - t0 < timeout:
+            if server.poll() is not None:
+                raise RuntimeError("server process exited during startup")
+            request = urllib.request.Request(
+                url, data=body, headers={"Content-Type": "application/json"}
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=timeout) as response:
+                    response.read()
+                return (time.perf_counter() - t0) * 1e3
+            except OSError:
+                time.sleep(0.005)
+        raise TimeoutError(f"no response within {timeout} s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def heavy_modules_at_boot() -> list[str]:
+    """
+    Returns
+    -------
+    list[str]
+        Heavy modules from `HEAVY_MODULES` imported by a dummy-mode boot.
+    """
+
+    stdout = _python(_BOOT + _HEAVY.format(modules=HEAVY_MODULES)).stdout
+    return json.loads(stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=8, help="slowest imports shown")
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-first-response-ms", type=float)
+    args = parser.parse_args()
+
+    failures = []
+
+    imports = [measure_imports(args.top) for _ in range(args.runs)]
+    import_ms = statistics.median(total for total, _ in imports)
+    print(f"import time (median of {args.runs}): {import_ms:8.1f} ms")
+    for ms, module in imports[-1][1]:
+        print(f"    {ms:8.1f} ms  {module}")
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        failures.append(f"import time {import_ms:.1f} ms > {args.max_import_ms} ms")
+
+    first = statistics.median(measure_first_response() for _ in range(args.runs))
+    print(f"process to first response (median of {args.runs}): {first:8.1f} ms")
+    if args.max_first_response_ms is not None and first > args.max_first_response_ms:
+        failures.append(
+            f"first response {first:.1f} ms > {args.max_first_response_ms} ms"
+        )
+
+    heavy = heavy_modules_at_boot()
+    print(f"heavy modules imported at boot: {', '.join(heavy) or 'none'}")
+    if heavy:
+        failures.append(f"heavy modules imported at boot: {', '.join(heavy)}")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
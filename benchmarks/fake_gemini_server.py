@@ -0,0 +1,453 @@
+"""
+fake_gemini_server.py
+
+Local stand-in for the Gemini generate-content API, for offline benchmarks.
+
+`DummyPredictor` answers instantly, which hides the real bottleneck of the
+service: slow and variable LLM latency. This server speaks the wire protocol
+of the Gemini API used by `google-genai`
+
+- ``POST /v1beta/models/<model>:generateContent``
+- ``POST /v1beta/models/<model>:streamGenerateContent?alt=sse``
+
+so that `Google_LLM` / `AsyncGoogle_LLM` can be pointed at it with
+`Config.GEMINI_BASE_URL` (environment variable ``GEMINI_BASE_URL``) and the
+real client code path (HTTP, concurrency limits, timeouts, streaming) is
+exercised with no network.
+
+Behaviour
+---------
+Latency
+    Time to first token is drawn from ``--latency``, then every further token
+    takes ``--token-ms``. Distributions:
+    ``fixed:MS``, ``uniform:LO,HI``, ``normal:MEAN,SD``, ``lognormal:MEDIAN,SIGMA``
+    (long-tailed). ``--tail-rate P --tail-ms MS`` adds MS to a fraction P of the
+    requests, e.g. to reproduce rare multi-second stalls.
+Errors
+    ``--error-rate P`` answers a fraction P of the requests with one of the
+    ``--error-codes`` (429, 500, 503 by default) in the Gemini error format,
+    after the drawn latency.
+Streaming
+    Streamed replies send one SSE event per token.
+Replies
+    Synthetic replies are ``--tokens`` words long and deterministic for a
+    given prompt.
+Record / replay
+    ``--record FILE --upstream URL`` proxies every request to the real API
+    (with the caller's API key), returns its response and appends it to FILE.
+    ``--replay FILE`` serves the recorded responses for identical requests,
+    with the recorded timing (``--replay-timing recorded``) or the configured
+    latency model (``--replay-timing model``); unrecorded requests get a
+    synthetic reply, or a 404 with ``--replay-strict``.
+
+Usage
+-----
+    python -m benchmarks.fake_gemini_server --port 8090 \\
+        --latency lognormal:800,0.5 --token-ms 15 --error-rate 0.01
+    GEMINI_BASE_URL=http://127.0.0.1:8090 GEMINI_API_KEY=fake python app.py
+
+    python -m benchmarks.fake_gemini_server --record calls.jsonl \\
+        --upstream https://generativelanguage.googleapis.com
+    python -m benchmarks.fake_gemini_server --replay calls.jsonl
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_PATH = re.compile(r"^/(?P<version>v1\w*)/models/(?P<model>[^:/]+):(?P<method>\w+)")
+
+_WORDS = (
+    "today the stars favour patience and honest words your energy draws people "
+    "closer trust your instincts at work a small risk brings a pleasant surprise "
+    "rest well and keep your plans flexible as the moon shifts"
+).split()
+
+_STATUS = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+
+
+class Latency:
+    """
+    Latency model: a base distribution plus an optional long tail.
+
+    Attributes
+    ----------
+    spec : str
+        Distribution spec, e.g. ``"lognormal:800,0.5"`` (milliseconds).
+    tail_rate : float
+        Fraction of requests receiving the extra ``tail_ms``.
+    tail_ms : float
+        Extra delay of tail requests in milliseconds.
+    """
+
+    def __init__(self, spec: str, tail_rate: float = 0.0, tail_ms: float = 0.0):
+        kind, _, params = spec.partition(":")
+        self.spec = spec
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",") if p]
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2}
+        if expected.get(kind) != len(self.params):
+            raise ValueError(f"Invalid latency spec: {spec!r}")
+        self.tail_rate = tail_rate
+        self.tail_ms = tail_ms
+
+    def sample_ms(self, rng: random.Random) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            ms = p[0]
+        elif self.kind == "uniform":
+            ms = rng.uniform(p[0], p[1])
+        elif self.kind == "normal":
+            ms = rng.gauss(p[0], p[1])
+        else:
+            ms = rng.lognormvariate(0.0, p[1]) * p[0]
+        if self.tail_rate and rng.random() < self.tail_rate:
+            ms += self.tail_ms
+        return max(ms, 0.0)
+
+
+class Recording:
+    """
+    Thread-safe JSONL store of recorded upstream responses.
+
+    Each line is ``{"key", "status", "stream", "chunks", "delays_ms"}`` where
+    ``chunks`` are the response bodies (one per SSE event when streaming) and
+    ``delays_ms`` the time before each of them.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def key(model: str, method: str, body: bytes) -> str:
+        canonical = json.dumps(json.loads(body or b"{}"), sort_keys=True)
+        return hashlib.sha256(f"{model}:{method}:{canonical}".encode()).hexdigest()
+
+    def get(self, key: str):
+        return self._entries.get(key)
+
+    def add(self, entry: dict):
+        with self._lock:
+            self._entries[entry["key"]] = entry
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FakeGemini:
+    """
+    Request handling policy shared by all handler threads.
+    """
+
+    def __init__(self, args):
+        self.latency = Latency(args.latency, args.tail_rate, args.tail_ms)
+        self.token_ms = args.token_ms
+        self.tokens = args.tokens
+        self.error_rate = args.error_rate
+        self.error_codes = args.error_codes
+        self.upstream = args.upstream.rstrip("/") if args.upstream else None
+        path = args.record or args.replay
+        self.recording = Recording(path) if path else None
+        self.replay = bool(args.replay)
+        self.replay_timing = args.replay_timing
+        self.replay_strict = args.replay_strict
+        self._rng = random.Random(args.seed)
+        self._rng_lock = threading.Lock()
+        self.counters = {"requests": 0, "errors": 0, "replayed": 0, "recorded": 0}
+
+    def draw(self):
+        """
+        Returns
+        -------
+        tuple[float, int | None]
+            Time to first token in seconds, and an injected error code or None.
+        """
+
+        with self._rng_lock:
+            self.counters["requests"] += 1
+            ttft = self.latency.sample_ms(self._rng) / 1e3
+            error = None
+            if self.error_rate and self._rng.random() < self.error_rate:
+                error = self._rng.choice(self.error_codes)
+                self.counters["errors"] += 1
+            return ttft, error
+
+    def reply_tokens(self, body: bytes) -> list[str]:
+        """
+        Deterministic synthetic reply for a request body.
+        """
+
+        request = json.loads(body or b"{}")
+        prompt = "".join(
+            part.get("text", "")
+            for content in request.get("contents", [])
+            for part in content.get("parts", [])
+        )
+        seed = int.from_bytes(hashlib.sha256(prompt.encode()).digest()[:8], "big")
+        rng = random.Random(seed)
+        words = [rng.choice(_WORDS) for _ in range(self.tokens)]
+        words[0] = words[0].capitalize()
+        words[-1] += "."
+        return [word + " " for word in words[:-1]] + words[-1:]
+
+
+def _response(text: str, model: str, finished: bool, prompt_tokens: int = 0) -> dict:
+    candidate = {"content": {"role": "model", "parts": [{"text": text}]}, "index": 0}
+    if finished:
+        candidate["finishReason"] = "STOP"
+    output_tokens = len(text.split())
+    return {
+        "candidates": [candidate],
+        "usageMetadata": {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens,
+        },
+        "modelVersion": model,
+    }
+
+
+def make_handler(fake: FakeGemini):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        # --------------------------------------------------------------
+        # Helpers
+        # --------------------------------------------------------------
+
+        def _send_json(self, status: int, payload: dict):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json; charset=UTF-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _send_error(self, code: int):
+            error = {
+                "code": code,
+                "message": "injected error",
+                "status": _STATUS.get(code, "UNKNOWN"),
+            }
+            self._send_json(code, {"error": error})
+
+        def _start_stream(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+        def _send_chunk(self, data: bytes):
+            self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+            self.wfile.flush()
+
+        def _send_event(self, payload: dict):
+            data = json.dumps(payload).encode("utf-8")
+            self._send_chunk(b"data: " + data + b"\r\n\r\n")
+
+        def _end_stream(self):
+            self.wfile.write(b"0\r\n\r\n")
+            self.wfile.flush()
+
+        # --------------------------------------------------------------
+        # Routes
+        # --------------------------------------------------------------
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._send_json(200, fake.counters)
+            else:
+                self._send_json(404, {"error": {"code": 404, "status": "NOT_FOUND"}})
+
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            match = _PATH.match(self.path)
+            methods = ("generateContent", "streamGenerateContent")
+            if not match or match["method"] not in methods:
+                self._send_json(404, {"error": {"code": 404, "status": "NOT_FOUND"}})
+                return
+            model, stream = match["model"], match["method"] == "streamGenerateContent"
+
+            if fake.recording is not None:
+                key = Recording.key(model, match["method"], body)
+                if fake.replay:
+                    entry = fake.recording.get(key)
+                    if entry is not None:
+                        self._replay(entry)
+                        return
+                    if fake.replay_strict:
+                        self._send_json(
+                            404, {"error": {"code": 404, "message": "not recorded"}}
+                        )
+                        return
+                elif fake.upstream:
+                    self._proxy(key, stream, body)
+                    return
+
+            ttft, error = fake.draw()
+            time.sleep(ttft)
+            if error is not None:
+                self._send_error(error)
+                return
+
+            tokens = fake.reply_tokens(body)
+            if not stream:
+                time.sleep(fake.token_ms * (len(tokens) - 1) / 1e3)
+                self._send_json(200, _response("".join(tokens), model, True))
+                return
+
+            self._start_stream()
+            for i, token in enumerate(tokens):
+                if i:
+                    time.sleep(fake.token_ms / 1e3)
+                self._send_event(_response(token, model, i == len(tokens) - 1))
+            self._end_stream()
+
+        def _replay(self, entry: dict):
+            with fake._rng_lock:
+                fake.counters["requests"] += 1
+                fake.counters["replayed"] += 1
+            if fake.replay_timing == "recorded":
+                delays = [ms / 1e3 for ms in entry["delays_ms"]]
+            else:
+                ttft, _ = fake.draw()
+                delays = [ttft] + [fake.token_ms / 1e3] * (len(entry["chunks"]) - 1)
+
+            if not entry["stream"] or entry["status"] != 200:
+                time.sleep(sum(delays))
+                self._send_json(entry["status"], entry["chunks"][0])
+                return
+            self._start_stream()
+            for delay, chunk in zip(delays, entry["chunks"]):
+                time.sleep(delay)
+                self._send_event(chunk)
+            self._end_stream()
+
+        def _proxy(self, key: str, stream: bool, body: bytes):
+            request = urllib.request.Request(
+                fake.upstream + self.path,
+                data=body,
+                method="POST",
+                headers={
+                    "Content-Type": "application/json",
+                    "x-goog-api-key": self.headers.get("x-goog-api-key", ""),
+                },
+            )
+            chunks, delays_ms = [], []
+            last = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=300) as response:
+                    status = response.status
+                    if stream:
+                        self._start_stream()
+                        for line in response:
+                            if not line.startswith(b"data: "):
+                                continue
+                            now = time.perf_counter()
+                            delays_ms.append((now - last) * 1e3)
+                            last = now
+                            chunk = json.loads(line[len(b"data: ") :])
+                            chunks.append(chunk)
+                            self._send_event(chunk)
+                        self._end_stream()
+                    else:
+                        chunks.append(json.loads(response.read()))
+                        delays_ms.append((time.perf_counter() - last) * 1e3)
+                        self._send_json(status, chunks[0])
+            except urllib.error.HTTPError as e:
+                status = e.code
+                chunks, delays_ms = [json.loads(e.read() or b"{}")], [
+                    (time.perf_counter() - last) * 1e3
+                ]
+                self._send_json(status, chunks[0])
+
+            fake.recording.add(
+                {
+                    "key": key,
+                    "status": status,
+                    "stream": stream and status == 200,
+                    "chunks": chunks,
+                    "delays_ms": delays_ms,
+                }
+            )
+            with fake._rng_lock:
+                fake.counters["requests"] += 1
+                fake.counters["recorded"] += 1
+
+    return Handler
+
+
+def serve(args) -> ThreadingHTTPServer:
+    """
+    Create the server (not yet serving) for parsed command-line arguments.
+    """
+
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(FakeGemini(args)))
+    server.daemon_threads = True
+    return server
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", default="lognormal:800,0.5", help="TTFT, ms")
+    parser.add_argument("--tail-rate", type=float, default=0.0)
+    parser.add_argument("--tail-ms", type=float, default=5000.0)
+    parser.add_argument("--token-ms", type=float, default=10.0)
+    parser.add_argument("--tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--error-codes", type=int, nargs="+", default=[429, 500, 503]
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--record", help="JSONL file to append upstream responses to")
+    mode.add_argument("--replay", help="JSONL file of recorded responses")
+    parser.add_argument("--upstream", help="real API base URL, for --record")
+    parser.add_argument(
+        "--replay-timing", choices=["recorded", "model"], default="recorded"
+    )
+    parser.add_argument("--replay-strict", action="store_true")
+    return parser
+
+
+def main():
+    args = build_parser().parse_args()
+    if args.record and not args.upstream:
+        raise SystemExit("--record needs --upstream")
+    server = serve(args)
+    host, port = server.server_address[:2]
+    print(f"Fake Gemini API on http://{host}:{port} (latency {args.latency})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,427 @@
+"""
+load_test.py
+
+Load generator replaying a corpus of `/predict` payloads against the server.
+
+Sends requests either at a fixed rate (``--rps``, open loop: latency is
+measured from each request's scheduled send time, so a slow server cannot
+hide its queueing delay) or from a fixed number of concurrent clients
+(``--concurrency``, closed loop).
+
+The cache hit/miss mix is controlled with ``--hit-ratio``: the corpus
+payloads are sent once before the measurement to warm the cache, then each
+request either replays a corpus payload (a hit) or a copy with a never-seen
+name (a miss) with the requested probability.
+
+With ``--spawn``, the server is started locally in dummy-LLM and
+dummy-translator mode with throwaway cache files, so the test runs on a
+laptop with no network. Add ``--gemini-url`` to use the real LLM client
+against a local `fake_gemini_server` instead of the instant dummy predictor.
+Otherwise ``--url`` points at a running server (start it with
+``USE_DUMMY_LLM=1 USE_DUMMY_TRANSLATION=1 python app.py`` to stay offline).
+
+Reports p50/p95/p99 latency, throughput, error rate and cache hit ratio as a
+text summary, and as JSON with ``--json``.
+
+Corpus format: one `/predict` JSON payload per line. Without ``--corpus``, a
+synthetic corpus of ``--corpus-size`` users is generated.
+
+Usage
+-----
+    python -m benchmarks.load_test --spawn --rps 200 --duration 20
+    python -m benchmarks.load_test --spawn --backend sqlite --server production \\
+        --workers 4 --concurrency 32 --hit-ratio 0.5 --json result.json
+    python -m benchmarks.load_test --url http://127.0.0.1:8000 \\
+        --corpus payloads.jsonl --concurrency 16 --requests 5000
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_SERVER = """
+import logging, os, sys, tempfile
+from config.config import Config
+tmp = tempfile.mkdtemp()
+Config.USE_DUMMY_LLM = {gemini_url!r} is None
+Config.USE_DUMMY_TRANSLATION = True
+Config.GEMINI_BASE_URL = {gemini_url!r}
+Config.LLM_ASYNC["ENABLED"] = {llm_async!r}
+Config.LLM_QUOTA["ENABLED"] = False  # the stand-in server has no quota
+Config.CACHE_BACKEND = {backend!r}
+Config.CACHE_FILE = os.path.join(tmp, "cache.json")
+Config.CACHE_LOG_FILE = os.path.join(tmp, "cache.log")
+Config.CACHE_SQLITE_FILE = os.path.join(tmp, "cache.sqlite3")
+Config.TRANSLATION_CACHE["FILE"] = os.path.join(tmp, "translations.log")
+Config.PROMPT_CACHE["FILE"] = os.path.join(tmp, "responses.log")
+Config.SIGN_TEMPLATES["FILE"] = os.path.join(tmp, "sign_templates.json")
+Config.SERVER.update(
+    HOST="127.0.0.1", PORT={port}, DEBUG=False,
+    MODE={mode!r}, WORKERS={workers}, THREADS={threads},
+)
+logging.getLogger("werkzeug").setLevel(logging.ERROR)
+from src.interface.ui_main import UIStarter
+starter = UIStarter()
+if Config.SERVER["MODE"] == "production":
+    from src.interface.server import ProductionServer
+    options = ProductionServer.options_from_config()
+    options["accesslog"] = None
+    ProductionServer(starter.ui_interface.app, options).run()
+else:
+    starter.ui_interface.app.run(host="127.0.0.1", port={port}, debug=False)
+"""
+
+_NAMES = ["Ritika", "Geeta", "Arjun", "Meera", "Kabir", "Ananya", "Rohan", "Isha"]
+_PLACES = ["Jaipur, India", "Mumbai", "Delhi, India", "Pune", "Chennai", "London"]
+_LANGUAGES = ["English", "Hindi", "Tamil", "Bengali"]
+
+
+def synthetic_corpus(size: int, rng: random.Random) -> list[dict]:
+    """
+    Returns
+    -------
+    list[dict]
+        ``size`` `/predict` payloads of distinct users.
+    """
+
+    return [
+        {
+            "name": f"{rng.choice(_NAMES)}{i}",
+            "birth_date": f"{rng.randint(1950, 2010)}-{rng.randint(1, 12):02d}-"
+            f"{rng.randint(1, 28):02d}",
+            "birth_time": f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            "birth_place": rng.choice(_PLACES),
+            "language": rng.choice(_LANGUAGES),
+        }
+        for i in range(size)
+    ]
+
+
+def load_corpus(path: str) -> list[dict]:
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+# ----------------------------------------------------------------------
+# Server
+# ----------------------------------------------------------------------
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def spawn_server(args) -> tuple[subprocess.Popen, str]:
+    """
+    Start a dummy-mode server and wait until it accepts connections.
+
+    Returns
+    -------
+    tuple[subprocess.Popen, str]
+        The server process and its base URL.
+    """
+
+    port = _free_port()
+    code = _SERVER.format(
+        backend=args.backend,
+        port=port,
+        mode=args.server,
+        workers=args.workers,
+        threads=args.threads,
+        gemini_url=args.gemini_url,
+        llm_async=args.llm_async,
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-c", code],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError("server process exited during startup")
+        try:
+            socket.create_connection(("127.0.0.1", port), timeout=0.5).close()
+            return server, f"http://127.0.0.1:{port}"
+        except OSError:
+            time.sleep(0.05)
+    server.terminate()
+    raise TimeoutError("server did not start within 60 s")
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+
+
+class Client:
+    """
+    Thread-safe HTTP client keeping one keep-alive connection per thread.
+    """
+
+    def __init__(self, base_url: str, timeout: float):
+        parsed = urllib.parse.urlsplit(base_url)
+        self.host, self.port = parsed.hostname, parsed.port or 80
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = http.client.HTTPConnection(
+                self.host, self.port, timeout=self.timeout
+            )
+        return conn
+
+    def request(self, method: str, path: str, payload=None) -> tuple[int, dict]:
+        body = json.dumps(payload).encode("utf-8") if payload is not None else None
+        headers = {"Content-Type": "application/json"} if body else {}
+        for attempt in range(2):
+            conn = self._connection()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+                return response.status, json.loads(response.read() or b"{}")
+            except (http.client.HTTPException, ConnectionError):
+                # Stale keep-alive connection: reconnect once.
+                conn.close()
+                self._local.conn = None
+                if attempt:
+                    raise
+
+
+class LoadTest:
+    """
+    Generates the request mix and records one result per request.
+
+    Attributes
+    ----------
+    results : list[tuple[float, bool, bool | None]]
+        ``(latency seconds, ok, cached)`` per completed request.
+    """
+
+    def __init__(
+        self, client: Client, corpus: list[dict], hit_ratio: float, seed: int
+    ):
+        self.client = client
+        self.corpus = corpus
+        self.hit_ratio = hit_ratio
+        self.results = []
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._misses = 0
+
+    def next_payload(self) -> dict:
+        with self._rng_lock:
+            payload = self._rng.choice(self.corpus)
+            if self._rng.random() < self.hit_ratio:
+                return payload
+            self._misses += 1
+            return {**payload, "name": f"{payload['name']}-miss{self._misses}"}
+
+    def send(self, payload: dict, scheduled: float | None = None):
+        start = time.perf_counter() if scheduled is None else scheduled
+        try:
+            status, body = self.client.request("POST", "/predict", payload)
+            ok, cached = status == 200, body.get("cached")
+        except Exception:
+            ok, cached = False, None
+        self.results.append((time.perf_counter() - start, ok, cached))
+
+    def warm_up(self, concurrency: int):
+        def send(payload):
+            return self.client.request("POST", "/predict", payload)
+
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(send, self.corpus))
+
+    def run_closed(self, concurrency: int, duration: float, requests: int | None):
+        deadline = time.perf_counter() + duration
+        remaining = [requests]
+        lock = threading.Lock()
+
+        def worker():
+            while time.perf_counter() < deadline:
+                with lock:
+                    if remaining[0] is not None:
+                        if remaining[0] <= 0:
+                            return
+                        remaining[0] -= 1
+                self.send(self.next_payload())
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def run_open(
+        self, rps: float, duration: float, requests: int | None, max_inflight: int
+    ):
+        total = requests if requests is not None else int(rps * duration)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_inflight) as pool:
+            for i in range(total):
+                scheduled = start + i / rps
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                pool.submit(self.send, self.next_payload(), scheduled)
+
+
+def _percentile(sorted_values: list[float], q: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    index = min(len(sorted_values) - 1, max(0, round(q * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(results, elapsed: float, server_stats: dict | None) -> dict:
+    """
+    Returns
+    -------
+    dict
+        Latency percentiles (ms), throughput, error rate and hit ratio.
+    """
+
+    latencies = sorted(latency for latency, ok, _ in results if ok)
+    answered = [cached for _, ok, cached in results if ok]
+    errors = sum(1 for _, ok, _ in results if not ok)
+    return {
+        "requests": len(results),
+        "errors": errors,
+        "error_rate": errors / len(results) if results else 0.0,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(results) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "mean": statistics.fmean(latencies) * 1e3 if latencies else float("nan"),
+            "p50": _percentile(latencies, 0.50) * 1e3,
+            "p95": _percentile(latencies, 0.95) * 1e3,
+            "p99": _percentile(latencies, 0.99) * 1e3,
+            "max": latencies[-1] * 1e3 if latencies else float("nan"),
+        },
+        "cache_hit_ratio": (
+            sum(map(bool, answered)) / len(answered) if answered else 0.0
+        ),
+        "server_cache_stats": server_stats,
+    }
+
+
+def print_summary(config: dict, summary: dict):
+    latency = summary["latency_ms"]
+    print(f"target: {config['target']}  mode: {config['mode']}")
+    print(
+        f"requests: {summary['requests']:,} in {summary['elapsed_s']:.1f} s "
+        f"({summary['throughput_rps']:,.1f} req/s)"
+    )
+    print(
+        f"latency ms: p50 {latency['p50']:.2f} | p95 {latency['p95']:.2f} | "
+        f"p99 {latency['p99']:.2f} | mean {latency['mean']:.2f} | "
+        f"max {latency['max']:.2f}"
+    )
+    print(
+        f"errors: {summary['errors']:,} ({summary['error_rate']:.2%})  "
+        f"cache hit ratio: {summary['cache_hit_ratio']:.2%}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", default="http://127.0.0.1:8000")
+    target.add_argument(
+        "--spawn", action="store_true", help="start a local dummy-mode server"
+    )
+    parser.add_argument("--backend", default="json", choices=["json", "log", "sqlite"])
+    parser.add_argument("--server", default="dev", choices=["dev", "production"])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument(
+        "--gemini-url", help="generate misses via a fake Gemini server at this URL"
+    )
+    parser.add_argument("--llm-async", action="store_true")
+
+    parser.add_argument("--corpus", help="JSONL file of /predict payloads")
+    parser.add_argument("--corpus-size", type=int, default=1000)
+    parser.add_argument("--hit-ratio", type=float, default=0.8)
+    parser.add_argument("--no-warmup", action="store_true")
+
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--rps", type=float, help="open-loop request rate")
+    load.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--max-inflight", type=int, default=256)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--requests", type=int, help="stop after N requests")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    corpus = load_corpus(args.corpus) if args.corpus else synthetic_corpus(
+        args.corpus_size, rng
+    )
+
+    server = None
+    base_url = args.url
+    if args.spawn:
+        server, base_url = spawn_server(args)
+    try:
+        client = Client(base_url, args.timeout)
+        test = LoadTest(client, corpus, args.hit_ratio, args.seed)
+        if not args.no_warmup:
+            test.warm_up(min(len(corpus), 16))
+
+        before = client.request("GET", "/cache/stats")[1]
+        start = time.perf_counter()
+        if args.rps:
+            test.run_open(args.rps, args.duration, args.requests, args.max_inflight)
+            mode = f"open loop, {args.rps:g} req/s"
+        else:
+            test.run_closed(args.concurrency, args.duration, args.requests)
+            mode = f"closed loop, {args.concurrency} clients"
+        elapsed = time.perf_counter() - start
+        after = client.request("GET", "/cache/stats")[1]
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    server_stats = {
+        key: after[key] - before.get(key, 0)
+        for key in ("hits", "misses", "expirations", "evictions_entries")
+        if isinstance(after.get(key), int)
+    }
+    config = {
+        "target": "spawned " + args.server + " server" if args.spawn else base_url,
+        "mode": mode,
+        "backend": args.backend if args.spawn else None,
+        "llm": (args.gemini_url or "dummy") if args.spawn else None,
+        "corpus": args.corpus or f"synthetic ({len(corpus)} users)",
+        "hit_ratio_requested": args.hit_ratio,
+    }
+    summary = summarize(test.results, elapsed, server_stats)
+    print_summary(config, summary)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"config": config, "summary": summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
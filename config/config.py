@@ -14,6 +14,7 @@ Attributes
 ----------
 Config.DEVICE : str
     Device to use for model execution ("cuda" if GPU is available, otherwise "cpu").
+    Computed on first access, so torch is only imported if it is read.
 
 Config.MODELS : dict[str, str]
     Identifiers for models used in the project:
@@ -24,18 +25,213 @@ Config.SERVER : dict[str, object]
         - "HOST": str, host address for the server (default "0.0.0.0").
         - "PORT": int, port number (default 8000).
         - "DEBUG": bool, debug mode toggle (default True).
+        - "MODE": str, "dev" (Flask development server) or "production"
+          (pre-fork gunicorn server with the app preloaded in the master).
+        - "WORKERS": int, worker processes in production mode.
+        - "THREADS": int, request threads per worker in production mode.
+        - "TIMEOUT": int, seconds before a silent worker is restarted.
 
 Config.GEMINI_API_KEY : str | None
     API key for the Google Gemini LLM, loaded from `.env`.
 
+Config.GEMINI_BASE_URL : str | None
+    Alternative Gemini API endpoint, loaded from `.env` / the environment
+    variable ``GEMINI_BASE_URL``; e.g. the local stand-in server of
+    `benchmarks/fake_gemini_server.py` for offline benchmarks. None uses
+    the public API.
+
+Config.LLM_ASYNC : dict[str, object]
+    Async Gemini client settings:
+        - "ENABLED": bool, use `AsyncGoogle_LLM` (shared client, bounded concurrency).
+        - "MAX_CONCURRENCY": int, maximum concurrent generations per event loop.
+        - "TIMEOUT": float | None, per-call timeout in seconds.
+
+Config.LLM_RESILIENCE : dict[str, object]
+    Resilience layer around the Gemini client (`ResilientLLM`); on failure the
+    insight falls back to the dummy predictor:
+        - "ENABLED": bool, wrap the client.
+        - "DEADLINE": float, seconds per call for a 512-token output budget
+          (scaled up for larger budgets); bounds the time to each chunk of a stream.
+        - "HEDGE": bool, send a second request when a call is slower than
+          the recent "HEDGE_PERCENTILE" latency.
+        - "HEDGE_PERCENTILE": float, latency percentile triggering a hedge.
+        - "HEDGE_MIN_SAMPLES": int, successful calls needed before hedging.
+        - "HEDGE_MAX_RATIO": float, long-run maximum of hedges per call.
+        - "BREAKER_WINDOW": int, recent calls considered by the circuit breaker.
+        - "BREAKER_MIN_CALLS": int, calls needed in the window before it can open.
+        - "BREAKER_ERROR_RATE": float, failure share opening the circuit.
+        - "BREAKER_OPEN_SECONDS": float, cool-down before half-open probing.
+        - "BREAKER_HALF_OPEN_PROBES": int, concurrent probe calls when half-open.
+        - "MAX_WORKERS": int, threads running blocking client calls.
+
+Config.LLM_QUOTA : dict[str, object]
+    Quota-aware scheduling of Gemini calls (`QuotaScheduler`):
+        - "ENABLED": bool, wait for quota before calling the LLM.
+        - "REQUESTS_PER_MINUTE": int | None, request quota of the project.
+        - "TOKENS_PER_MINUTE": int | None, token quota of the project (prompt and
+          output). In production mode both quotas are split between workers.
+        - "BURST_SECONDS": float, seconds of quota that may be used at once.
+        - "MAX_QUEUE": int, calls allowed to wait for quota at once.
+        - "MAX_WAIT": dict[str, float | None], maximum queueing time per priority
+          ("interactive", "batch", "prewarm"); a call that would wait longer
+          falls back at once. Keep the interactive value below "DEADLINE".
+
+Config.ZODIAC : dict[str, object]
+    Zodiac resolution:
+        - "EXACT": bool, resolve signs from the birth instant (date, time and
+          timezone) with the sun-ingress table instead of calendar boundaries.
+          Birth time and timezone then also key the insight cache.
+        - "DEFAULT_TIMEZONE": str, IANA timezone assumed for the birth time
+          when the birth place's timezone is unknown.
+
+Config.GAZETTEER : dict[str, object]
+    Offline birth place resolution:
+        - "ENABLED": bool, resolve `birth_place` to its IANA timezone with the
+          bundled place index (otherwise the default timezone is assumed).
+        - "INDEX_FILE": str, binary index built by `src.geo.build_gazetteer`.
+
 Config.CACHE_FILE : str
     Path to the JSON cache file storing user insights.
 
+Config.CACHE_JSON : dict[str, object]
+    Persistence of the "json" cache backend (`JsonFileStore`). The file is
+    always rewritten atomically (temporary file renamed over it):
+        - "DURABILITY": str, "strict" (rewrite and fsync on every set),
+          "fsync" (write-behind: a background thread rewrites and fsyncs the
+          file) or "relaxed" (write-behind without fsync).
+        - "FLUSH_INTERVAL": float, maximum seconds a write-behind update waits.
+        - "FLUSH_MAX_DIRTY": int, pending updates triggering an early flush.
+
+Config.CACHE_BACKEND : str
+    Storage engine behind `Cache`: "json" (rewrite `CACHE_FILE` as a whole),
+    "snapshot" (memory-mapped `CACHE_SNAPSHOT` file with a writable delta),
+    "log" (append-only record log at `CACHE_LOG_FILE`) or "sqlite" (WAL-mode
+    database at `CACHE_SQLITE_FILE`, shared by all worker processes; required
+    for production mode with several workers).
+
+Config.CACHE_SNAPSHOT : dict[str, object]
+    Settings of the "snapshot" cache backend (`SnapshotStore`):
+        - "FILE": str, memory-mapped snapshot, built from `CACHE_FILE` with
+          ``python -m src.cache.snapshot_store convert``.
+        - "DELTA": str, "log" or "sqlite": store receiving new entries, at
+          `CACHE_LOG_FILE` / `CACHE_SQLITE_FILE` ("sqlite" for several workers).
+
+Config.CACHE_LOG_FILE : str
+    Path to the append-only record log used by the "log" cache backend.
+
+Config.CACHE_LOG : dict[str, object]
+    Tuning knobs for the "log" cache backend:
+        - "FSYNC": bool, fsync every append (default False).
+        - "COMPACTION_INTERVAL": float, seconds between background compaction checks.
+        - "COMPACTION_MIN_GARBAGE_RATIO": float, garbage fraction triggering compaction.
+        - "COMPACTION_MIN_BYTES": int, minimum log size before compaction is considered.
+
+Config.CACHE_SQLITE_FILE : str
+    Path to the SQLite database used by the "sqlite" cache backend.
+
+Config.CACHE_SQLITE : dict[str, object]
+    Tuning knobs for the "sqlite" cache backend:
+        - "BUSY_TIMEOUT": float, seconds a writer waits for another process's lock.
+        - "MAINTENANCE_INTERVAL": float, seconds between the background
+          expiry/eviction passes over the shared tables (0 disables them).
+
+Config.CACHE_POLICY : dict[str, object]
+    Expiry and eviction of cached insights:
+        - "DAY_BOUNDARY": bool, expire entries at the user's next local midnight.
+        - "TIMEZONE": str, IANA timezone used when the user's timezone is unknown.
+        - "TTL_SECONDS": float | None, maximum entry lifetime (None disables).
+        - "MAX_ENTRIES": int | None, LRU cap on the number of entries.
+        - "MAX_BYTES": int | None, LRU cap on the approximate size of all entries.
+
+Config.SIGN_TEMPLATES : dict[str, object]
+    Template-per-sign generation mode:
+        - "ENABLED": bool, serve insights from today's precomputed (sign, language)
+          templates, falling back to the live LLM for missing combinations.
+        - "FILE": str, JSON file holding the template table.
+        - "LANGUAGES": list[str], languages precomputed by the daily job.
+        - "TIMEZONE": str, IANA timezone defining the template day.
+
+Config.BATCH : dict[str, int]
+    Limits of the /predict_batch endpoint:
+        - "MAX_ITEMS": int, maximum payloads accepted per request.
+        - "MAX_NAMES_PER_PROMPT": int, people per multi-person LLM prompt.
+        - "MAX_TOKENS_PER_NAME": int, output token budget per person in a prompt.
+
+Config.JOBS : dict[str, object]
+    Asynchronous job mode of /predict (see `src.utils.job_manager`):
+        - "MODE": str, "off" (misses are answered synchronously), "opt-in"
+          (misses of requests sent with ``Prefer: respond-async`` return 202
+          with a job id) or "always" (every miss returns 202).
+        - "WORKERS": int, background threads generating insights per process.
+        - "MAX_PENDING": int, jobs queued or running per process before new
+          ones are refused with 503.
+        - "RESULT_TTL": float, seconds a finished job can still be fetched.
+        - "TIMEOUT": float, seconds after which an unfinished job of another
+          worker process is considered lost.
+        - "MAX_POLL_WAIT": float, longest long-poll of ``GET /jobs/<id>?wait=``.
+        - "POLL_INTERVAL": float, seconds between reads of the shared job
+          table while long-polling a job of another worker process.
+
+Config.BULK : dict[str, object]
+    Defaults of the offline bulk generator (`python -m src.interface.bulk`):
+        - "PROCESSES": int, worker processes generating insights.
+        - "CONCURRENCY": int, insights generated at once per worker process.
+        - "CHUNK_SIZE": int, cache misses sent to a worker at a time.
+        - "CHECKPOINT_INTERVAL": float, seconds between progress checkpoints.
+        - "PROGRESS_INTERVAL": float, seconds between rows-per-second reports.
+        - "PRIORITY": str, quota priority of the LLM calls ("prewarm" yields
+          to the server's interactive and batch calls).
+        - "QUOTA_SHARE": float, fraction of `LLM_QUOTA` used by the whole run.
+
 Config.USE_DUMMY_LLM : bool
     Toggle to use dummy insight generation instead of calling Gemini LLM.
+    Can be switched on with the environment variable ``USE_DUMMY_LLM=1``.
 
 Config.USE_DUMMY_TRANSLATION : bool
     Toggle to use dummy translation instead of calling a real translation API.
+    Can be switched on with the environment variable ``USE_DUMMY_TRANSLATION=1``.
+
+Config.TRANSLATION : dict[str, object]
+    Google Translate client settings:
+        - "TIMEOUT": float | None, per-request timeout in seconds.
+        - "MAX_CONCURRENCY": int, concurrent requests per `translate_many` call.
+
+Config.TRANSLATION_CACHE : dict[str, object]
+    Content-addressed translation memo shared by all translators:
+        - "ENABLED": bool, consult the memo before translating.
+        - "FILE": str, append-only log of the persistent tier.
+        - "MAX_MEMORY_ENTRIES": int, capacity of the in-memory LRU tier.
+
+Config.PROMPT_CACHE : dict[str, object]
+    Prompt-level cache of LLM replies, keyed by a hash of the rendered prompt,
+    model and generation parameters and shared by every user whose prompt is
+    identical (same name, zodiac sign and language):
+        - "ENABLED": bool, consult the cache before calling the LLM.
+        - "FILE": str, append-only log of the persistent tier (a table of
+          `CACHE_SQLITE_FILE` with the "sqlite" backend or snapshot delta).
+        - "MAX_MEMORY_ENTRIES": int, capacity of the in-memory LRU tier.
+        - "DAY_BOUNDARY": bool, expire replies at the next midnight of "TIMEZONE".
+        - "TIMEZONE": str, IANA timezone defining the day of a reply.
+        - "TTL_SECONDS": float | None, maximum reply lifetime (None disables).
+        - "MAX_ENTRIES": int | None, LRU cap on the number of persisted replies.
+        - "MAX_BYTES": int | None, LRU cap on the approximate size of persisted replies.
+
+Config.METRICS : dict[str, object]
+    Request instrumentation:
+        - "ENABLED": bool, time requests and pipeline stages and expose them
+          with the counters on the `/metrics` endpoint (Prometheus text format).
+        - "NAMESPACE": str, prefix of every metric name.
+
+Config.PROFILING : dict[str, object]
+    On-demand request profiling (see `src.profiling.profiler`):
+        - "ENABLED": bool, accept the ``X-Profile`` request header and the
+          ``/admin/profile`` endpoint (environment variable ``PROFILING=1``).
+        - "DIR": str, directory receiving the ``.pstats`` / ``.folded`` files.
+        - "SAMPLE_INTERVAL": float, seconds between stack samples in "sample" mode.
+        - "MAX_REQUESTS": int, most requests that can be armed at once.
+        - "TOKEN": str | None, secret required in the ``X-Profile-Token``
+          header (environment variable ``PROFILING_TOKEN``). Without a token
+          only requests from localhost may profile.
 
 Config.GENERATION_LANG : str
     Default language for text generation (e.g., "English"). First letter of language should be in uppercase.
@@ -49,7 +245,6 @@ print(Config.MODELS["GEMINI"])
 print(Config.SERVER["PORT"])
 """
 
-import torch
 import os
 from dotenv import load_dotenv
 
@@ -57,6 +252,34 @@ from dotenv import load_dotenv
 dotenv_path = os.path.join(os.path.dirname(__file__), ".env")
 load_dotenv(dotenv_path)
 
+# Directory holding cache files that live next to the project
+CACHE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cache_db"
+)
+
+
+class _Device:
+    """
+    Lazily computed `Config.DEVICE`.
+
+    Importing torch costs seconds, so it is only imported (and CUDA probed)
+    the first time `Config.DEVICE` is read. Without torch installed the
+    device is "cpu".
+    """
+
+    def __init__(self):
+        self._value = None
+
+    def __get__(self, obj, owner=None) -> str:
+        if self._value is None:
+            try:
+                import torch
+
+                self._value = "cuda" if torch.cuda.is_available() else "cpu"
+            except ImportError:
+                self._value = "cpu"
+        return self._value
+
 
 class Config:
     """
@@ -78,7 +301,7 @@ class Config:
         API key for Google Gemini LLM, loaded from `.env`.
     """
 
-    DEVICE: str = "cuda" if torch.cuda.is_available() else "cpu"
+    DEVICE: str = _Device()
 
     MODELS: dict[str, str] = {
         "GEMINI": "gemini-2.0-flash",
@@ -88,14 +311,155 @@ class Config:
         "HOST": "0.0.0.0",
         "PORT": 8000,
         "DEBUG": True,
+        "MODE": "dev",  # "dev" or "production"
+        "WORKERS": (os.cpu_count() or 1) * 2 + 1,
+        "THREADS": 4,
+        "TIMEOUT": 60,
     }
 
     GEMINI_API_KEY: str | None = os.getenv("GEMINI_API_KEY")
+    GEMINI_BASE_URL: str | None = os.getenv("GEMINI_BASE_URL") or None
+
+    LLM_ASYNC: dict[str, object] = {
+        "ENABLED": False,
+        "MAX_CONCURRENCY": 64,
+        "TIMEOUT": 30.0,
+    }
+
+    LLM_RESILIENCE: dict[str, object] = {
+        "ENABLED": True,
+        "DEADLINE": 10.0,
+        "HEDGE": True,
+        "HEDGE_PERCENTILE": 95.0,
+        "HEDGE_MIN_SAMPLES": 20,
+        "HEDGE_MAX_RATIO": 0.1,
+        "BREAKER_WINDOW": 20,
+        "BREAKER_MIN_CALLS": 10,
+        "BREAKER_ERROR_RATE": 0.5,
+        "BREAKER_OPEN_SECONDS": 30.0,
+        "BREAKER_HALF_OPEN_PROBES": 1,
+        "MAX_WORKERS": 32,
+    }
+
+    LLM_QUOTA: dict[str, object] = {
+        "ENABLED": True,
+        "REQUESTS_PER_MINUTE": 1000,
+        "TOKENS_PER_MINUTE": 1_000_000,
+        "BURST_SECONDS": 5.0,
+        "MAX_QUEUE": 1000,
+        "MAX_WAIT": {"interactive": 5.0, "batch": 60.0, "prewarm": None},
+    }
+
+    ZODIAC: dict[str, object] = {
+        "EXACT": True,
+        "DEFAULT_TIMEZONE": "Asia/Kolkata",
+    }
+
+    GAZETTEER: dict[str, object] = {
+        "ENABLED": True,
+        "INDEX_FILE": os.path.join(
+            os.path.dirname(CACHE_DIR), "src", "geo", "data", "places.gaz"
+        ),
+    }
 
     CACHE_FILE: str = "D:\Assignment_2\Astro-Insight-Generator\cache_db\cache.json"
 
-    USE_DUMMY_LLM: bool = False
-    USE_DUMMY_TRANSLATION: bool = False
+    CACHE_JSON: dict[str, object] = {
+        "DURABILITY": "fsync",
+        "FLUSH_INTERVAL": 1.0,
+        "FLUSH_MAX_DIRTY": 256,
+    }
+
+    CACHE_BACKEND: str = "json"  # "json", "log", "sqlite" or "snapshot"
+    CACHE_SNAPSHOT: dict[str, object] = {
+        "FILE": os.path.join(CACHE_DIR, "cache.snap"),
+        "DELTA": "log",
+    }
+    CACHE_LOG_FILE: str = os.path.join(CACHE_DIR, "cache.log")
+    CACHE_LOG: dict[str, object] = {
+        "FSYNC": False,
+        "COMPACTION_INTERVAL": 60.0,
+        "COMPACTION_MIN_GARBAGE_RATIO": 0.5,
+        "COMPACTION_MIN_BYTES": 1 << 20,
+    }
+    CACHE_SQLITE_FILE: str = os.path.join(CACHE_DIR, "cache.sqlite3")
+    CACHE_SQLITE: dict[str, object] = {
+        "BUSY_TIMEOUT": 5.0,
+        "MAINTENANCE_INTERVAL": 5.0,
+    }
+    CACHE_POLICY: dict[str, object] = {
+        "DAY_BOUNDARY": True,
+        "TIMEZONE": "Asia/Kolkata",
+        "TTL_SECONDS": None,
+        "MAX_ENTRIES": 100_000,
+        "MAX_BYTES": 256 * 1024 * 1024,
+    }
+
+    SIGN_TEMPLATES: dict[str, object] = {
+        "ENABLED": False,
+        "FILE": os.path.join(CACHE_DIR, "sign_templates.json"),
+        "LANGUAGES": ["English", "Hindi"],
+        "TIMEZONE": "Asia/Kolkata",
+    }
+
+    BATCH: dict[str, int] = {
+        "MAX_ITEMS": 5000,
+        "MAX_NAMES_PER_PROMPT": 20,
+        "MAX_TOKENS_PER_NAME": 200,
+    }
+
+    JOBS: dict[str, object] = {
+        "MODE": "off",
+        "WORKERS": 8,
+        "MAX_PENDING": 1000,
+        "RESULT_TTL": 600.0,
+        "TIMEOUT": 300.0,
+        "MAX_POLL_WAIT": 30.0,
+        "POLL_INTERVAL": 0.25,
+    }
+
+    BULK: dict[str, object] = {
+        "PROCESSES": os.cpu_count() or 1,
+        "CONCURRENCY": 16,
+        "CHUNK_SIZE": 64,
+        "CHECKPOINT_INTERVAL": 5.0,
+        "PROGRESS_INTERVAL": 10.0,
+        "PRIORITY": "prewarm",
+        "QUOTA_SHARE": 1.0,
+    }
+
+    USE_DUMMY_LLM: bool = os.getenv("USE_DUMMY_LLM") == "1"
+    USE_DUMMY_TRANSLATION: bool = os.getenv("USE_DUMMY_TRANSLATION") == "1"
+    TRANSLATION: dict[str, object] = {
+        "TIMEOUT": 10.0,
+        "MAX_CONCURRENCY": 16,
+    }
+    TRANSLATION_CACHE: dict[str, object] = {
+        "ENABLED": True,
+        "FILE": os.path.join(CACHE_DIR, "translations.log"),
+        "MAX_MEMORY_ENTRIES": 10_000,
+    }
+    PROMPT_CACHE: dict[str, object] = {
+        "ENABLED": True,
+        "FILE": os.path.join(CACHE_DIR, "responses.log"),
+        "MAX_MEMORY_ENTRIES": 10_000,
+        "DAY_BOUNDARY": True,
+        "TIMEZONE": "Asia/Kolkata",
+        "TTL_SECONDS": None,
+        "MAX_ENTRIES": 100_000,
+        "MAX_BYTES": 64 * 1024 * 1024,
+    }
+    METRICS: dict[str, object] = {
+        "ENABLED": True,
+        "NAMESPACE": "astro",
+    }
+    PROFILING: dict[str, object] = {
+        "ENABLED": os.getenv("PROFILING") == "1",
+        "DIR": os.path.join(os.path.dirname(CACHE_DIR), "profiles"),
+        "SAMPLE_INTERVAL": 0.005,
+        "MAX_REQUESTS": 100,
+        "TOKEN": os.getenv("PROFILING_TOKEN") or None,
+    }
     GENERATION_LANG: str = "English"  # should start from UpperCase
 
 
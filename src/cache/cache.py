@@ -1,88 +1,231 @@
-import json, os
+import time
 from config.config import Config
+from src.cache.json_store import JsonFileStore
+from src.cache.log_store import LogStructuredStore
+from src.cache.sqlite_store import SqliteStore
+from src.cache.snapshot_store import SnapshotStore
+from src.cache.policy import CachePolicy
 
 
 class Cache:
     """
-    A simple file-based caching system for storing and retrieving data.
-
-    This class uses a JSON file as persistent storage to maintain a cache.
-    It automatically loads the cache from disk when initialized and saves
-    changes whenever a new entry is added or updated.
+    A simple persistent caching system for storing and retrieving insights.
+
+    The actual storage is delegated to a backend selected by
+    `Config.CACHE_BACKEND`:
+
+    - "json": `JsonFileStore`, a human-readable JSON file rewritten atomically,
+      by default from a background thread (write-behind).
+    - "log": `LogStructuredStore`, an append-only record log with O(1) writes,
+      crash recovery and background compaction.
+    - "sqlite": `SqliteStore`, an SQLite database in WAL mode shared safely by
+      several processes (use it for multi-worker production servers).
+    - "snapshot": `SnapshotStore`, a memory-mapped binary snapshot (instant
+      startup at any size, pages shared by workers) behind a writable "log"
+      or "sqlite" delta store.
+
+    Entries are daily insights, so each one is stamped with an expiry time
+    (next local midnight and/or a TTL) and the number or size of entries is
+    capped with LRU eviction, as configured by `Config.CACHE_POLICY`. The
+    "sqlite" backend is shared across processes, so it enforces the caps and
+    reaps expired entries itself; the per-process policy then only counts
+    hits, misses and expirations found on read. With the "snapshot" backend
+    the policy only tracks the keys of the delta store (none with an "sqlite"
+    delta), so that startup never decodes the snapshot; the snapshot itself
+    is capped when the delta is merged into it.
 
     Attributes:
-        _cache (dict): Internal dictionary to hold cached data in memory.
-        CACHE_FILE (str): File path for the cache JSON file.
+        backend (str): Name of the selected storage backend.
+        store (JsonFileStore | LogStructuredStore | SqliteStore | SnapshotStore):
+            The storage backend.
+        policy (CachePolicy): Expiry and eviction policy.
+        CACHE_FILE (str): File path used by the storage backend.
     """
 
-    def __init__(self):
+    def __init__(self, backend: str | None = None, path: str | None = None):
+        """
+        Initialize the Cache object and open its storage backend.
+
+        Args:
+            backend (str, optional): "json", "log", "sqlite" or "snapshot".
+                Defaults to `Config.CACHE_BACKEND`.
+            path (str, optional): Storage file path. Defaults to the configured
+                path for the selected backend.
         """
-        Initialize the Cache object.
 
-        - Loads existing cache data from the configured cache file.
-        - If the file does not exist, creates an empty JSON file.
+        self.backend = backend or Config.CACHE_BACKEND
+        if self.backend == "snapshot":
+            self.CACHE_FILE = path or Config.CACHE_SNAPSHOT["FILE"]
+            delta = self._open_store(Config.CACHE_SNAPSHOT["DELTA"])[1]
+            self.store = SnapshotStore(self.CACHE_FILE, delta)
+        else:
+            self.CACHE_FILE, self.store = self._open_store(self.backend, path)
+
+        self.policy = CachePolicy(
+            ttl_seconds=Config.CACHE_POLICY["TTL_SECONDS"],
+            day_boundary=Config.CACHE_POLICY["DAY_BOUNDARY"],
+            timezone=Config.CACHE_POLICY["TIMEZONE"],
+            max_entries=Config.CACHE_POLICY["MAX_ENTRIES"],
+            max_bytes=Config.CACHE_POLICY["MAX_BYTES"],
+        )
+        self._shared_store = getattr(self.store, "manages_capacity", False)
+        if not self._shared_store:
+            tracked = self.store.delta if self.backend == "snapshot" else self.store
+            evicted = self.policy.seed(tracked.entry_sizes())
+            if evicted:
+                self.store.delete_many(evicted)
+
+    @staticmethod
+    def writable_backend(backend: str | None = None) -> str:
         """
+        Resolve the backend that receives writes: the delta store of the
+        "snapshot" backend, the backend itself otherwise.
 
-        self._cache = {}
-        self.CACHE_FILE = Config.CACHE_FILE
-        self.load()
+        Args:
+            backend (str | None): Backend name, defaults to `Config.CACHE_BACKEND`.
 
-    def load(self):
+        Returns:
+            str: "json", "log" or "sqlite".
         """
-        Load the cache from the JSON file.
 
-        - If the cache file does not exist, create an empty one.
-        - If the cache file exists, load its contents into memory.
-        - If the file contains invalid JSON, reset the cache to an empty dictionary.
+        backend = backend or Config.CACHE_BACKEND
+        if backend == "snapshot":
+            return Config.CACHE_SNAPSHOT["DELTA"]
+        return backend
+
+    @staticmethod
+    def _open_store(backend: str, path: str | None = None):
         """
+        Open a "json", "log" or "sqlite" storage backend.
 
-        if not os.path.exists(self.CACHE_FILE):
-            with open(self.CACHE_FILE, "w", encoding="utf-8") as f:
-                json.dump({}, f, ensure_ascii=False, indent=2)
+        Returns:
+            tuple[str, store]: The file path used and the opened store.
+        """
 
-        if os.path.exists(self.CACHE_FILE):
-            try:
-                with open(self.CACHE_FILE, "r", encoding="utf-8") as f:
-                    self._cache = json.load(f)
-            except json.JSONDecodeError:
-                self._cache = {}
+        if backend == "json":
+            path = path or Config.CACHE_FILE
+            return path, JsonFileStore(
+                path,
+                durability=Config.CACHE_JSON["DURABILITY"],
+                flush_interval=Config.CACHE_JSON["FLUSH_INTERVAL"],
+                flush_max_dirty=Config.CACHE_JSON["FLUSH_MAX_DIRTY"],
+            )
+        if backend == "log":
+            path = path or Config.CACHE_LOG_FILE
+            return path, LogStructuredStore(
+                path,
+                fsync=Config.CACHE_LOG["FSYNC"],
+                compaction_interval=Config.CACHE_LOG["COMPACTION_INTERVAL"],
+                compaction_min_garbage_ratio=Config.CACHE_LOG[
+                    "COMPACTION_MIN_GARBAGE_RATIO"
+                ],
+                compaction_min_bytes=Config.CACHE_LOG["COMPACTION_MIN_BYTES"],
+            )
+        if backend == "sqlite":
+            path = path or Config.CACHE_SQLITE_FILE
+            return path, SqliteStore(
+                path,
+                busy_timeout=Config.CACHE_SQLITE["BUSY_TIMEOUT"],
+                max_entries=Config.CACHE_POLICY["MAX_ENTRIES"],
+                max_bytes=Config.CACHE_POLICY["MAX_BYTES"],
+                maintenance_interval=Config.CACHE_SQLITE["MAINTENANCE_INTERVAL"],
+            )
+        raise ValueError(f"Unknown cache backend: {backend!r}")
 
     def save(self):
         """
-        Save the current state of the cache to the JSON file.
-
-        Ensures the cache dictionary is always written in a human-readable format.
+        Flush the current state of the cache to disk.
         """
 
-        with open(self.CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(self._cache, f, ensure_ascii=False, indent=2)
+        self.store.flush()
 
     def get(self, key: str):
         """
         Retrieve a value from the cache using the provided key.
 
+        Expired entries are deleted on read and reported as a miss. Entries
+        written before expiry was tracked are stamped to expire at the next
+        boundary of the current policy, so an upgrade does not discard them.
+
         Args:
             key (str): The cache key to look up.
 
         Returns:
-            dict or None: The cached entry if found, otherwise None.
+            dict or None: The cached entry if found and fresh, otherwise None.
         """
 
-        return self._cache.get(key)
-
-    def set(self, key: str, zodiac: str, insight: str, language: str):
+        value = self.store.get(key)
+        if value is None:
+            self.policy.record_miss()
+            return None
+
+        expires_at = value.get("expires_at")
+        if self.policy.is_enabled() and expires_at is None:
+            expires_at = self.policy.expires_at()
+            value = {**value, "expires_at": expires_at}
+            self.store.put(key, value)
+        if self.policy.is_enabled() and expires_at <= time.time():
+            self.store.delete(key)
+            self.policy.record_expired(key)
+            return None
+
+        self.policy.record_hit(key, expires_at)
+        return {k: v for k, v in value.items() if k != "expires_at"}
+
+    def set(
+        self,
+        key: str,
+        zodiac: str,
+        insight: str,
+        language: str,
+        timezone: str | None = None,
+    ):
         """
-        Insert or update a value in the cache and persist it to disk.
+        Insert or update a value in the cache and persist it to disk (later,
+        from a background thread, with a write-behind store).
 
         Args:
             key (str): Unique identifier for the cached entry.
             zodiac (str): The zodiac sign associated with the entry.
             insight (str): The insight or prediction text.
             language (str): The language code of the cached insight.
+            timezone (str, optional): The user's IANA timezone, used for the
+                day-boundary expiry. Defaults to `Config.CACHE_POLICY["TIMEZONE"]`.
 
         Returns:
             None
         """
 
-        self._cache[key] = {"zodiac": zodiac, "insight": insight, "language": language}
-        self.save()
+        value = {"zodiac": zodiac, "insight": insight, "language": language}
+        expires_at = self.policy.expires_at(timezone)
+        if expires_at is not None:
+            value["expires_at"] = expires_at
+
+        self.store.put(key, value)
+        if self._shared_store:
+            return
+        size = CachePolicy.entry_size(key, value)
+        dropped = self.policy.admit(key, expires_at, size)
+        if dropped:
+            self.store.delete_many(dropped)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Hit, miss, expiration and eviction counters plus the current
+            number and approximate size of cached entries.
+        """
+
+        stats = self.policy.stats()
+        if self._shared_store:
+            store_stats = self.store.stats()
+            stats["expirations"] += store_stats.pop("expirations")
+            stats.update(store_stats)
+        return stats
+
+    def close(self):
+        """
+        Flush pending writes and release the storage backend.
+        """
+
+        self.store.close()
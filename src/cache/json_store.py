@@ -0,0 +1,323 @@
+import atexit, json, os, threading, time, weakref
+
+DURABILITY_LEVELS = ("strict", "fsync", "relaxed")
+
+
+def _close_at_exit(ref):
+    store = ref()
+    if store is not None:
+        store.close()
+
+
+class JsonFileStore:
+    """
+    Key-value store backed by a single human-readable JSON file.
+
+    This is the original storage format of the insight cache: the whole
+    dictionary is held in memory and the whole file is rewritten to persist
+    it, so each rewrite costs O(total entries).
+
+    Rewrites are atomic: the dictionary is written to a temporary file next
+    to the cache file, which is then renamed over it, so a crash mid-write
+    leaves the previous complete file in place. A file that still cannot be
+    parsed at startup is moved aside (``<path>.corrupt-<timestamp>``) instead
+    of being silently overwritten.
+
+    How writes reach the disk depends on the durability level:
+
+    - "strict": every update rewrites and fsyncs the file before returning.
+    - "fsync": write-behind. Updates only mark the store dirty; a background
+      thread rewrites the file once ``flush_max_dirty`` updates are pending
+      or ``flush_interval`` seconds after the first pending one, and fsyncs
+      it. A crash loses at most the updates of that window.
+    - "relaxed": write-behind without fsync. Survives a crash of the process,
+      not of the machine.
+
+    Pending updates are flushed by `flush`, `close` and at interpreter exit.
+    Access is serialized by a lock; the file is encoded and written outside
+    of it, from a snapshot, so request threads are not blocked by disk I/O.
+
+    Attributes:
+        path (str): File path of the JSON file.
+        durability (str): One of `DURABILITY_LEVELS`.
+        flush_interval (float): Maximum seconds an update stays unwritten
+            (write-behind levels).
+        flush_max_dirty (int): Pending updates that trigger an early flush.
+        _data (dict): In-memory copy of every stored entry.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        durability: str = "strict",
+        flush_interval: float = 1.0,
+        flush_max_dirty: int = 256,
+    ):
+        """
+        Initialize the store and load any existing data from disk.
+
+        Args:
+            path (str): File path of the JSON file.
+            durability (str): "strict", "fsync" or "relaxed".
+            flush_interval (float): Seconds before pending updates are written.
+            flush_max_dirty (int): Pending updates that trigger an early flush.
+        """
+
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(
+                f"Unknown durability {durability!r}; use one of {DURABILITY_LEVELS}"
+            )
+        self.path = path
+        self.durability = durability
+        self.flush_interval = flush_interval
+        self.flush_max_dirty = flush_max_dirty
+        self._data = {}
+        self._lock = threading.RLock()
+        self._flush_lock = threading.Lock()  # one rewrite of the file at a time
+        self._wakeup = threading.Condition(self._lock)
+        self._dirty = 0  # updates not yet written
+        self._dirty_since = None
+        self._flushes = 0
+        self._closed = False
+        self._flusher = None
+        self._pid = os.getpid()
+        self.load()
+        atexit.register(_close_at_exit, weakref.ref(self))
+
+    @property
+    def write_behind(self) -> bool:
+        # Once closed, updates are written synchronously.
+        return self.durability != "strict" and not self._closed
+
+    def load(self):
+        """
+        Load the store from the JSON file.
+
+        - If the file does not exist, create an empty one.
+        - If the file exists, load its contents into memory.
+        - If the file contains invalid JSON, move it aside and start empty.
+        - Temporary files left by an interrupted rewrite are removed.
+        """
+
+        tmp_path = self._tmp_path()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        if not os.path.exists(self.path):
+            self._write({})
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._data = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            corrupt_path = f"{self.path}.corrupt-{time.strftime('%Y%m%d-%H%M%S')}"
+            os.replace(self.path, corrupt_path)
+            print(f"Cache file {self.path} is corrupt; moved to {corrupt_path}")
+            self._data = {}
+            self._write({})
+
+    def save(self):
+        """
+        Write the whole store to the JSON file in a human-readable format,
+        atomically.
+        """
+
+        with self._flush_lock:
+            with self._lock:
+                snapshot = dict(self._data)
+                flushed = self._dirty
+            self._write(snapshot)
+            with self._lock:
+                self._dirty -= flushed
+                self._dirty_since = time.monotonic() if self._dirty else None
+                self._flushes += 1
+
+    def get(self, key: str):
+        """
+        Retrieve the value stored under ``key``.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            dict or None: The stored value if found, otherwise None.
+        """
+
+        return self._data.get(key)
+
+    def put(self, key: str, value: dict):
+        """
+        Insert or update a value and persist it according to the durability.
+
+        Args:
+            key (str): Unique identifier of the entry.
+            value (dict): JSON-serializable value to store.
+        """
+
+        with self._lock:
+            self._data[key] = value
+            self._mark_dirty()
+        if not self.write_behind:
+            self.save()
+
+    def delete(self, key: str):
+        """
+        Remove ``key`` from the store if present and persist the change.
+
+        Args:
+            key (str): The key to remove.
+        """
+
+        with self._lock:
+            if self._data.pop(key, None) is None:
+                return
+            self._mark_dirty()
+        if not self.write_behind:
+            self.save()
+
+    def delete_many(self, keys):
+        """
+        Remove several keys and persist the change with a single rewrite.
+
+        Args:
+            keys (Iterable[str]): The keys to remove.
+        """
+
+        with self._lock:
+            removed = [self._data.pop(key, None) for key in keys]
+            if all(value is None for value in removed):
+                return
+            self._mark_dirty()
+        if not self.write_behind:
+            self.save()
+
+    def entry_sizes(self):
+        """
+        Yields:
+            tuple[str, int]: ``(key, approximate size)`` for every entry, oldest first.
+        """
+
+        with self._lock:
+            items = list(self._data.items())
+        for key, value in items:
+            yield key, len(key) + sum(len(str(v)) for v in value.values())
+
+    def keys(self):
+        """
+        Returns:
+            list[str]: A snapshot of every stored key.
+        """
+
+        with self._lock:
+            return list(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Entry count, durability level, pending updates and completed
+            rewrites of the file.
+        """
+
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "durability": self.durability,
+                "dirty": self._dirty,
+                "flushes": self._flushes,
+            }
+
+    def flush(self):
+        """
+        Write pending updates to disk now, if there are any.
+        """
+
+        with self._lock:
+            if not self._dirty:
+                return
+        self.save()
+
+    def close(self):
+        """
+        Stop the background flusher and write pending updates. Called
+        automatically at interpreter exit.
+        """
+
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._wakeup.notify_all()
+            flusher = self._flusher
+        if flusher is not None and flusher is not threading.current_thread():
+            flusher.join()
+        self.flush()
+
+    # ------------------------------------------------------------------
+    # Write-behind
+    # ------------------------------------------------------------------
+
+    def _mark_dirty(self):
+        # Expects self._lock to be held.
+        self._dirty += 1
+        if not self.write_behind:
+            return
+        if self._dirty_since is None:
+            self._dirty_since = time.monotonic()
+        # The flusher thread does not survive fork(); start one per process.
+        if self._flusher is None or self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._flusher = threading.Thread(
+                target=self._flush_loop, name="cache-json-flusher", daemon=True
+            )
+            self._flusher.start()
+        if self._dirty >= self.flush_max_dirty or self._dirty == 1:
+            self._wakeup.notify()
+
+    def _flush_loop(self):
+        while True:
+            with self._lock:
+                while not self._closed:
+                    if self._dirty >= self.flush_max_dirty:
+                        break
+                    if self._dirty_since is None:
+                        self._wakeup.wait()
+                        continue
+                    deadline = self._dirty_since + self.flush_interval
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+                if self._closed:
+                    return
+            try:
+                self.save()
+            except OSError as e:
+                print(f"Failed to write cache file {self.path}: {e}")
+                time.sleep(self.flush_interval)
+
+    def _tmp_path(self) -> str:
+        return self.path + ".tmp"
+
+    def _write(self, data: dict):
+        """
+        Atomically replace the JSON file with ``data``.
+        """
+
+        tmp_path = self._tmp_path()
+        encoded = json.dumps(data, ensure_ascii=False, indent=2)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(encoded)
+            if self.durability != "relaxed":
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        if self.durability != "relaxed" and hasattr(os, "O_DIRECTORY"):
+            # Make the rename itself durable.
+            fd = os.open(os.path.dirname(os.path.abspath(self.path)), os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
@@ -0,0 +1,402 @@
+import json, os, threading, zlib
+
+try:
+    import fcntl
+except ImportError:  # Windows: the single-writer rule is not enforced
+    fcntl = None
+
+
+class LogLockedError(RuntimeError):
+    """
+    Raised when opening a log that another process (or store) already owns.
+    """
+
+
+class LogStructuredStore:
+    """
+    Append-only, log-structured key-value store.
+
+    Every ``put`` or ``delete`` appends one self-describing record to the end
+    of the log file, so writes cost O(1) regardless of how many entries are
+    stored. Only an index of ``key -> (offset, length)`` is held in memory;
+    values are read back from the file on ``get``.
+
+    Record format (one line per record, UTF-8)::
+
+        <crc32 as 8 hex digits> <json [key, value]>\\n
+
+    A ``null`` value is a tombstone marking the key as deleted.
+
+    At startup the index is rebuilt by scanning the log. A torn record at the
+    end of the file (crash mid-write) is truncated away, and records whose
+    checksum does not match are skipped.
+
+    Superseded records and tombstones accumulate as garbage; a background
+    thread periodically rewrites the live records into a fresh file and
+    atomically swaps it in once the garbage ratio crosses a threshold.
+
+    The index lives in the memory of one process, so a log file must have a
+    single owner: another process appending to it would move records under
+    the index. The store takes an exclusive lock on ``<path>.lock`` (POSIX
+    only) and refuses to open a log that another process holds. As a last
+    line of defence, ``get`` checks that the record found at the indexed
+    offset belongs to the requested key and treats a mismatch as a miss.
+
+    Attributes:
+        path (str): File path of the log.
+        fsync (bool): Whether every append is fsync'ed before returning.
+        compaction_interval (float): Seconds between background compaction checks.
+            ``0`` disables the background thread.
+        compaction_min_garbage_ratio (float): Fraction of the log that must be
+            garbage before compaction runs.
+        compaction_min_bytes (int): Minimum log size before compaction is considered.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        fsync: bool = False,
+        compaction_interval: float = 60.0,
+        compaction_min_garbage_ratio: float = 0.5,
+        compaction_min_bytes: int = 1 << 20,
+    ):
+        """
+        Open (or create) the log, rebuild the index and start compaction.
+
+        Args:
+            path (str): File path of the log.
+            fsync (bool): fsync every append for durability against power loss.
+            compaction_interval (float): Seconds between compaction checks (0 disables).
+            compaction_min_garbage_ratio (float): Garbage ratio that triggers compaction.
+            compaction_min_bytes (int): Minimum log size before compaction is considered.
+        """
+
+        self.path = path
+        self.fsync = fsync
+        self.compaction_interval = compaction_interval
+        self.compaction_min_garbage_ratio = compaction_min_garbage_ratio
+        self.compaction_min_bytes = compaction_min_bytes
+
+        self._lock = threading.Lock()
+        self._index = {}
+        self._end = 0
+        self._garbage = 0
+        self._compactions = 0
+
+        self._owner = self._acquire_owner_lock()
+        self._recover()
+        self._writer = open(self.path, "ab")
+        self._reader = open(self.path, "rb")
+
+        self._stop = threading.Event()
+        self._compactor = None
+        if self.compaction_interval > 0:
+            self._compactor = threading.Thread(
+                target=self._compaction_loop, name="cache-log-compactor", daemon=True
+            )
+            self._compactor.start()
+
+    def _acquire_owner_lock(self):
+        """
+        Take the exclusive lock on ``<path>.lock``.
+
+        Returns:
+            file or None: The open lock file (None where locking is unsupported).
+
+        Raises:
+            LogLockedError: If another process already owns the log.
+        """
+
+        if fcntl is None:
+            return None
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        owner = open(self.path + ".lock", "a")
+        try:
+            fcntl.flock(owner.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            owner.close()
+            raise LogLockedError(
+                f"{self.path} is already open in another process or store; a "
+                "log file supports a single writer (use the 'sqlite' backend "
+                "to share a cache between processes)"
+            )
+        return owner
+
+    # ------------------------------------------------------------------
+    # Record encoding
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _encode(key: str, value):
+        payload = json.dumps(
+            [key, value], ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+        return b"%08x " % zlib.crc32(payload) + payload + b"\n"
+
+    @staticmethod
+    def _decode(line: bytes):
+        """
+        Decode one record line.
+
+        Returns:
+            tuple or None: ``(key, value)`` or None if the record is corrupt.
+        """
+
+        if len(line) < 11 or line[8:9] != b" " or not line.endswith(b"\n"):
+            return None
+        payload = line[9:-1]
+        try:
+            if int(line[:8], 16) != zlib.crc32(payload):
+                return None
+            key, value = json.loads(payload)
+        except ValueError:
+            return None
+        return key, value
+
+    # ------------------------------------------------------------------
+    # Startup
+    # ------------------------------------------------------------------
+
+    def _recover(self):
+        """
+        Rebuild the in-memory index by scanning the log from the start.
+
+        Truncates an incomplete trailing record left behind by a crash.
+        """
+
+        if not os.path.exists(self.path):
+            open(self.path, "wb").close()
+
+        index, garbage, offset = {}, 0, 0
+        with open(self.path, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                length = len(line)
+                record = self._decode(line)
+                if record is None:
+                    garbage += length
+                else:
+                    key, value = record
+                    old = index.pop(key, None)
+                    if old is not None:
+                        garbage += old[1]
+                    if value is None:
+                        garbage += length
+                    else:
+                        index[key] = (offset, length)
+                offset += length
+
+        if os.path.getsize(self.path) != offset:
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+        self._index, self._garbage, self._end = index, garbage, offset
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def _append(self, key: str, value):
+        record = self._encode(key, value)
+        with self._lock:
+            self._writer.write(record)
+            self._writer.flush()
+            if self.fsync:
+                os.fsync(self._writer.fileno())
+
+            old = self._index.pop(key, None)
+            if old is not None:
+                self._garbage += old[1]
+            if value is None:
+                self._garbage += len(record)
+            else:
+                self._index[key] = (self._end, len(record))
+            self._end += len(record)
+
+    def get(self, key: str):
+        """
+        Retrieve the value stored under ``key``.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            dict or None: The stored value if found, otherwise None.
+        """
+
+        with self._lock:
+            location = self._index.get(key)
+            if location is None:
+                return None
+            self._reader.seek(location[0])
+            line = self._reader.read(location[1])
+
+        record = self._decode(line)
+        if record is None or record[0] != key:
+            return None  # corrupt record, or the index no longer matches the file
+        return record[1]
+
+    def put(self, key: str, value: dict):
+        """
+        Insert or update a value by appending a record to the log.
+
+        Args:
+            key (str): Unique identifier of the entry.
+            value (dict): JSON-serializable value to store.
+        """
+
+        self._append(key, value)
+
+    def delete(self, key: str):
+        """
+        Remove ``key`` by appending a tombstone record.
+
+        Args:
+            key (str): The key to remove.
+        """
+
+        if key in self._index:
+            self._append(key, None)
+
+    def delete_many(self, keys):
+        """
+        Remove several keys, appending one tombstone per key.
+
+        Args:
+            keys (Iterable[str]): The keys to remove.
+        """
+
+        for key in keys:
+            self.delete(key)
+
+    def entry_sizes(self):
+        """
+        Yields:
+            tuple[str, int]: ``(key, record size)`` for every live entry, oldest first.
+        """
+
+        with self._lock:
+            live = sorted(self._index.items(), key=lambda item: item[1][0])
+        for key, (_, length) in live:
+            yield key, length
+
+    def keys(self):
+        """
+        Returns:
+            list[str]: A snapshot of every live key.
+        """
+
+        with self._lock:
+            return list(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Live entry count, log size, garbage bytes and completed compactions.
+        """
+
+        with self._lock:
+            return {
+                "entries": len(self._index),
+                "log_bytes": self._end,
+                "garbage_bytes": self._garbage,
+                "compactions": self._compactions,
+            }
+
+    def flush(self):
+        """
+        Force buffered appends to stable storage.
+        """
+
+        with self._lock:
+            self._writer.flush()
+            os.fsync(self._writer.fileno())
+
+    def close(self):
+        """
+        Stop the compaction thread, flush and close the log.
+        """
+
+        self._stop.set()
+        if self._compactor is not None:
+            self._compactor.join()
+        self.flush()
+        with self._lock:
+            self._writer.close()
+            self._reader.close()
+            if self._owner is not None:
+                self._owner.close()  # releases the lock
+                self._owner = None
+
+    # ------------------------------------------------------------------
+    # Compaction
+    # ------------------------------------------------------------------
+
+    def _compaction_loop(self):
+        while not self._stop.wait(self.compaction_interval):
+            if self.needs_compaction():
+                self.compact()
+
+    def needs_compaction(self) -> bool:
+        """
+        Returns:
+            bool: True when the log is large enough and mostly garbage.
+        """
+
+        with self._lock:
+            if self._end < self.compaction_min_bytes:
+                return False
+            return self._garbage / self._end >= self.compaction_min_garbage_ratio
+
+    def compact(self):
+        """
+        Rewrite the live records into a new log and atomically replace the old one.
+
+        Live records are copied without holding the lock, so writers are only
+        blocked while records appended during the copy are carried over and
+        the files are swapped.
+        """
+
+        tmp_path = self.path + ".compact"
+        with self._lock:
+            snapshot_end = self._end
+            live = sorted(self._index.items(), key=lambda item: item[1][0])
+
+        index, offset = {}, 0
+        with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+            for key, (old_offset, length) in live:
+                src.seek(old_offset)
+                dst.write(src.read(length))
+                index[key] = (offset, length)
+                offset += length
+
+            with self._lock:
+                # Carry over everything appended while we were copying.
+                self._writer.flush()
+                src.seek(snapshot_end)
+                for line in src.read(self._end - snapshot_end).splitlines(True):
+                    key, value = self._decode(line)
+                    index.pop(key, None)
+                    if value is not None:
+                        index[key] = (offset, len(line))
+                    dst.write(line)
+                    offset += len(line)
+
+                dst.flush()
+                os.fsync(dst.fileno())
+                for handle in (src, dst, self._writer, self._reader):
+                    handle.close()
+                os.replace(tmp_path, self.path)
+
+                self._writer = open(self.path, "ab")
+                self._reader = open(self.path, "rb")
+                live_bytes = sum(length for _, length in index.values())
+                self._index, self._end = index, offset
+                self._garbage = offset - live_bytes
+                self._compactions += 1
@@ -0,0 +1,234 @@
+import threading, time
+from collections import OrderedDict
+from itertools import islice
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+
+class CachePolicy:
+    """
+    Expiry and eviction policy for the insight cache.
+
+    Insights are daily, so every entry is stamped with an absolute expiry
+    time when it is written: the next local midnight of the user's timezone,
+    a fixed TTL, or whichever comes first when both are enabled.
+
+    The policy also tracks the cached keys in least-recently-used order and
+    decides which keys to evict once the cache grows beyond ``max_entries``
+    or ``max_bytes``. Expired entries are removed lazily: when they are read,
+    and opportunistically from the cold end of the LRU list on every write,
+    never by scanning the whole cache.
+
+    The policy only tracks metadata; the `Cache` applies its decisions to
+    the storage backend.
+
+    Attributes:
+        ttl_seconds (float | None): Maximum entry lifetime in seconds.
+        day_boundary (bool): Whether entries expire at the next local midnight.
+        timezone (str): IANA timezone used when the user's timezone is unknown.
+        max_entries (int | None): Maximum number of cached entries.
+        max_bytes (int | None): Maximum approximate size of all cached entries.
+    """
+
+    REAP_BATCH = 8
+
+    def __init__(
+        self,
+        ttl_seconds: float | None = None,
+        day_boundary: bool = True,
+        timezone: str = "UTC",
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            ttl_seconds (float, optional): Maximum entry lifetime in seconds.
+            day_boundary (bool): Expire entries at the next local midnight.
+            timezone (str): Default IANA timezone for the day boundary.
+            max_entries (int, optional): Entry count cap (None for unbounded).
+            max_bytes (int, optional): Approximate byte cap (None for unbounded).
+        """
+
+        self.ttl_seconds = ttl_seconds
+        self.day_boundary = day_boundary
+        self.timezone = timezone
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # key -> (expires_at or None if unknown, approximate size in bytes)
+        self._lru: OrderedDict[str, tuple[float | None, int]] = OrderedDict()
+        self._bytes = 0
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "expirations": 0,
+            "evictions_entries": 0,
+            "evictions_bytes": 0,
+        }
+
+    @staticmethod
+    def entry_size(key: str, value: dict) -> int:
+        """
+        Approximate the memory footprint of one entry.
+
+        Args:
+            key (str): Cache key.
+            value (dict): Cached value.
+
+        Returns:
+            int: Sum of the key and value string lengths.
+        """
+
+        return len(key) + sum(len(str(v)) for v in value.values())
+
+    def expires_at(self, timezone: str | None = None, now: float | None = None):
+        """
+        Compute the absolute expiry time of an entry written now.
+
+        Args:
+            timezone (str, optional): The user's IANA timezone.
+                Defaults to `self.timezone`.
+            now (float, optional): Current UNIX time, for testing.
+
+        Returns:
+            float or None: UNIX timestamp of expiry, or None if entries never expire.
+        """
+
+        now = time.time() if now is None else now
+        candidates = []
+        if self.ttl_seconds:
+            candidates.append(now + self.ttl_seconds)
+        if self.day_boundary:
+            tz = ZoneInfo(timezone or self.timezone)
+            today = datetime.fromtimestamp(now, tz).date()
+            midnight = datetime.combine(
+                today + timedelta(days=1), datetime.min.time(), tz
+            )
+            candidates.append(midnight.timestamp())
+        return min(candidates) if candidates else None
+
+    def is_enabled(self) -> bool:
+        """
+        Returns:
+            bool: True if entries carry an expiry time.
+        """
+
+        return bool(self.ttl_seconds or self.day_boundary)
+
+    def seed(self, sizes):
+        """
+        Register entries that already exist in the storage backend at startup.
+
+        Their expiry is unknown until they are read, so they are only reaped
+        on access or evicted by the size caps.
+
+        Args:
+            sizes (Iterable[tuple[str, int]]): ``(key, approximate size)`` pairs,
+                oldest first.
+
+        Returns:
+            list[str]: Keys that must be evicted to respect the caps.
+        """
+
+        with self._lock:
+            for key, size in sizes:
+                self._lru[key] = (None, size)
+                self._bytes += size
+            return self._evict_over_capacity()
+
+    def record_hit(self, key: str, expires_at: float | None):
+        """
+        Mark ``key`` as most recently used after a successful read.
+        """
+
+        with self._lock:
+            self._counters["hits"] += 1
+            entry = self._lru.get(key)
+            if entry is not None:
+                self._lru[key] = (expires_at, entry[1])
+                self._lru.move_to_end(key)
+
+    def record_miss(self):
+        with self._lock:
+            self._counters["misses"] += 1
+
+    def record_expired(self, key: str):
+        """
+        Forget ``key`` after it was found expired on read.
+        """
+
+        with self._lock:
+            self._counters["expirations"] += 1
+            self._counters["misses"] += 1
+            self._forget(key)
+
+    def admit(self, key: str, expires_at: float | None, size: int):
+        """
+        Register a write of ``key`` and decide which entries to drop.
+
+        Args:
+            key (str): Written key.
+            expires_at (float, optional): Expiry time of the written entry.
+            size (int): Approximate size of the written entry.
+
+        Returns:
+            list[str]: Keys to delete from the storage backend (expired entries
+            found at the cold end of the LRU list plus entries evicted by the caps).
+        """
+
+        with self._lock:
+            self._forget(key)
+            self._lru[key] = (expires_at, size)
+            self._bytes += size
+            return self._reap_expired(time.time()) + self._evict_over_capacity()
+
+    def forget(self, key: str):
+        with self._lock:
+            self._forget(key)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Hit/miss/expiration/eviction counters and the current size.
+        """
+
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._lru),
+                "bytes": self._bytes,
+            }
+
+    # Helpers below expect self._lock to be held.
+
+    def _forget(self, key: str):
+        entry = self._lru.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def _reap_expired(self, now: float):
+        reaped = []
+        for key, (expires_at, _) in islice(self._lru.items(), self.REAP_BATCH):
+            if expires_at is not None and expires_at <= now:
+                reaped.append(key)
+        for key in reaped:
+            self._forget(key)
+        self._counters["expirations"] += len(reaped)
+        return reaped
+
+    def _evict_over_capacity(self):
+        evicted = []
+        while self.max_entries is not None and len(self._lru) > self.max_entries:
+            key, (_, size) = self._lru.popitem(last=False)
+            self._bytes -= size
+            evicted.append(key)
+            self._counters["evictions_entries"] += 1
+        while self.max_bytes is not None and self._bytes > self.max_bytes:
+            key, (_, size) = self._lru.popitem(last=False)
+            self._bytes -= size
+            evicted.append(key)
+            self._counters["evictions_bytes"] += 1
+        return evicted
@@ -0,0 +1,245 @@
+import hashlib, json, threading, time
+from collections import OrderedDict
+
+from config.config import Config
+from src.cache.cache import Cache
+from src.cache.log_store import LogLockedError, LogStructuredStore
+from src.cache.sqlite_store import SqliteStore
+from src.cache.policy import CachePolicy
+
+
+class ResponseCache:
+    """
+    Cache of LLM replies keyed by the rendered prompt and generation parameters.
+
+    The insight prompt only depends on name, zodiac sign and language, so
+    every user sharing those three values (e.g. every "Priya" born under Leo,
+    whatever the year) produces the same prompt. This cache lets them share
+    one LLM reply instead of paying for one call per (name, birth_date).
+
+    Replies are daily insights: each one is stamped with an expiry time by a
+    `CachePolicy` (next local midnight of `timezone` and/or a TTL) and the
+    persistent tier is capped with LRU eviction, like the insight `Cache`.
+    Lookups check a bounded in-memory LRU tier first, then the persistent
+    tier; persistent hits are promoted into memory.
+
+    Use `ResponseCache.shared()` to get the process-wide instance configured
+    by `Config.PROMPT_CACHE`. With the "sqlite" cache backend (alone or as
+    the delta of the "snapshot" backend), the persistent tier is a table of
+    `Config.CACHE_SQLITE_FILE`, shared by worker processes, which then
+    enforces the caps itself. If another process already owns the log file
+    (e.g. a running server, seen from a maintenance job), the shared cache
+    falls back to memory only instead of failing.
+
+    Attributes:
+        store (LogStructuredStore | SqliteStore | None): Persistent tier, or
+            None for a memory-only cache.
+        policy (CachePolicy): Expiry and eviction policy of the persistent tier.
+        max_memory_entries (int): Capacity of the in-memory tier.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        path: str | None = None,
+        policy: CachePolicy | None = None,
+        max_memory_entries: int = 10_000,
+        store=None,
+    ):
+        """
+        Open the persistent tier and register its existing entries.
+
+        Args:
+            path (str, optional): Log file of the persistent tier. None keeps
+                the cache in memory only.
+            policy (CachePolicy, optional): Expiry and eviction policy.
+                Defaults to daily expiry in UTC with no caps.
+            max_memory_entries (int): Capacity of the in-memory tier.
+            store (optional): Ready-made persistent tier, used instead of
+                opening ``path``.
+        """
+
+        if store is None and path:
+            store = LogStructuredStore(
+                path, compaction_interval=Config.CACHE_LOG["COMPACTION_INTERVAL"]
+            )
+        self.store = store
+        self.policy = policy or CachePolicy()
+        self.max_memory_entries = max_memory_entries
+
+        self._lock = threading.Lock()
+        # key -> (reply, expires_at)
+        self._memory: OrderedDict[str, tuple[str, float | None]] = OrderedDict()
+        self._memory_hits = 0
+        self._stores = 0
+
+        self._shared_store = getattr(store, "manages_capacity", False)
+        if store is not None and not self._shared_store:
+            evicted = self.policy.seed(store.entry_sizes())
+            if evicted:
+                store.delete_many(evicted)
+
+    @classmethod
+    def shared(cls) -> "ResponseCache":
+        """
+        Returns:
+            ResponseCache: The process-wide cache configured by `Config.PROMPT_CACHE`.
+        """
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                settings = Config.PROMPT_CACHE
+                store = None
+                if Cache.writable_backend() == "sqlite":
+                    store = SqliteStore(
+                        Config.CACHE_SQLITE_FILE,
+                        table="responses",
+                        busy_timeout=Config.CACHE_SQLITE["BUSY_TIMEOUT"],
+                        max_entries=settings["MAX_ENTRIES"],
+                        max_bytes=settings["MAX_BYTES"],
+                        maintenance_interval=Config.CACHE_SQLITE[
+                            "MAINTENANCE_INTERVAL"
+                        ],
+                    )
+                policy = CachePolicy(
+                    ttl_seconds=settings["TTL_SECONDS"],
+                    day_boundary=settings["DAY_BOUNDARY"],
+                    timezone=settings["TIMEZONE"],
+                    max_entries=settings["MAX_ENTRIES"],
+                    max_bytes=settings["MAX_BYTES"],
+                )
+                try:
+                    cls._shared = cls(
+                        settings["FILE"],
+                        policy=policy,
+                        max_memory_entries=settings["MAX_MEMORY_ENTRIES"],
+                        store=store,
+                    )
+                except LogLockedError as e:
+                    print(f"Prompt cache kept in memory only: {e}")
+                    cls._shared = cls(
+                        None,
+                        policy=policy,
+                        max_memory_entries=settings["MAX_MEMORY_ENTRIES"],
+                    )
+            return cls._shared
+
+    @staticmethod
+    def key(prompt: str, model: str, params: dict | None = None) -> str:
+        """
+        Args:
+            prompt (str): The fully rendered prompt.
+            model (str): Model identifier.
+            params (dict, optional): Generation parameters (temperature, ...).
+
+        Returns:
+            str: SHA-256 hex digest identifying the request.
+        """
+
+        canonical = json.dumps(
+            {"model": model, "params": params or {}, "prompt": prompt},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """
+        Look up a cached reply. Expired entries are dropped and reported as a miss;
+        entries written without an expiry are stamped with the current policy's.
+
+        Args:
+            key (str): Key from `ResponseCache.key`.
+
+        Returns:
+            str or None: The cached reply, or None on a miss.
+        """
+
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                reply, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._memory_hits += 1
+                    return reply
+                del self._memory[key]
+
+        value = self.store.get(key) if self.store is not None else None
+        if value is None:
+            self.policy.record_miss()
+            return None
+
+        expires_at = value.get("expires_at")
+        if self.policy.is_enabled() and expires_at is None:
+            expires_at = self.policy.expires_at(now=now)
+            value = {**value, "expires_at": expires_at}
+            self.store.put(key, value)
+        if self.policy.is_enabled() and expires_at <= now:
+            self.store.delete(key)
+            self.policy.record_expired(key)
+            return None
+
+        self.policy.record_hit(key, expires_at)
+        with self._lock:
+            self._remember(key, value["text"], expires_at)
+        return value["text"]
+
+    def put(self, key: str, reply: str):
+        """
+        Cache a reply in both tiers.
+
+        Args:
+            key (str): Key from `ResponseCache.key`.
+            reply (str): The LLM reply.
+        """
+
+        value = {"text": reply}
+        expires_at = self.policy.expires_at()
+        if expires_at is not None:
+            value["expires_at"] = expires_at
+
+        dropped = []
+        if self.store is not None:
+            self.store.put(key, value)
+            if not self._shared_store:
+                size = CachePolicy.entry_size(key, value)
+                dropped = self.policy.admit(key, expires_at, size)
+                if dropped:
+                    self.store.delete_many(dropped)
+
+        with self._lock:
+            self._stores += 1
+            for old in dropped:
+                self._memory.pop(old, None)
+            self._remember(key, reply, expires_at)
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            dict: Memory hits, persistent-tier hit/miss/expiration/eviction
+            counters and sizes, stores and the memory tier size.
+        """
+
+        stats = self.policy.stats()
+        if self._shared_store:
+            store_stats = self.store.stats()
+            stats["expirations"] += store_stats.pop("expirations")
+            stats.update(store_stats)
+        with self._lock:
+            stats.update(
+                memory_hits=self._memory_hits,
+                memory_entries=len(self._memory),
+                stores=self._stores,
+            )
+        return stats
+
+    def _remember(self, key: str, reply: str, expires_at: float | None):
+        # Expects self._lock to be held.
+        self._memory[key] = (reply, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
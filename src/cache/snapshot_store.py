@@ -0,0 +1,542 @@
+"""
+snapshot_store.py
+
+Compact, memory-mapped snapshot of the insight cache.
+
+Loading ``cache.json`` turns every entry into Python objects at boot, which
+at millions of entries costs seconds of startup and gigabytes of memory in
+every worker. A snapshot is a binary file that is memory-mapped instead:
+opening it costs the same at any size, nothing is decoded until a key is
+read, and worker processes share its pages through the page cache.
+
+Snapshot format (little-endian)
+-------------------------------
+- header ``<8sIIIQQQ``: magic ``b"CACHSNP1"``, number of entries, flags (bit
+  0: values compressed), length of the zlib dictionary, then the byte
+  offsets of the values, hashes and positions sections.
+- zlib dictionary: preset dictionary shared by every compressed value.
+- values: one record per entry, oldest first: a ``<I`` length, then the
+  UTF-8 JSON ``[key, value]``, raw-deflate compressed with the dictionary
+  if the flag is set.
+- hashes: ``<Q`` 64-bit BLAKE2b hash of every key, sorted.
+- positions: ``<Q`` offset of the record of every hash, in the same order.
+
+A lookup is a binary search over the hashes followed by decoding the one
+record found (its key is compared, so hash collisions are harmless).
+
+Snapshots are immutable. `SnapshotStore` serves them as a cache backend
+with a writable delta store in front, and the command line below converts
+the JSON cache and merges the delta into a new snapshot.
+
+Usage
+-----
+    python -m src.cache.snapshot_store convert cache_db/cache.json cache_db/cache.snap
+    python -m src.cache.snapshot_store merge   # fold the delta in (server stopped)
+    python -m src.cache.snapshot_store info cache_db/cache.snap
+"""
+
+import argparse, bisect, hashlib, json, mmap, os, struct, sys, threading, time, zlib
+from array import array
+
+MAGIC = b"CACHSNP1"
+# magic, entry count, flags, zdict length, values offset, hashes offset,
+# positions offset
+HEADER = struct.Struct("<8sIIIQQQ")
+RECORD_LENGTH = struct.Struct("<I")
+FLAG_COMPRESSED = 1
+ZDICT_SIZE = 32 * 1024
+
+
+def key_hash(key: str) -> int:
+    """
+    Returns:
+        int: 64-bit hash of ``key``, the sort and search key of the index.
+    """
+
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+def _train_zdict(payloads: list[bytes]) -> bytes:
+    # A preset dictionary is text assumed to precede every value; records
+    # sampled across the snapshot hold the field names and common phrases.
+    step = max(len(payloads) // 2000, 1)
+    return b"".join(payloads[::step])[-ZDICT_SIZE:]
+
+
+def write_snapshot(items, path: str, compress: bool = True) -> int:
+    """
+    Write a snapshot file from ``(key, value)`` pairs, atomically.
+
+    Args:
+        items (Iterable[tuple[str, dict]]): Entries, oldest first. A key that
+            appears again moves to the end with its new value.
+        path (str): Destination file; replaced only once fully written.
+        compress (bool): Compress the values with zlib and a dictionary
+            trained on them.
+
+    Returns:
+        int: Number of entries written.
+    """
+
+    entries = {}
+    for key, value in items:
+        entries.pop(key, None)
+        entries[key] = value
+    hashes = array("Q", (key_hash(key) for key in entries))
+    payloads = [
+        json.dumps([k, v], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        for k, v in entries.items()
+    ]
+    del entries
+
+    zdict = _train_zdict(payloads) if compress and payloads else b""
+    positions = array("Q")
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * HEADER.size)
+        f.write(zdict)
+        values_offset = f.tell()
+        for payload in payloads:
+            if compress:
+                compressor = zlib.compressobj(9, zlib.DEFLATED, -15, zdict=zdict)
+                payload = compressor.compress(payload) + compressor.flush()
+            positions.append(f.tell())
+            f.write(RECORD_LENGTH.pack(len(payload)))
+            f.write(payload)
+
+        order = sorted(range(len(hashes)), key=hashes.__getitem__)
+        sorted_hashes = array("Q", (hashes[i] for i in order))
+        sorted_positions = array("Q", (positions[i] for i in order))
+        if sys.byteorder != "little":
+            sorted_hashes.byteswap()
+            sorted_positions.byteswap()
+
+        f.write(b"\0" * (-f.tell() % 8))
+        hashes_offset = f.tell()
+        sorted_hashes.tofile(f)
+        positions_offset = f.tell()
+        sorted_positions.tofile(f)
+
+        f.seek(0)
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                len(payloads),
+                FLAG_COMPRESSED if compress else 0,
+                len(zdict),
+                values_offset,
+                hashes_offset,
+                positions_offset,
+            )
+        )
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return len(payloads)
+
+
+class _U64Array:
+    """
+    Read-only little-endian uint64 array over a buffer, for big-endian hosts
+    (on little-endian ones a cast memoryview is used directly).
+    """
+
+    _U64 = struct.Struct("<Q")
+
+    def __init__(self, buffer, offset: int, count: int):
+        self._buffer, self._offset, self._count = buffer, offset, count
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, i: int) -> int:
+        if not 0 <= i < self._count:
+            raise IndexError(i)
+        return self._U64.unpack_from(self._buffer, self._offset + 8 * i)[0]
+
+
+class Snapshot:
+    """
+    Read-only view of a snapshot file through a memory map.
+
+    Thread-safe: lookups only read the map.
+
+    Attributes:
+        path (str): File path of the snapshot.
+        compressed (bool): Whether values are compressed.
+    """
+
+    def __init__(self, path: str):
+        """
+        Map the file and check its header. Nothing else is read.
+
+        Args:
+            path (str): File path of the snapshot.
+
+        Raises:
+            ValueError: If the file is not a snapshot.
+        """
+
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mmap) < HEADER.size:
+            raise ValueError(f"{path} is not a cache snapshot")
+        (
+            magic,
+            self._count,
+            flags,
+            zdict_length,
+            self._values_offset,
+            hashes_offset,
+            positions_offset,
+        ) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a cache snapshot")
+
+        self.compressed = bool(flags & FLAG_COMPRESSED)
+        self._zdict = bytes(self._mmap[HEADER.size : HEADER.size + zdict_length])
+        if sys.byteorder == "little":
+            view = memoryview(self._mmap)
+            self._hashes = view[hashes_offset:positions_offset].cast("Q")
+            self._positions = view[
+                positions_offset : positions_offset + 8 * self._count
+            ].cast("Q")
+        else:
+            self._hashes = _U64Array(self._mmap, hashes_offset, self._count)
+            self._positions = _U64Array(self._mmap, positions_offset, self._count)
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def size(self) -> int:
+        return len(self._mmap)
+
+    def get(self, key: str):
+        """
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            dict or None: The value stored under ``key``, decoded on the fly.
+        """
+
+        target = key_hash(key)
+        i = bisect.bisect_left(self._hashes, target)
+        while i < self._count and self._hashes[i] == target:
+            stored_key, value = self._record(self._positions[i])[0]
+            if stored_key == key:
+                return value
+            i += 1
+        return None
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def items(self):
+        """
+        Yields:
+            tuple[str, dict]: Every entry, oldest first.
+        """
+
+        position = self._values_offset
+        for _ in range(self._count):
+            (key, value), position = self._record(position)
+            yield key, value
+
+    def close(self):
+        # Views over the map must be released before it can be closed.
+        if isinstance(self._hashes, memoryview):
+            self._hashes.release()
+            self._positions.release()
+        self._mmap.close()
+
+    def _record(self, position: int):
+        (length,) = RECORD_LENGTH.unpack_from(self._mmap, position)
+        start = position + RECORD_LENGTH.size
+        payload = self._mmap[start : start + length]
+        if self.compressed:
+            payload = zlib.decompressobj(-15, zdict=self._zdict).decompress(payload)
+        return json.loads(payload), start + length
+
+
+class SnapshotStore:
+    """
+    Cache backend serving a memory-mapped `Snapshot` behind a writable delta.
+
+    Reads check the delta store first, then the snapshot; writes and deletes
+    go to the delta (a `LogStructuredStore`, or a `SqliteStore` shared by
+    several worker processes). The snapshot itself is never modified while
+    it is served: ``merge`` folds the delta into a new snapshot offline.
+
+    Snapshot entries are daily insights; once their ``expires_at`` has
+    passed they are reported as missing. A snapshot key deleted at run time
+    is hidden in this process only, until the next merge drops it.
+
+    The snapshot is capped by ``merge``, which keeps only the newest
+    ``max_entries`` entries; the per-process `CachePolicy` would have to
+    decode every snapshot entry at startup to track them. The delta is capped
+    like a standalone store: a `SqliteStore` delta enforces the caps itself
+    (``manages_capacity`` is then true), while the policy of `Cache` tracks
+    and evicts the keys of any other delta.
+
+    Attributes:
+        path (str): File path of the snapshot (it may not exist yet).
+        delta: Writable store in front of the snapshot.
+        snapshot (Snapshot | None): The mapped snapshot, if the file exists.
+        manages_capacity (bool): Whether the delta enforces expiry and caps
+            itself.
+    """
+
+    def __init__(self, path: str, delta):
+        """
+        Map the snapshot, if any. Startup cost does not depend on its size.
+
+        Args:
+            path (str): File path of the snapshot.
+            delta: Writable store (`LogStructuredStore` or `SqliteStore`).
+        """
+
+        self.path = path
+        self.delta = delta
+        self.manages_capacity = getattr(delta, "manages_capacity", False)
+        self.snapshot = Snapshot(path) if os.path.exists(path) else None
+        self._lock = threading.Lock()
+        self._hidden = set()
+        self._expirations = 0
+
+    def get(self, key: str):
+        """
+        Retrieve the value stored under ``key``.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            dict or None: The stored value if found, otherwise None.
+        """
+
+        value = self.delta.get(key)
+        if value is not None or self.snapshot is None or key in self._hidden:
+            return value
+
+        value = self.snapshot.get(key)
+        if value is not None:
+            expires_at = value.get("expires_at")
+            if expires_at is not None and expires_at <= time.time():
+                with self._lock:
+                    self._expirations += 1
+                return None
+        return value
+
+    def put(self, key: str, value: dict):
+        """
+        Insert or update a value in the delta store.
+
+        Args:
+            key (str): Unique identifier of the entry.
+            value (dict): JSON-serializable value to store.
+        """
+
+        self.delta.put(key, value)
+        if key in self._hidden:
+            with self._lock:
+                self._hidden.discard(key)
+
+    def delete(self, key: str):
+        """
+        Remove ``key`` from the delta store and hide its snapshot entry.
+
+        Args:
+            key (str): The key to remove.
+        """
+
+        self.delete_many([key])
+
+    def delete_many(self, keys):
+        """
+        Remove several keys.
+
+        Args:
+            keys (Iterable[str]): The keys to remove.
+        """
+
+        keys = list(keys)
+        self.delta.delete_many(keys)
+        if self.snapshot is not None:
+            in_snapshot = [key for key in keys if key in self.snapshot]
+            with self._lock:
+                self._hidden.update(in_snapshot)
+
+    def items(self):
+        """
+        Yields:
+            tuple[str, dict]: Every visible entry, snapshot entries first
+            (oldest first), then the delta's. Expired entries are included.
+        """
+
+        delta_keys = self.delta.keys()
+        overridden = set(delta_keys) | self._hidden
+        if self.snapshot is not None:
+            for key, value in self.snapshot.items():
+                if key not in overridden:
+                    yield key, value
+        for key in delta_keys:
+            value = self.delta.get(key)
+            if value is not None:
+                yield key, value
+
+    def entry_sizes(self):
+        """
+        Yields:
+            tuple[str, int]: ``(key, approximate size)`` for every entry,
+            oldest first. Decodes the whole snapshot.
+        """
+
+        for key, value in self.items():
+            yield key, len(key) + sum(len(str(v)) for v in value.values())
+
+    def keys(self):
+        """
+        Returns:
+            list[str]: Every visible key. Decodes the whole snapshot.
+        """
+
+        return [key for key, _ in self.items()]
+
+    def __len__(self):
+        # Approximate: keys both in the delta and the snapshot count twice.
+        return len(self.delta) + (len(self.snapshot) if self.snapshot else 0)
+
+    def stats(self):
+        """
+        Returns:
+            dict: The delta store's counters and sizes, plus the snapshot's
+            entry count and file size and the expired snapshot reads.
+        """
+
+        stats = {"expirations": 0, **self.delta.stats()}
+        with self._lock:
+            stats["expirations"] += self._expirations
+        stats["snapshot_entries"] = len(self.snapshot) if self.snapshot else 0
+        stats["snapshot_bytes"] = self.snapshot.size if self.snapshot else 0
+        return stats
+
+    def flush(self):
+        """
+        Flush the delta store.
+        """
+
+        self.delta.flush()
+
+    def close(self):
+        """
+        Close the delta store and unmap the snapshot.
+        """
+
+        self.delta.close()
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+    def merge(self, max_entries: int | None = None, compress: bool = True) -> int:
+        """
+        Write a new snapshot holding the current entries, then empty the delta.
+
+        Expired entries are dropped and only the newest ``max_entries`` are
+        kept. The new file replaces the old one atomically; processes that
+        still map the old snapshot keep reading it until they reopen the
+        store, so run this with the server stopped (e.g. at deploy time).
+
+        Args:
+            max_entries (int, optional): Maximum number of entries kept.
+            compress (bool): Compress the values of the new snapshot.
+
+        Returns:
+            int: Number of entries in the new snapshot.
+        """
+
+        now = time.time()
+        delta_keys = self.delta.keys()
+        entries = [
+            (key, value)
+            for key, value in self.items()
+            if value.get("expires_at") is None or value["expires_at"] > now
+        ]
+        if max_entries is not None:
+            entries = entries[-max_entries:] if max_entries > 0 else []
+
+        count = write_snapshot(entries, self.path, compress=compress)
+        if self.snapshot is not None:
+            self.snapshot.close()
+        self.snapshot = Snapshot(self.path)
+        self.delta.delete_many(delta_keys)
+        with self._lock:
+            self._hidden.clear()
+        return count
+
+
+def convert_json(json_path: str, snapshot_path: str, compress: bool = True) -> int:
+    """
+    Convert a ``cache.json`` file of the "json" backend into a snapshot.
+
+    Returns:
+        int: Number of entries written.
+    """
+
+    with open(json_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return write_snapshot(data.items(), snapshot_path, compress=compress)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build and inspect cache snapshots.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    convert = commands.add_parser("convert", help="JSON cache file -> snapshot")
+    convert.add_argument("json_path")
+    convert.add_argument("snapshot_path", nargs="?")
+    convert.add_argument("--no-compress", action="store_true")
+
+    merge = commands.add_parser("merge", help="fold the delta into the snapshot")
+    merge.add_argument("--no-compress", action="store_true")
+
+    info = commands.add_parser("info", help="describe a snapshot")
+    info.add_argument("snapshot_path", nargs="?")
+    args = parser.parse_args()
+
+    from config.config import Config
+
+    if args.command == "convert":
+        path = args.snapshot_path or Config.CACHE_SNAPSHOT["FILE"]
+        started = time.perf_counter()
+        count = convert_json(args.json_path, path, compress=not args.no_compress)
+        print(
+            f"Wrote {count} entries to {path} "
+            f"({os.path.getsize(path) / 2**20:.1f} MiB) "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+    elif args.command == "merge":
+        from src.cache.cache import Cache
+
+        cache = Cache(backend="snapshot")
+        count = cache.store.merge(
+            max_entries=Config.CACHE_POLICY["MAX_ENTRIES"],
+            compress=not args.no_compress,
+        )
+        cache.close()
+        print(f"Merged {count} entries into {cache.CACHE_FILE}")
+    else:
+        snapshot = Snapshot(args.snapshot_path or Config.CACHE_SNAPSHOT["FILE"])
+        print(
+            f"{snapshot.path}: {len(snapshot)} entries, "
+            f"{snapshot.size / 2**20:.1f} MiB, "
+            f"{'compressed' if snapshot.compressed else 'uncompressed'}"
+        )
+        snapshot.close()
+
+
+if __name__ == "__main__":
+    main()
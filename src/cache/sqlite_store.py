@@ -0,0 +1,389 @@
+import json, os, sqlite3, threading, time
+
+
+class SqliteStore:
+    """
+    Key-value store backed by an SQLite database in WAL mode.
+
+    Unlike the file-backed stores, which keep their state in the memory of
+    one process, every read and write goes to the database, so several
+    processes (e.g. pre-forked server workers) share one consistent cache.
+    WAL journaling lets readers proceed while one writer commits, and each
+    write is a single atomic transaction, so concurrent writers never
+    corrupt or clobber each other's entries.
+
+    Because the data is shared, the store also enforces expiry and capacity
+    itself instead of leaving it to the per-process `CachePolicy`: each row
+    records its expiry time, size and last access time, and every
+    ``maintenance_interval`` seconds a background thread deletes expired rows
+    and then the least recently used rows beyond ``max_entries`` /
+    ``max_bytes``. Both lookups are indexed, and the row count and total size
+    are kept up to date by triggers in a one-row totals table, so neither
+    maintenance nor ``stats`` scans the table and writes never wait for it.
+
+    Connections are opened lazily per thread and per process, and the
+    maintenance thread is started by the first write of each process, so an
+    instance created before ``fork()`` (e.g. by a preloaded server app) stays
+    usable in every worker.
+
+    Attributes:
+        path (str): File path of the database.
+        table (str): Table holding the entries, so several caches can share
+            one database file.
+        max_entries (int | None): Maximum number of rows.
+        max_bytes (int | None): Maximum approximate size of all rows.
+        maintenance_interval (float): Seconds between background expiry/eviction
+            passes. ``0`` disables the background thread.
+        touch_interval (float): Minimum seconds between last-access updates of a row,
+            which keeps hot reads from turning into writes.
+    """
+
+    manages_capacity = True
+
+    def __init__(
+        self,
+        path: str,
+        table: str = "entries",
+        busy_timeout: float = 5.0,
+        max_entries: int | None = None,
+        max_bytes: int | None = None,
+        maintenance_interval: float = 5.0,
+        touch_interval: float = 60.0,
+    ):
+        """
+        Open (or create) the database and its table.
+
+        Args:
+            path (str): File path of the database.
+            table (str): Table holding the entries.
+            busy_timeout (float): Seconds to wait for a lock held by another writer.
+            max_entries (int, optional): Row count cap (None for unbounded).
+            max_bytes (int, optional): Approximate byte cap (None for unbounded).
+            maintenance_interval (float): Seconds between expiry/eviction passes.
+            touch_interval (float): Seconds between last-access updates of a row.
+        """
+
+        if not table.isidentifier():
+            raise ValueError(f"Invalid table name: {table!r}")
+
+        self.path = path
+        self.table = table
+        self.busy_timeout = busy_timeout
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.maintenance_interval = maintenance_interval
+        self.touch_interval = touch_interval
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._stop = threading.Event()
+        self._maintainer = None
+        self._maintainer_pid = None
+        self._counters = {
+            "expirations": 0,
+            "evictions_entries": 0,
+            "evictions_bytes": 0,
+        }
+
+        table = self.table
+        with self._connect() as db:
+            # One transaction, so no row is written between seeding the
+            # totals and creating the triggers that keep them up to date.
+            db.execute("BEGIN IMMEDIATE")
+            db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " expires_at REAL,"
+                " accessed_at REAL NOT NULL)"
+            )
+            for column in ("accessed_at", "expires_at"):
+                db.execute(
+                    f"CREATE INDEX IF NOT EXISTS {table}_{column}"
+                    f" ON {table} ({column})"
+                )
+            db.execute(
+                f"CREATE TABLE IF NOT EXISTS {table}_totals ("
+                " id INTEGER PRIMARY KEY CHECK (id = 0),"
+                " entries INTEGER NOT NULL,"
+                " bytes INTEGER NOT NULL)"
+            )
+            db.execute(
+                f"INSERT OR IGNORE INTO {table}_totals"
+                f" SELECT 0, COUNT(*), COALESCE(SUM(size), 0) FROM {table}"
+            )
+            for event, change in (
+                ("INSERT", "entries = entries + 1, bytes = bytes + new.size"),
+                ("DELETE", "entries = entries - 1, bytes = bytes - old.size"),
+                ("UPDATE OF size", "bytes = bytes + new.size - old.size"),
+            ):
+                db.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {table}_{event.split()[0].lower()}"
+                    f" AFTER {event} ON {table}"
+                    f" BEGIN UPDATE {table}_totals SET {change}; END"
+                )
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Returns:
+            sqlite3.Connection: The calling thread's connection, opened on
+            first use in this thread and process.
+        """
+
+        pid = os.getpid()
+        db = getattr(self._local, "db", None)
+        if db is not None and self._local.pid == pid:
+            return db
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        db = sqlite3.connect(
+            self.path, timeout=self.busy_timeout, check_same_thread=False
+        )
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        self._local.db, self._local.pid = db, pid
+        with self._lock:
+            if any(owner != pid for owner, _ in self._connections):
+                # Connections inherited across fork() belong to the parent;
+                # drop them without closing, which could disturb its locks.
+                self._connections = []
+            self._connections.append((pid, db))
+        return db
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, key: str):
+        """
+        Retrieve the value stored under ``key``.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            dict or None: The stored value if found, otherwise None.
+        """
+
+        db = self._connect()
+        row = db.execute(
+            f"SELECT value, accessed_at FROM {self.table} WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        now = time.time()
+        if now - row[1] >= self.touch_interval:
+            with db:
+                db.execute(
+                    f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?",
+                    (now, key),
+                )
+        return json.loads(row[0])
+
+    def put(self, key: str, value: dict):
+        """
+        Insert or update a value in one transaction.
+
+        Args:
+            key (str): Unique identifier of the entry.
+            value (dict): JSON-serializable value to store. Its ``expires_at``
+                field, if any, is used to reap the row once expired.
+        """
+
+        payload = json.dumps(value, ensure_ascii=False)
+        size = len(key) + sum(len(str(v)) for v in value.values())
+        now = time.time()
+        db = self._connect()
+        with db:
+            # An upsert rather than INSERT OR REPLACE, whose implicit delete
+            # would not fire the trigger maintaining the totals.
+            db.execute(
+                f"INSERT INTO {self.table}"
+                " (key, value, size, expires_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (key) DO UPDATE SET value = excluded.value,"
+                " size = excluded.size, expires_at = excluded.expires_at,"
+                " accessed_at = excluded.accessed_at",
+                (key, payload, size, value.get("expires_at"), now),
+            )
+        self._start_maintainer()
+
+    def delete(self, key: str):
+        """
+        Remove ``key`` from the store if present.
+
+        Args:
+            key (str): The key to remove.
+        """
+
+        self.delete_many([key])
+
+    def delete_many(self, keys):
+        """
+        Remove several keys in one transaction.
+
+        Args:
+            keys (Iterable[str]): The keys to remove.
+        """
+
+        db = self._connect()
+        with db:
+            db.executemany(
+                f"DELETE FROM {self.table} WHERE key = ?", ((key,) for key in keys)
+            )
+
+    def maintain(self, now: float | None = None):
+        """
+        Delete expired rows, then evict least recently used rows beyond the caps.
+
+        Called every ``maintenance_interval`` seconds by the background
+        thread. Runs in one write transaction, so concurrent maintenance
+        passes from several processes serialize instead of evicting twice.
+
+        Args:
+            now (float, optional): Current UNIX time, for testing.
+        """
+
+        now = time.time() if now is None else now
+        db = self._connect()
+        with db:
+            expired = db.execute(
+                f"DELETE FROM {self.table} WHERE expires_at <= ?", (now,)
+            ).rowcount
+            count, total = self._totals(db)
+
+            by_entries = by_bytes = 0
+            if self.max_entries is not None and count > self.max_entries:
+                by_entries = count - self.max_entries
+                self._evict_oldest(db, by_entries)
+                total = self._totals(db)[1]
+            if self.max_bytes is not None and total > self.max_bytes:
+                by_bytes = self._evict_bytes(db, total - self.max_bytes)
+
+        with self._lock:
+            self._counters["expirations"] += max(expired, 0)
+            self._counters["evictions_entries"] += by_entries
+            self._counters["evictions_bytes"] += by_bytes
+
+    def entry_sizes(self):
+        """
+        Yields:
+            tuple[str, int]: ``(key, approximate size)`` for every entry,
+            least recently used first.
+        """
+
+        yield from self._connect().execute(
+            f"SELECT key, size FROM {self.table} ORDER BY accessed_at"
+        ).fetchall()
+
+    def keys(self):
+        """
+        Returns:
+            list[str]: A snapshot of every stored key.
+        """
+
+        rows = self._connect().execute(f"SELECT key FROM {self.table}").fetchall()
+        return [key for (key,) in rows]
+
+    def __len__(self):
+        return self._totals(self._connect())[0]
+
+    def stats(self):
+        """
+        Returns:
+            dict: Number and approximate size of the stored entries (across
+            all processes) plus this process's expiration and eviction counters.
+        """
+
+        count, total = self._totals(self._connect())
+        with self._lock:
+            return {**self._counters, "entries": count, "bytes": total}
+
+    def flush(self):
+        """
+        Checkpoint the write-ahead log into the database file. Committed writes
+        are already durable, so this only bounds the size of the WAL file.
+        """
+
+        self._connect().execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def close(self):
+        """
+        Stop the maintenance thread and close every connection this process
+        opened.
+        """
+
+        pid = os.getpid()
+        self._stop.set()
+        maintainer = self._maintainer
+        if self._maintainer_pid == pid and maintainer is not threading.current_thread():
+            maintainer.join()
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for owner, db in connections:
+            if owner == pid:
+                db.close()
+        self._local = threading.local()
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def _start_maintainer(self):
+        # The maintenance thread does not survive fork(); start one per process.
+        pid = os.getpid()
+        if self.maintenance_interval <= 0 or self._maintainer_pid == pid:
+            return
+        with self._lock:
+            if self._maintainer_pid == pid:
+                return
+            self._maintainer_pid = pid
+            self._stop = threading.Event()
+            self._maintainer = threading.Thread(
+                target=self._maintenance_loop,
+                args=(self._stop,),
+                name="cache-sqlite-maintainer",
+                daemon=True,
+            )
+            self._maintainer.start()
+
+    def _maintenance_loop(self, stop: threading.Event):
+        while not stop.wait(self.maintenance_interval):
+            try:
+                self.maintain()
+            except sqlite3.Error as e:
+                print(f"Failed to maintain cache table {self.table}: {e}")
+
+    def _totals(self, db) -> tuple[int, int]:
+        return db.execute(
+            f"SELECT entries, bytes FROM {self.table}_totals"
+        ).fetchone()
+
+    # Helpers below run inside the maintenance transaction.
+
+    def _evict_oldest(self, db, count: int):
+        db.execute(
+            f"DELETE FROM {self.table} WHERE key IN (SELECT key FROM {self.table}"
+            " ORDER BY accessed_at LIMIT ?)",
+            (count,),
+        )
+
+    def _evict_bytes(self, db, excess: int) -> int:
+        evicted, freed = [], 0
+        for key, size in db.execute(
+            f"SELECT key, size FROM {self.table} ORDER BY accessed_at"
+        ):
+            if freed >= excess:
+                break
+            evicted.append((key,))
+            freed += size
+        db.executemany(f"DELETE FROM {self.table} WHERE key = ?", evicted)
+        return len(evicted)
@@ -0,0 +1,239 @@
+"""
+build_gazetteer.py
+
+Offline builder of the binary place index used by `Gazetteer`.
+
+Reads a local gazetteer file and writes a compact, sorted, memory-mappable
+index that resolves place names (and alternate names) to coordinates and an
+IANA timezone.
+
+Input formats
+-------------
+tsv (default)
+    The bundled `data/cities.tsv`: tab-separated columns ``name,
+    alternate_names (comma-separated), country_code, country_name, admin1,
+    latitude, longitude, population, timezone``. Lines starting with ``#``
+    are ignored.
+geonames
+    A GeoNames ``cities*.txt`` / ``allCountries.txt`` dump. Country names are
+    taken from ``--country-info`` (GeoNames ``countryInfo.txt``) if given.
+
+Index format (little-endian)
+----------------------------
+- header ``<8sIIIIIII``: magic ``b"GAZIDX1\\0"``, number of places, number of
+  keys, then byte offsets of the places, keys, strings and metadata sections
+  and the metadata length.
+- places: one ``PLACE`` record per place (latitude, longitude, population,
+  timezone index, country index, name and admin1 string references).
+- keys: one ``KEY`` record per normalized name or alternate name, sorted by
+  key bytes, each pointing at its key string and place.
+- strings: UTF-8 blob referenced by (offset, length) pairs.
+- metadata: JSON ``{"timezones": [...], "countries": [[code, name], ...]}``.
+
+Usage
+-----
+    python -m src.geo.build_gazetteer
+    python -m src.geo.build_gazetteer --format geonames cities15000.txt \\
+        --country-info countryInfo.txt --out places.gaz
+"""
+
+import argparse
+import json
+import os
+import re
+import struct
+import unicodedata
+
+MAGIC = b"GAZIDX1\0"
+HEADER = struct.Struct("<8sIIIIIII")
+# latitude, longitude, population, timezone idx, country idx,
+# name offset, name length, admin1 offset, admin1 length
+PLACE = struct.Struct("<ffIHHIHIH")
+# key offset, key length, place idx
+KEY = struct.Struct("<IHI")
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+DEFAULT_SOURCE = os.path.join(DATA_DIR, "cities.tsv")
+DEFAULT_PATH = os.path.join(DATA_DIR, "places.gaz")
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize a place name for matching: accents removed, lowercase,
+    punctuation turned into spaces, whitespace collapsed.
+
+    Example
+    -------
+    >>> normalize("  Zürich ")
+    'zurich'
+    """
+
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    return " ".join(re.sub(r"[^\w]+", " ", text).split())
+
+
+def read_tsv(path: str):
+    """
+    Yields
+    ------
+    dict
+        One place per data line of the bundled TSV format.
+    """
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            cols = line.rstrip("\n").split("\t")
+            yield {
+                "name": cols[0],
+                "alternates": [a for a in cols[1].split(",") if a],
+                "country_code": cols[2],
+                "country_name": cols[3],
+                "admin1": cols[4],
+                "latitude": float(cols[5]),
+                "longitude": float(cols[6]),
+                "population": int(cols[7] or 0),
+                "timezone": cols[8],
+            }
+
+
+def read_geonames(path: str, country_info: str | None = None):
+    """
+    Yields
+    ------
+    dict
+        One place per line of a GeoNames dump.
+    """
+
+    countries = {}
+    if country_info:
+        with open(country_info, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("#"):
+                    continue
+                cols = line.rstrip("\n").split("\t")
+                countries[cols[0]] = cols[4]
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) < 18 or not cols[17]:
+                continue
+            alternates = {cols[2], *[a for a in cols[3].split(",") if a]}
+            alternates.discard(cols[1])
+            yield {
+                "name": cols[1],
+                "alternates": sorted(alternates),
+                "country_code": cols[8],
+                "country_name": countries.get(cols[8], ""),
+                "admin1": "",
+                "latitude": float(cols[4]),
+                "longitude": float(cols[5]),
+                "population": int(cols[14] or 0),
+                "timezone": cols[17],
+            }
+
+
+def build_index(places, out_path: str) -> tuple[int, int]:
+    """
+    Write the binary index for an iterable of places.
+
+    Returns
+    -------
+    tuple[int, int]
+        Number of places and number of keys written.
+    """
+
+    strings = bytearray()
+    string_refs = {}
+
+    def ref(text: str):
+        if text not in string_refs:
+            encoded = text.encode("utf-8")
+            string_refs[text] = (len(strings), len(encoded))
+            strings.extend(encoded)
+        return string_refs[text]
+
+    timezones, tz_index = [], {}
+    countries, country_index = [], {}
+    place_records, keys = [], []
+
+    for place in places:
+        tz = place["timezone"]
+        if tz not in tz_index:
+            tz_index[tz] = len(timezones)
+            timezones.append(tz)
+        country = (place["country_code"], place["country_name"])
+        if country not in country_index:
+            country_index[country] = len(countries)
+            countries.append(list(country))
+
+        idx = len(place_records)
+        place_records.append(
+            PLACE.pack(
+                place["latitude"],
+                place["longitude"],
+                place["population"],
+                tz_index[tz],
+                country_index[country],
+                *ref(place["name"]),
+                *ref(place["admin1"]),
+            )
+        )
+        for key in {normalize(n) for n in [place["name"], *place["alternates"]]}:
+            if key:
+                keys.append((key.encode("utf-8"), idx))
+
+    keys.sort()
+    key_records = [KEY.pack(*ref(key.decode("utf-8")), idx) for key, idx in keys]
+    metadata = json.dumps(
+        {"timezones": timezones, "countries": countries}, ensure_ascii=False
+    ).encode("utf-8")
+
+    places_offset = HEADER.size
+    keys_offset = places_offset + PLACE.size * len(place_records)
+    strings_offset = keys_offset + KEY.size * len(key_records)
+    metadata_offset = strings_offset + len(strings)
+
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    with open(out_path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                MAGIC,
+                len(place_records),
+                len(key_records),
+                places_offset,
+                keys_offset,
+                strings_offset,
+                metadata_offset,
+                len(metadata),
+            )
+        )
+        f.writelines(place_records)
+        f.writelines(key_records)
+        f.write(strings)
+        f.write(metadata)
+
+    return len(place_records), len(key_records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the offline place index.")
+    parser.add_argument("source", nargs="?", default=DEFAULT_SOURCE)
+    parser.add_argument("--format", choices=["tsv", "geonames"], default="tsv")
+    parser.add_argument("--country-info", help="GeoNames countryInfo.txt")
+    parser.add_argument("--out", default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    if args.format == "geonames":
+        places = read_geonames(args.source, args.country_info)
+    else:
+        places = read_tsv(args.source)
+    n_places, n_keys = build_index(places, args.out)
+    print(f"Wrote {n_places} places / {n_keys} keys to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+gazetteer.py
+
+Offline resolution of birth places to coordinates and timezone.
+
+Looks place names up in the binary index built by `src.geo.build_gazetteer`.
+The index is memory-mapped at startup, so lookups need no network call,
+no parsing at boot, and share pages across worker processes.
+
+Classes
+-------
+Place
+    A resolved place.
+Gazetteer
+    Memory-mapped place index with exact, prefix and fuzzy matching.
+"""
+
+import difflib
+import json
+import mmap
+import threading
+from dataclasses import dataclass
+from functools import lru_cache
+
+from src.geo.build_gazetteer import (
+    DEFAULT_PATH,
+    HEADER,
+    KEY,
+    MAGIC,
+    PLACE,
+    normalize,
+)
+
+# Usual country abbreviations that are neither ISO codes nor index names,
+# normalized, mapped to their normalized country code.
+COUNTRY_ALIASES = {
+    "uk": "gb",
+    "great britain": "gb",
+    "britain": "gb",
+    "usa": "us",
+    "united states of america": "us",
+    "america": "us",
+    "uae": "ae",
+}
+
+
+@dataclass(frozen=True)
+class Place:
+    """
+    A place resolved from the gazetteer.
+
+    Attributes
+    ----------
+    name : str
+        Canonical place name.
+    admin1 : str
+        First-level administrative division (state, province), if known.
+    country_code : str
+        ISO 3166-1 alpha-2 country code.
+    country : str
+        Country name, if known.
+    latitude : float
+        Latitude in degrees.
+    longitude : float
+        Longitude in degrees.
+    timezone : str
+        IANA timezone name.
+    population : int
+        Population, used to rank ambiguous names.
+    """
+
+    name: str
+    admin1: str
+    country_code: str
+    country: str
+    latitude: float
+    longitude: float
+    timezone: str
+    population: int
+
+
+class Gazetteer:
+    """
+    Offline place index answering "where and in which timezone is this place?".
+
+    Queries look like ``"Jaipur"``, ``"Jaipur, India"`` or
+    ``"Jaipur, Rajasthan, IN"``: the first comma-separated part is the place
+    name, the remaining parts are qualifiers matched against the state and
+    country (name or code) to pick among places sharing a name.
+
+    The name is matched, in order of preference:
+    1. exactly (after normalization, alternate names included),
+    2. as a prefix of indexed names ("jaipu" -> "jaipur"),
+    3. fuzzily, among names sharing a shorter prefix ("jiapur" -> "jaipur").
+
+    Ties are broken by qualifier matches, then population. A query whose
+    qualifiers name a state or country that none of the candidates is in
+    ("Paris, Texas" when the index only knows Paris, France) resolves to
+    None rather than to a place elsewhere. Qualifiers the index does not
+    know ("New York, NY") are ignored; country codes are never treated as
+    contradicting, since they collide with state abbreviations ("CA").
+
+    Attributes
+    ----------
+    path : str
+        Path of the binary index.
+    """
+
+    MAX_CANDIDATES = 64
+    FUZZY_CUTOFF = 0.75
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        (
+            magic,
+            self._n_places,
+            self._n_keys,
+            self._places_offset,
+            self._keys_offset,
+            self._strings_offset,
+            metadata_offset,
+            metadata_length,
+        ) = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a gazetteer index")
+
+        metadata = json.loads(
+            self._mmap[metadata_offset : metadata_offset + metadata_length]
+        )
+        self._timezones = metadata["timezones"]
+        self._countries = [tuple(country) for country in metadata["countries"]]
+        self._regions = None
+        self.lookup = lru_cache(maxsize=4096)(self._lookup)
+
+    @classmethod
+    def shared(cls) -> "Gazetteer":
+        """
+        Returns
+        -------
+        Gazetteer
+            The process-wide index loaded from the bundled file.
+        """
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def __len__(self):
+        return self._n_places
+
+    # ------------------------------------------------------------------
+    # Raw index access
+    # ------------------------------------------------------------------
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_offset + offset
+        return self._mmap[start : start + length].decode("utf-8")
+
+    def _key_record(self, i: int) -> tuple[int, int, int]:
+        return KEY.unpack_from(self._mmap, self._keys_offset + i * KEY.size)
+
+    def _key(self, i: int) -> bytes:
+        offset, length, _ = self._key_record(i)
+        start = self._strings_offset + offset
+        return self._mmap[start : start + length]
+
+    def _key_place(self, i: int) -> int:
+        return self._key_record(i)[2]
+
+    def _place(self, idx: int) -> Place:
+        lat, lon, population, tz, country, name_off, name_len, adm_off, adm_len = (
+            PLACE.unpack_from(self._mmap, self._places_offset + idx * PLACE.size)
+        )
+        code, country_name = self._countries[country]
+        return Place(
+            name=self._string(name_off, name_len),
+            admin1=self._string(adm_off, adm_len),
+            country_code=code,
+            country=country_name,
+            latitude=round(lat, 4),
+            longitude=round(lon, 4),
+            timezone=self._timezones[tz],
+            population=population,
+        )
+
+    def _bisect_left(self, key: bytes) -> int:
+        lo, hi = 0, self._n_keys
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _prefix_range(self, prefix: bytes, limit: int):
+        """
+        Yield ``(key, place idx)`` for indexed keys starting with ``prefix``.
+        """
+
+        i = self._bisect_left(prefix)
+        end = min(self._n_keys, i + limit)
+        while i < end:
+            key = self._key(i)
+            if not key.startswith(prefix):
+                return
+            yield key, self._key_place(i)
+            i += 1
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+
+    def _candidates(self, name: str) -> list[int]:
+        key = name.encode("utf-8")
+
+        prefixed = list(self._prefix_range(key, self.MAX_CANDIDATES))
+        exact = [idx for k, idx in prefixed if k == key]
+        if exact:
+            return exact
+        if prefixed:
+            return [idx for _, idx in prefixed]
+
+        # Fuzzy: compare against names sharing progressively shorter prefixes.
+        for cut in range(len(name) - 1, 0, -1):
+            pool = list(self._prefix_range(name[:cut].encode("utf-8"), 512))
+            if not pool:
+                continue
+            names = {k.decode("utf-8"): idx for k, idx in reversed(pool)}
+            close = difflib.get_close_matches(
+                name, list(names), n=self.MAX_CANDIDATES, cutoff=self.FUZZY_CUTOFF
+            )
+            if close:
+                return [names[match] for match in close]
+            if cut <= 2:
+                break
+        return []
+
+    @staticmethod
+    def _qualifier_score(place: Place, qualifiers: list[str]) -> int:
+        fields = {
+            normalize(place.country),
+            normalize(place.country_code),
+            normalize(place.admin1),
+        }
+        return sum(COUNTRY_ALIASES.get(q, q) in fields for q in qualifiers)
+
+    def _known_regions(self) -> frozenset:
+        """
+        Returns
+        -------
+        frozenset[str]
+            Normalized country names, country aliases and state names of the
+            index: qualifiers that contradict a place they do not match.
+            Built on first use.
+        """
+
+        if self._regions is None:
+            regions = set(COUNTRY_ALIASES)
+            regions.update(normalize(country) for _, country in self._countries)
+            regions.update(
+                normalize(self._place(idx).admin1) for idx in range(self._n_places)
+            )
+            regions.discard("")
+            self._regions = frozenset(regions)
+        return self._regions
+
+    def _lookup(self, query: str) -> Place | None:
+        parts = [normalize(part) for part in query.split(",")]
+        name, qualifiers = parts[0], [q for q in parts[1:] if q]
+        if not name:
+            return None
+
+        places = [self._place(idx) for idx in dict.fromkeys(self._candidates(name))]
+        if not places:
+            return None
+        best = max(
+            places, key=lambda p: (self._qualifier_score(p, qualifiers), p.population)
+        )
+        if qualifiers and self._qualifier_score(best, qualifiers) == 0:
+            if any(q in self._known_regions() for q in qualifiers):
+                return None
+            # Only unknown qualifiers ("NY", "NSW"): they cannot contradict
+            # the best match, so it stands as if they were absent.
+        return best
+
+    def timezone_for(self, query: str) -> str | None:
+        """
+        Resolve a free-text birth place to its IANA timezone.
+
+        Returns
+        -------
+        str or None
+            The timezone, or None if the place is unknown.
+        """
+
+        if not query:
+            return None
+        place = self.lookup(query)
+        return place.timezone if place is not None else None
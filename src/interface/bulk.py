@@ -0,0 +1,663 @@
+"""
+bulk.py
+
+Offline bulk generation of insights for a whole user export.
+
+Reads a JSONL or CSV file of `/predict` payloads (name, birth_date,
+birth_time, birth_place, language) and runs every row through the same
+pipeline as the server, without going through HTTP:
+
+- The input is streamed: only the rows in flight are held in memory.
+- The main process validates each row and looks it up in the insight
+  `Cache`. Cache hits are answered at once. Misses are sent in chunks to a
+  pool of worker processes.
+- Each worker resolves the zodiac signs and generates the insights
+  concurrently on the async Gemini client. The number of LLM calls in
+  flight per process is capped, and the calls run at "prewarm" priority,
+  so that a server sharing the quota keeps precedence. Translation runs
+  only in dummy mode, as in the server.
+- The main process writes every result to the cache backend and appends
+  one line per input row to the output JSONL, in input order.
+- Progress is checkpointed next to the output file. The checkpoint holds
+  the rows done and the output length at that point. A killed run started
+  again with the same arguments truncates the output to the checkpointed
+  length and skips the rows already done. Rows generated after the last
+  checkpoint are usually in the cache by then, so they rarely cost
+  another LLM call.
+- Throughput in rows per second is reported while the run goes and at
+  the end.
+
+Output lines are {"row", "name", "birth_date", "zodiac", "insight",
+"language", "cached"}, or {"row", "error"} for a row that could not be
+processed. ``row`` is the 0-based index of the data row in the input.
+
+Worker processes are started with "spawn", so they do not inherit the
+threads of the main process. With a cache backend other than "sqlite",
+the prompt and translation memos of several workers cannot share their log
+files, so each worker keeps them in memory only.
+
+Classes
+-------
+BulkRunner
+    Reads, dispatches, writes and checkpoints one bulk run.
+
+Usage
+-----
+    python -m src.interface.bulk users.jsonl results.jsonl
+    python -m src.interface.bulk users.csv results.jsonl --processes 4 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import multiprocessing
+import multiprocessing.connection
+import os
+import sys
+import threading
+import time
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+
+from config.config import Config
+from src.cache.cache import Cache
+from src.geo.gazetteer import Gazetteer
+from src.llms.quota_scheduler import PRIORITIES, llm_priority
+from src.utils.utils import Utils
+
+_worker = None  # per-process `_BulkWorker`, set by `_init_worker`
+
+
+class _BulkWorker:
+    """
+    Generation pipeline of one worker process.
+
+    Attributes
+    ----------
+    model_infer : ModelInference
+        Zodiac resolution and insight generation.
+    translator : DummyTranslator or TranslateWithGoogle
+        Translation handler of dummy mode (and source of the language list).
+    concurrency : int
+        Maximum insights generated at once.
+    priority : str
+        Quota priority of the LLM calls.
+    """
+
+    def __init__(self, concurrency: int, priority: str):
+        # Imported here so the main process, which only reads, writes,
+        # resolves birth places and looks up the cache, never loads the model
+        # and translator stack.
+        from src.models.model_setup import ModelSetUp
+        from src.models.model_infer import ModelInference
+        from src.translator.translate import DummyTranslator, TranslateWithGoogle
+        from src.utils.event_loop import BackgroundEventLoop
+
+        self.model_infer = ModelInference(ModelSetUp())
+        self.translator = (
+            DummyTranslator()
+            if Config.USE_DUMMY_TRANSLATION
+            else TranslateWithGoogle()
+        )
+        self.concurrency = concurrency
+        self.priority = priority
+        self._loop = BackgroundEventLoop.shared()
+
+    def process(self, rows: list[tuple[int, dict]]) -> list[tuple[int, dict]]:
+        """
+        Generate the insights of a chunk of cache misses.
+
+        Parameters
+        ----------
+        rows : list[tuple[int, dict]]
+            Row index and validated payload (with the birth place's
+            "timezone") of every miss.
+
+        Returns
+        -------
+        list[tuple[int, dict]]
+            Row index and {"zodiac", "insight", "language", "timezone"}, or
+            {"error"}, for every row.
+        """
+
+        languages, timezones = [], []
+        for _, fields in rows:
+            language = fields.get("language") or "English"
+            if language not in self.translator.lang_to_code:
+                language = "English"
+            languages.append(language)
+            timezones.append(fields["timezone"])
+
+        zodiacs = self.model_infer.get_zodiac_signs(
+            [fields["birth_date"] for _, fields in rows],
+            [fields["birth_time"] for _, fields in rows],
+            timezones,
+        )
+        requests = [
+            (zodiac, fields["name"], language)
+            for (_, fields), zodiac, language in zip(rows, zodiacs, languages)
+        ]
+        insights = self._loop.run(self._generate_all(requests))
+
+        results = []
+        for (index, _), (zodiac, _, language), timezone, insight in zip(
+            rows, requests, timezones, insights
+        ):
+            if isinstance(insight, Exception):
+                results.append((index, {"error": str(insight)}))
+                continue
+            results.append(
+                (
+                    index,
+                    {
+                        "zodiac": zodiac,
+                        "insight": insight,
+                        "language": language,
+                        "timezone": timezone,
+                    },
+                )
+            )
+        return results
+
+    async def _generate_all(self, requests: list[tuple[str, str, str]]) -> list:
+        """
+        Generate the insight of every (zodiac, name, language), at most
+        `concurrency` at a time; identical requests share one generation.
+
+        Returns
+        -------
+        list
+            Insight text, or the exception raised, for every request.
+        """
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def one(zodiac, name, language):
+            async with semaphore:
+                return await self._agenerate(zodiac, name, language)
+
+        unique = list(dict.fromkeys(requests))
+        with llm_priority(self.priority):
+            results = await asyncio.gather(
+                *(one(*request) for request in unique), return_exceptions=True
+            )
+        by_request = dict(zip(unique, results))
+        return [by_request[request] for request in requests]
+
+    async def _agenerate(self, zodiac: str, name: str, language: str) -> str:
+        """
+        Awaitable counterpart of `UIInterface._generate_insight`.
+        """
+
+        if Config.USE_DUMMY_LLM:
+            insight = self.model_infer.generate_insight_from_dummy_predictor(
+                zodiac, name
+            )
+            if language != "English":
+                language_code = self.translator.lang_to_code[language]
+                return await self.translator.atranslate(insight, language_code)
+            return insight
+
+        if Config.SIGN_TEMPLATES["ENABLED"]:
+            insight = self.model_infer.generate_insight_from_template(
+                zodiac, name, language
+            )
+            if insight is not None:
+                return insight
+        return await self.model_infer.agenerate_insight_from_llm(
+            zodiac, name, language
+        )
+
+
+def _init_worker(settings: dict):
+    """
+    Build the pipeline of a worker process (pool initializer).
+
+    Parameters
+    ----------
+    settings : dict
+        "concurrency", "priority", "quota_share" (fraction of the LLM quota
+        granted to this process) and "private_memos" (keep the prompt and
+        translation memos in memory).
+    """
+
+    global _worker
+    parent = multiprocessing.parent_process()
+    if parent is not None:
+        threading.Thread(target=_exit_with, args=(parent,), daemon=True).start()
+
+    Config.LLM_ASYNC["ENABLED"] = True
+    Config.LLM_ASYNC["MAX_CONCURRENCY"] = settings["concurrency"]
+    for limit in ("REQUESTS_PER_MINUTE", "TOKENS_PER_MINUTE"):
+        if Config.LLM_QUOTA[limit]:
+            Config.LLM_QUOTA[limit] *= settings["quota_share"]
+    if settings["private_memos"]:
+        Config.PROMPT_CACHE["FILE"] = None
+        Config.TRANSLATION_CACHE["FILE"] = None
+    _worker = _BulkWorker(settings["concurrency"], settings["priority"])
+
+
+def _exit_with(parent):
+    # A pool worker blocks on its task queue forever if the main process is
+    # killed; exit as soon as the main process is gone.
+    multiprocessing.connection.wait([parent.sentinel])
+    os._exit(1)
+
+
+def _process_chunk(rows: list[tuple[int, dict]]) -> list[tuple[int, dict]]:
+    return _worker.process(rows)
+
+
+class BulkRunner:
+    """
+    One bulk run from an input file to an output JSONL and the cache.
+
+    Attributes
+    ----------
+    input_path : str
+        JSONL or CSV file of payloads.
+    output_path : str
+        JSONL file receiving one result per input row.
+    checkpoint_path : str
+        Progress file, ``<output_path>.checkpoint``.
+    input_format : str
+        "jsonl" or "csv".
+    processes : int
+        Worker processes; 0 generates in a thread of this process.
+    concurrency : int
+        Insights generated at once per worker.
+    chunk_size : int
+        Cache misses sent to a worker at a time.
+    checkpoint_interval : float
+        Seconds between checkpoints.
+    progress_interval : float
+        Seconds between progress lines.
+    priority : str
+        Quota priority of the LLM calls.
+    quota_share : float
+        Fraction of `Config.LLM_QUOTA` this run may use.
+    cache : Cache
+        Insight cache receiving the results.
+    gazetteer : Gazetteer or None
+        Offline place index resolving birth places to timezones, if enabled.
+    """
+
+    def __init__(
+        self,
+        input_path: str,
+        output_path: str,
+        input_format: str | None = None,
+        processes: int | None = None,
+        concurrency: int | None = None,
+        chunk_size: int | None = None,
+        checkpoint_interval: float | None = None,
+        progress_interval: float | None = None,
+        priority: str | None = None,
+        quota_share: float | None = None,
+    ):
+        settings = Config.BULK
+        self.input_path = input_path
+        self.output_path = output_path
+        self.checkpoint_path = output_path + ".checkpoint"
+        self.input_format = input_format or (
+            "csv" if input_path.lower().endswith(".csv") else "jsonl"
+        )
+        self.processes = settings["PROCESSES"] if processes is None else processes
+        self.concurrency = concurrency or settings["CONCURRENCY"]
+        self.chunk_size = chunk_size or settings["CHUNK_SIZE"]
+        self.checkpoint_interval = (
+            checkpoint_interval or settings["CHECKPOINT_INTERVAL"]
+        )
+        self.progress_interval = progress_interval or settings["PROGRESS_INTERVAL"]
+        self.priority = priority or settings["PRIORITY"]
+        self.quota_share = (
+            settings["QUOTA_SHARE"] if quota_share is None else quota_share
+        )
+        if self.input_format not in ("jsonl", "csv"):
+            raise ValueError(f"Unknown input format: {self.input_format!r}")
+        if self.priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {self.priority!r}; use {PRIORITIES}")
+
+        self.cache = Cache()
+        self.gazetteer = (
+            Gazetteer(Config.GAZETTEER["INDEX_FILE"])
+            if Config.GAZETTEER["ENABLED"]
+            else None
+        )
+        self._counts = {"cached": 0, "generated": 0, "errors": 0}
+        self._in_flight = {}  # row index -> payload of a miss being generated
+
+    def run(self, restart: bool = False) -> dict:
+        """
+        Process the input file, resuming from the checkpoint unless ``restart``.
+
+        Parameters
+        ----------
+        restart : bool
+            Ignore an existing checkpoint and start from the first row.
+
+        Returns
+        -------
+        dict
+            Rows processed by this run, rows skipped from an earlier run,
+            seconds elapsed, rows per second and the cached / generated /
+            error counts.
+        """
+
+        state = None if restart else self._load_checkpoint()
+        if state is not None and state["input"] != os.path.abspath(self.input_path):
+            raise ValueError(
+                f"{self.checkpoint_path} belongs to {state['input']}; "
+                "use another output file or --restart"
+            )
+        if state is not None and state.get("complete"):
+            print(f"{self.output_path} is already complete ({state['rows']} rows).")
+            return {"rows": 0, "skipped": state["rows"], **self._counts}
+
+        skipped = state["rows"] if state else 0
+        with open(self.output_path, "a+b") as out:
+            out.truncate(state["output_bytes"] if state else 0)
+            if skipped:
+                print(f"Resuming after {skipped} rows.")
+            return self._run(out, skipped)
+
+    def _run(self, out, skipped: int) -> dict:
+        executor = self._executor()
+        max_in_flight = max(self.processes, 1) * 2
+        futures = set()
+        ready = {}  # row index -> output record, until written in order
+        batch = []
+        self._next = skipped  # next row index to write
+        self._started = self._last_report = self._last_checkpoint = time.time()
+        complete = False
+
+        def submit():
+            futures.add(executor.submit(_process_chunk, list(batch)))
+            batch.clear()
+
+        def drain(block: bool):
+            while futures and (
+                block
+                or len(futures) >= max_in_flight
+                or len(ready) > max_in_flight * self.chunk_size
+            ):
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    futures.discard(future)
+                    self._collect(future.result(), ready)
+                block = False
+            self._write_ready(out, ready)
+
+        try:
+            for index, data in self._rows(skipped):
+                record = self._prepare(index, data)
+                if isinstance(record, dict):
+                    ready[index] = record
+                else:
+                    batch.append(record)
+                    if len(batch) >= self.chunk_size:
+                        submit()
+                drain(block=False)
+
+            if batch:
+                submit()
+            while futures:
+                drain(block=True)
+            complete = True
+        finally:
+            executor.shutdown(wait=complete, cancel_futures=True)
+            self._write_ready(out, ready)
+            self._checkpoint(out, complete=complete)
+            self.cache.close()
+
+        elapsed = time.time() - self._started
+        rows = self._next - skipped
+        summary = {
+            "rows": rows,
+            "skipped": skipped,
+            "seconds": elapsed,
+            "rows_per_second": rows / elapsed if elapsed > 0 else 0.0,
+            **self._counts,
+        }
+        print(
+            f"Done: {rows} rows in {elapsed:.1f}s ({summary['rows_per_second']:.1f} "
+            f"rows/s): {self._counts['cached']} cached, "
+            f"{self._counts['generated']} generated, {self._counts['errors']} errors."
+        )
+        return summary
+
+    def _executor(self):
+        """
+        Returns
+        -------
+        Executor
+            Pool of worker processes running `_process_chunk`, or a single
+            thread of this process when ``processes`` is 0.
+        """
+
+        settings = {
+            "concurrency": self.concurrency,
+            "priority": self.priority,
+            "quota_share": self.quota_share / max(self.processes, 1),
+            "private_memos": self.processes > 1
+            and Cache.writable_backend() != "sqlite",
+        }
+        if self.processes == 0:
+            return ThreadPoolExecutor(
+                max_workers=1, initializer=_init_worker, initargs=(settings,)
+            )
+        return ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(settings,),
+        )
+
+    def _rows(self, skip: int):
+        """
+        Stream the input rows after the first ``skip``.
+
+        Yields
+        ------
+        tuple[int, dict | None]
+            Row index and payload, or None for a JSONL line that is not valid
+            JSON. Blank JSONL lines are not rows.
+        """
+
+        with open(self.input_path, "r", encoding="utf-8", newline="") as f:
+            if self.input_format == "csv":
+                rows = csv.DictReader(f)
+            else:
+                rows = (line for line in f if line.strip())
+
+            for index, row in enumerate(rows):
+                if index < skip:
+                    continue
+                if self.input_format == "jsonl":
+                    try:
+                        row = json.loads(row)
+                    except json.JSONDecodeError:
+                        row = None
+                yield index, row
+
+    def _prepare(self, index: int, data):
+        """
+        Validate one row and look it up in the cache.
+
+        Returns
+        -------
+        dict or tuple[int, dict]
+            The output record of a cache hit or an invalid row, or the row
+            index and payload of a miss, to be generated by a worker.
+        """
+
+        if not isinstance(data, dict):
+            return {"row": index, "error": "Row must be a JSON object"}
+        fields = {
+            name: data.get(name)
+            for name in ("name", "birth_date", "birth_time", "birth_place", "language")
+        }
+        required = ("name", "birth_date", "birth_time", "birth_place")
+        if not all(fields[name] for name in required):
+            return {"row": index, "error": "Missing required fields"}
+        if not all(isinstance(v, (str, type(None))) for v in fields.values()):
+            return {"row": index, "error": "Fields must be strings"}
+        if not Utils.validate_date(fields["birth_date"]):
+            return {"row": index, "error": "Invalid date format"}
+
+        fields["timezone"] = (
+            self.gazetteer.timezone_for(fields["birth_place"])
+            if self.gazetteer is not None
+            else None
+        )
+        cached = self.cache.get(self._user_key(fields))
+        if cached:
+            return self._output(index, fields, {**cached, "cached": True})
+        self._in_flight[index] = fields
+        return index, fields
+
+    def _collect(self, results: list[tuple[int, dict]], ready: dict):
+        """
+        Cache the results of a worker chunk and queue their output records.
+        """
+
+        for index, result in results:
+            fields = self._in_flight.pop(index)
+            if "error" in result:
+                ready[index] = {"row": index, "error": result["error"]}
+                continue
+            self.cache.set(
+                self._user_key(fields),
+                result["zodiac"],
+                result["insight"],
+                result["language"],
+                result.pop("timezone"),
+            )
+            ready[index] = self._output(index, fields, {**result, "cached": False})
+
+    @staticmethod
+    def _user_key(fields: dict) -> str:
+        return Utils.user_key(
+            fields["name"],
+            fields["birth_date"],
+            fields["birth_time"],
+            fields["timezone"],
+        )
+
+    def _output(self, index: int, fields: dict, result: dict) -> dict:
+        record = {
+            "row": index,
+            "name": fields["name"],
+            "birth_date": fields["birth_date"],
+            **result,
+        }
+        self._counts["cached" if result["cached"] else "generated"] += 1
+        return record
+
+    def _write_ready(self, out, ready: dict):
+        """
+        Append the records that are next in input order, then checkpoint and
+        report progress when due.
+        """
+
+        lines = []
+        while self._next in ready:
+            record = ready.pop(self._next)
+            if "error" in record:
+                self._counts["errors"] += 1
+            lines.append(json.dumps(record, ensure_ascii=False) + "\n")
+            self._next += 1
+        if lines:
+            out.write("".join(lines).encode("utf-8"))
+
+        now = time.time()
+        if now - self._last_checkpoint >= self.checkpoint_interval:
+            self._checkpoint(out)
+        if now - self._last_report >= self.progress_interval:
+            self._report(now)
+
+    def _checkpoint(self, out, complete: bool = False):
+        """
+        Make the output and the cache durable, then record how far they go.
+        """
+
+        out.flush()
+        os.fsync(out.fileno())
+        self.cache.save()
+        state = {
+            "input": os.path.abspath(self.input_path),
+            "rows": self._next,
+            "output_bytes": out.tell(),
+            "complete": complete,
+        }
+        tmp_path = self.checkpoint_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        self._last_checkpoint = time.time()
+
+    def _load_checkpoint(self) -> dict | None:
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _report(self, now: float):
+        elapsed = now - self._started
+        self._last_report = now
+        print(
+            f"{self._next} rows, {sum(self._counts.values()) / elapsed:.1f} rows/s "
+            f"({self._counts['cached']} cached, {self._counts['generated']} "
+            f"generated, {self._counts['errors']} errors)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate insights for a JSONL or CSV file of users."
+    )
+    parser.add_argument("input", help="JSONL or CSV file of /predict payloads")
+    parser.add_argument("output", help="JSONL file receiving one result per row")
+    parser.add_argument("--format", choices=("jsonl", "csv"), help="input format")
+    parser.add_argument("--processes", type=int, help="worker processes (0: inline)")
+    parser.add_argument("--concurrency", type=int, help="LLM calls per process")
+    parser.add_argument("--chunk-size", type=int, help="rows sent to a worker at once")
+    parser.add_argument(
+        "--checkpoint-interval", type=float, help="seconds between checkpoints"
+    )
+    parser.add_argument("--priority", choices=PRIORITIES, help="LLM quota priority")
+    parser.add_argument(
+        "--quota-share", type=float, help="fraction of the LLM quota to use"
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore the checkpoint, start over"
+    )
+    args = parser.parse_args()
+
+    runner = BulkRunner(
+        args.input,
+        args.output,
+        input_format=args.format,
+        processes=args.processes,
+        concurrency=args.concurrency,
+        chunk_size=args.chunk_size,
+        checkpoint_interval=args.checkpoint_interval,
+        priority=args.priority,
+        quota_share=args.quota_share,
+    )
+    try:
+        runner.run(restart=args.restart)
+    except KeyboardInterrupt:
+        print("Interrupted; run the same command again to resume.")
+        sys.exit(130)
+
+
+if __name__ == "__main__":
+    main()
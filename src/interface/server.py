@@ -0,0 +1,107 @@
+"""
+server.py
+
+Production server for the Astro Insight Generator.
+
+Runs the Flask app under gunicorn's pre-fork worker model: the app (models,
+gazetteer, cache) is built once in the master process and the workers are
+forked from it, sharing its memory pages copy-on-write. Each worker serves
+requests on several threads.
+
+Every worker process has its own in-memory state, so the insight cache must
+live in a store that is shared safely across processes: the "sqlite" cache
+backend, or the "snapshot" backend with an "sqlite" delta (its read-only
+snapshot is memory-mapped, so workers share its pages). The file-backed
+"json" and "log" backends are refused with more than one worker, since
+workers would serve stale copies and overwrite each other's writes.
+
+gunicorn is POSIX-only; use the development server (`Config.SERVER["MODE"]
+= "dev"`) on Windows.
+
+Classes
+-------
+ProductionServer
+    gunicorn application serving a preloaded Flask app.
+"""
+
+from gunicorn.app.base import BaseApplication
+
+from config.config import Config
+from src.cache.cache import Cache
+
+
+class ProductionServer(BaseApplication):
+    """
+    gunicorn application wrapping an already-built Flask app.
+
+    Attributes
+    ----------
+    application : Flask
+        The app served by every worker.
+    options : dict[str, object]
+        gunicorn settings, see `options_from_config`.
+    """
+
+    def __init__(self, application, options: dict | None = None):
+        """
+        Parameters
+        ----------
+        application : Flask
+            The app to serve.
+        options : dict, optional
+            gunicorn settings. Defaults to `options_from_config()`.
+        """
+
+        self.application = application
+        self.options = options or self.options_from_config()
+        self.check_cache_backend(self.options.get("workers", 1))
+        super().__init__()
+
+    @staticmethod
+    def options_from_config() -> dict:
+        """
+        Returns
+        -------
+        dict
+            gunicorn settings derived from `Config.SERVER`.
+        """
+
+        server = Config.SERVER
+        return {
+            "bind": f"{server['HOST']}:{server['PORT']}",
+            "workers": server["WORKERS"],
+            "threads": server["THREADS"],
+            "worker_class": "gthread",
+            "timeout": server["TIMEOUT"],
+            "preload_app": True,
+            "accesslog": "-",
+        }
+
+    @staticmethod
+    def check_cache_backend(workers: int):
+        """
+        Refuse to run several workers on a cache backend that is private to
+        each process.
+
+        Raises
+        ------
+        ValueError
+            If ``workers > 1`` and the cache is not backed by "sqlite" (alone
+            or as the delta of the "snapshot" backend).
+        """
+
+        if workers > 1 and Cache.writable_backend() != "sqlite":
+            raise ValueError(
+                f"Cache backend {Config.CACHE_BACKEND!r} cannot be shared by "
+                f"{workers} worker processes; set Config.CACHE_BACKEND = 'sqlite' "
+                "(or the 'snapshot' backend with an 'sqlite' delta) or run a "
+                "single worker."
+            )
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        return self.application
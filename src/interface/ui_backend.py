@@ -14,7 +14,33 @@ Endpoints
 ---------
 POST /predict
     Accepts a JSON payload with user birth details and returns a personalized
-    astrological insight in the requested language.
+    astrological insight in the requested language. In job mode
+    (`Config.JOBS["MODE"]`), a cache miss is answered with 202 and a job id
+    while the insight is generated in the background.
+
+GET /jobs/<id>
+    State of a job started by `/predict`, with its result once done;
+    ``?wait=<seconds>`` long-polls until the job finishes.
+
+POST /predict_stream
+    Same payload as `/predict`; streams the insight as server-sent events
+    (or newline-delimited JSON with ``?format=ndjson``) as the LLM generates it.
+
+POST /predict_batch
+    Accepts a JSON array of `/predict` payloads and returns {"results": [...]}
+    with one response or per-item error for each payload.
+
+GET /cache/stats
+    Returns cache hit, miss, expiration and eviction counters.
+
+GET /metrics
+    Request and per-stage latency histograms and pipeline counters in the
+    Prometheus text format (when `Config.METRICS["ENABLED"]`).
+
+GET, POST, DELETE /admin/profile
+    Show, arm or disarm profiling of the next N prediction requests (when
+    `Config.PROFILING["ENABLED"]`). A single request can also be profiled
+    with an ``X-Profile: cprofile|sample`` header.
 
 Example Request:
 ----------------
@@ -36,10 +62,23 @@ Example Response:
 }
 """
 
-from flask import Flask, request, jsonify
+import hmac
+import json
+import math
+import os
+import threading
+import time
+
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from src.utils.utils import Utils
 from src.translator.translate import DummyTranslator, TranslateWithGoogle
 from src.cache.cache import Cache
+from src.utils.single_flight import SingleFlight
+from src.geo.gazetteer import Gazetteer
+from src.utils.metrics import Metrics
+from src.profiling.profiler import Profiler
+from src.llms.quota_scheduler import BATCH, QuotaScheduler, llm_priority
+from src.utils.job_manager import JobManager, JobQueueFullError
 from config.config import Config
 
 
@@ -57,17 +96,45 @@ class UIInterface:
     cache : Cache
         Caching object to store previously generated predictions.
     translator : DummyTranslator or TranslateWithGoogle
-        Translation handler depending on configuration.
+        Translation handler depending on configuration, created on first use.
+    in_flight : SingleFlight
+        Registry coalescing concurrent cache misses for the same user key.
+    gazetteer : Gazetteer or None
+        Offline place index resolving `birth_place` to a timezone, if enabled.
+    metrics : Metrics
+        Registry of the request, stage and pipeline metrics.
+    profiler : Profiler or None
+        On-demand request profiler, if profiling is enabled.
+    jobs : JobManager or None
+        Background job runner of `/predict` misses, if job mode is on.
 
     Methods
     -------
     _register_routes():
-        Registers Flask routes, currently only /predict.
+        Registers Flask routes: /predict, /jobs/<id>, /predict_stream,
+        /predict_batch, /cache/stats, /metrics and /admin/profile.
 
     predict():
         Handles POST requests to /predict, performs input validation, checks cache,
         generates zodiac sign and insight, translates the text if required, caches
-        the result, and returns a JSON response.
+        the result, and returns a JSON response (or a job id in job mode).
+
+    job_status(job_id):
+        Handles GET requests to /jobs/<id>: job state and result, with long-poll.
+
+    predict_stream():
+        Handles POST requests to /predict_stream: same workflow as predict(),
+        but streams the insight chunk by chunk as it is generated.
+
+    predict_batch():
+        Handles POST requests to /predict_batch: validates an array of payloads,
+        answers cache hits and generates the misses grouped by (zodiac, language).
+
+    metrics_endpoint():
+        Handles GET requests to /metrics with the metrics in Prometheus format.
+
+    admin_profile():
+        Handles /admin/profile: profiling status, arming and disarming.
 
     run(host='0.0.0.0', port=8000, debug=True):
         Starts the Flask server with the specified host, port, and debug mode.
@@ -77,11 +144,180 @@ class UIInterface:
         self.app = Flask(__name__)
         self.model_infer = model_infer
         self.cache = Cache()
+        self.in_flight = SingleFlight()
+        self.gazetteer = (
+            Gazetteer(Config.GAZETTEER["INDEX_FILE"])
+            if Config.GAZETTEER["ENABLED"]
+            else None
+        )
+        self._translator = None
+        self._translator_lock = threading.Lock()
+        self.jobs = JobManager.shared() if Config.JOBS["MODE"] != "off" else None
+        self._init_metrics()
+        self._init_profiling()
         self._register_routes()
-        if Config.USE_DUMMY_TRANSLATION:
-            self.translator = DummyTranslator()
-        else:
-            self.translator = TranslateWithGoogle()
+
+    @property
+    def translator(self):
+        """
+        The translator, created by the first request that needs it (after
+        fork() in pre-fork servers, so its session and memo belong to the worker).
+        """
+
+        if self._translator is None:
+            with self._translator_lock:
+                if self._translator is None:
+                    if Config.USE_DUMMY_TRANSLATION:
+                        self._translator = DummyTranslator()
+                    else:
+                        self._translator = TranslateWithGoogle()
+        return self._translator
+
+    def _init_metrics(self):
+        """
+        Declare the metrics recorded by the request handlers.
+        """
+
+        self.metrics = Metrics.shared()
+        self._request_seconds = self.metrics.histogram(
+            "request_duration_seconds",
+            "Time to produce a response (headers of a stream), by endpoint.",
+            ("endpoint",),
+        )
+        self._requests = self.metrics.counter(
+            "requests_total",
+            "Requests served, by endpoint and status.",
+            ("endpoint", "status"),
+        )
+        stage_seconds = self.metrics.histogram(
+            "stage_duration_seconds",
+            "Time spent in each stage of the prediction pipeline.",
+            ("stage",),
+        )
+        self._stages = {
+            stage: stage_seconds.labels(stage=stage)
+            for stage in (
+                "parse",
+                "validate",
+                "cache_lookup",
+                "zodiac",
+                "generate",
+                "translate",
+                "cache_write",
+            )
+        }
+        cache_lookups = self.metrics.counter(
+            "cache_lookups_total", "Insight cache lookups, by result.", ("result",)
+        )
+        self._cache_hits = cache_lookups.labels(result="hit")
+        self._cache_misses = cache_lookups.labels(result="miss")
+        self._coalesced = self.metrics.counter(
+            "coalesced_requests_total",
+            "Cache misses that shared the generation of a concurrent request.",
+        )
+        self._translations = self.metrics.counter(
+            "translations_total", "Insight translations, by language.", ("language",)
+        )
+        self._cache_gauges = {
+            name: self.metrics.gauge(f"cache_{name}", documentation)
+            for name, documentation in (
+                ("entries", "Entries in the insight cache."),
+                ("bytes", "Approximate size of the insight cache."),
+            )
+        }
+
+        if self.metrics.enabled:
+            self.app.before_request(self._start_request_timer)
+            self.app.after_request(self._record_request)
+
+    def _start_request_timer(self):
+        g.metrics_start = time.perf_counter()
+
+    def _record_request(self, response):
+        endpoint = request.endpoint or "unknown"
+        if endpoint != "metrics" and "metrics_start" in g:
+            self._request_seconds.observe(
+                time.perf_counter() - g.metrics_start, endpoint=endpoint
+            )
+            self._requests.inc(endpoint=endpoint, status=response.status_code)
+        return response
+
+    # Endpoints whose requests can be profiled.
+    PROFILED_ENDPOINTS = ("predict", "predict_stream", "predict_batch")
+
+    def _init_profiling(self):
+        """
+        Install the request hooks of the on-demand profiler, if enabled.
+        """
+
+        self.profiler = Profiler.shared() if Config.PROFILING["ENABLED"] else None
+        if self.profiler is not None:
+            self.app.before_request(self._start_profile)
+            self.app.after_request(self._tag_profile)
+            self.app.teardown_request(self._stop_profile)
+
+    def _profiling_allowed(self):
+        """
+        Whether the current request may control profiling: it carries the
+        configured token or, without a token, comes from localhost.
+        """
+
+        token = Config.PROFILING["TOKEN"]
+        if token is not None:
+            given = request.headers.get("X-Profile-Token", "")
+            return hmac.compare_digest(given.encode(), token.encode())
+        return request.remote_addr in ("127.0.0.1", "::1")
+
+    def _start_profile(self):
+        if request.endpoint not in self.PROFILED_ENDPOINTS:
+            return
+        mode = request.headers.get("X-Profile")
+        if mode is not None and not self._profiling_allowed():
+            mode = None
+        try:
+            g.profile = self.profiler.start(request.endpoint, mode)
+        except ValueError:
+            g.profile = None  # unknown mode in the header: serve unprofiled
+
+    def _tag_profile(self, response):
+        profile = g.get("profile")
+        if profile is not None:
+            response.headers["X-Profile-Id"] = os.path.basename(profile.path)
+        return response
+
+    def _stop_profile(self, error=None):
+        # Runs after the response is sent (after the last chunk of a stream).
+        profile = g.pop("profile", None)
+        if profile is not None:
+            try:
+                profile.stop()
+            except Exception as e:
+                print(f"Failed to write profile {profile.path}: {e}")
+
+    def _stage(self, name):
+        """
+        Returns
+        -------
+        context manager
+            Times its block as pipeline stage ``name``.
+        """
+
+        return self.metrics.timer(self._stages[name])
+
+    def _lookup_cache(self, key):
+        """
+        Timed and counted cache lookup.
+
+        Returns
+        -------
+        dict or None
+            The cached entry, or None on a miss.
+        """
+
+        with self._stage("cache_lookup"):
+            cached = self.cache.get(key)
+        (self._cache_hits if cached else self._cache_misses).inc()
+        return cached
 
     def _register_routes(self):
         """
@@ -89,8 +325,39 @@ class UIInterface:
 
         Currently registers:
         - POST /predict : Handles prediction requests for astrological insights.
+        - GET /jobs/<id> : State and result of a background job, if job mode is on.
+        - POST /predict_stream : Streams the insight as it is generated.
+        - POST /predict_batch : Handles an array of prediction requests at once.
+        - GET /cache/stats : Cache hit, miss, expiration and eviction counters,
+          plus translation memo counters.
+        - GET /metrics : Metrics in Prometheus text format, if enabled.
+        - GET/POST/DELETE /admin/profile : Request profiling, if enabled.
         """
         self.app.add_url_rule("/predict", "predict", self.predict, methods=["POST"])
+        if self.jobs is not None:
+            self.app.add_url_rule(
+                "/jobs/<job_id>", "job_status", self.job_status, methods=["GET"]
+            )
+        self.app.add_url_rule(
+            "/predict_stream", "predict_stream", self.predict_stream, methods=["POST"]
+        )
+        self.app.add_url_rule(
+            "/predict_batch", "predict_batch", self.predict_batch, methods=["POST"]
+        )
+        self.app.add_url_rule(
+            "/cache/stats", "cache_stats", self.cache_stats, methods=["GET"]
+        )
+        if self.metrics.enabled:
+            self.app.add_url_rule(
+                "/metrics", "metrics", self.metrics_endpoint, methods=["GET"]
+            )
+        if self.profiler is not None:
+            self.app.add_url_rule(
+                "/admin/profile",
+                "admin_profile",
+                self.admin_profile,
+                methods=["GET", "POST", "DELETE"],
+            )
 
     def predict(self):
         """
@@ -100,8 +367,14 @@ class UIInterface:
         1. Parse JSON input for name, birth_date, birth_time, birth_place, and language.
         2. Validate required fields and date format.
         3. Check if insight is cached; return cached result if available.
-        4. Compute zodiac sign from birth_date.
-        5. Generate insight using either dummy predictor or LLM.
+           Concurrent misses for the same key are coalesced so that only the
+           first request runs steps 4-7 and the others share its result.
+           In job mode, steps 4-7 run in a background job instead and the
+           miss is answered at once with 202 and the job id (see `job_status`).
+        4. Compute zodiac sign from birth_date (and, in exact mode, the UTC
+           birth instant from birth_time and birth_place's timezone).
+        5. Generate insight using either dummy predictor, today's sign template
+           (when enabled) or LLM.
         6. Translate insight if requested language is not English.
         7. Cache the generated result.
         8. Return a JSON response with zodiac, insight, language, and cached status.
@@ -115,69 +388,624 @@ class UIInterface:
                 "language": str,
                 "cached": bool
             }
+        Or, for a miss in job mode, with status 202 and a ``Location`` header:
+            {
+                "job_id": str,
+                "status": "pending" | "running"
+            }
         Or, in case of error:
             {
                 "error": str
             }
+            With status 503 and a ``Retry-After`` header when too many jobs
+            are pending.
         """
 
         try:
-            data = request.get_json(force=True)
-            name = data.get("name")
-            birth_date = data.get("birth_date")
-            birth_time = data.get("birth_time")
-            birth_place = data.get("birth_place")
-            language = data.get("language", "English")
-
-            if language not in self.translator.lang_to_code:
-                language = "English"
-                print(
-                    "Choice of language not Supported or LAnguage name not started with Upper Case!!"
+            with self._stage("parse"):
+                data = request.get_json(force=True)
+            with self._stage("validate"):
+                fields, error = self._parse_payload(data)
+            if error:
+                return jsonify({"error": error}), 400
+            key = self._user_key(fields)
+
+            cached = self._lookup_cache(key)
+            if cached:
+                return jsonify({**cached, "cached": True})
+
+            if self._wants_job():
+                try:
+                    job = self.jobs.submit(key, self._resolve_miss, key, fields)
+                except JobQueueFullError as e:
+                    response = jsonify({"error": str(e)})
+                    response.headers["Retry-After"] = str(math.ceil(e.retry_after))
+                    return response, 503
+                return self._job_response(job.to_dict())
+
+            return jsonify(self._resolve_miss(key, fields))
+
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+    def job_status(self, job_id):
+        """
+        Handle GET requests to /jobs/<id>.
+
+        With ``?wait=<seconds>`` (at most `Config.JOBS["MAX_POLL_WAIT"]`), the
+        request is held until the job finishes or the wait runs out.
+
+        Returns
+        -------
+        Flask Response (JSON)
+            Once the job is finished, with status 200:
+            {"job_id": str, "status": "done", "result": {...}} where result is
+            shaped like a `/predict` response, or
+            {"job_id": str, "status": "failed", "error": str}.
+            While it is pending or running, with status 202 and a
+            ``Retry-After`` header: {"job_id": str, "status": str}.
+            For an unknown or expired job, {"error": str} with status 404.
+        """
+
+        try:
+            wait = float(request.args.get("wait", 0))
+        except ValueError:
+            return jsonify({"error": "wait must be a number of seconds"}), 400
+        if not wait >= 0:
+            return jsonify({"error": "wait must be a number of seconds"}), 400
+        wait = min(wait, Config.JOBS["MAX_POLL_WAIT"])
+
+        record = self.jobs.get(job_id, wait=wait)
+        if record is None:
+            return jsonify({"error": "Unknown or expired job"}), 404
+        if record["status"] in ("done", "failed"):
+            return jsonify(record)
+        return self._job_response(record)
+
+    def _wants_job(self):
+        """
+        Whether the current `/predict` miss should be answered with a job.
+        """
+
+        if self.jobs is None:
+            return False
+        if Config.JOBS["MODE"] == "always":
+            return True
+        prefer = request.headers.get("Prefer", "")
+        return "respond-async" in (p.strip() for p in prefer.lower().split(","))
+
+    def _job_response(self, record):
+        """
+        Returns
+        -------
+        tuple[Flask Response, int]
+            202 response for an unfinished job, pointing at its status URL.
+        """
+
+        response = jsonify(record)
+        response.headers["Location"] = f"/jobs/{record['job_id']}"
+        response.headers["Retry-After"] = "1"
+        return response, 202
+
+    def predict_stream(self):
+        """
+        Handle POST requests to /predict_stream endpoint.
+
+        Takes the same payload as `/predict`, but sends the insight while it is
+        being generated instead of after the full text is available, which
+        cuts the time to first byte to the LLM's time to first token.
+
+        The response is a stream of events, as server-sent events
+        (``text/event-stream``) by default, or as newline-delimited JSON
+        objects with an ``"event"`` field when requested with
+        ``?format=ndjson`` or ``Accept: application/x-ndjson``:
+
+        - ``meta``: {"zodiac": str, "language": str, "cached": bool}, sent first.
+        - ``chunk``: {"text": str}, one per generated piece. A cached insight,
+          a sign template or a dummy prediction is sent as a single chunk.
+        - ``done``: the full `/predict` response, sent last. The assembled text
+          is cached at this point.
+        - ``error``: {"error": str}, if generation fails mid-stream.
+
+        Returns
+        -------
+        Flask Response (event stream)
+            Or, for an invalid payload, a JSON {"error": str} with status 400.
+        """
+
+        data = request.get_json(force=True, silent=True)
+        fields, error = self._parse_payload(data)
+        if error:
+            return jsonify({"error": error}), 400
+        key = self._user_key(fields)
+
+        ndjson = request.args.get("format") == "ndjson" or (
+            request.accept_mimetypes.best == "application/x-ndjson"
+        )
+        return Response(
+            stream_with_context(self._stream_insight(key, fields, ndjson)),
+            mimetype="application/x-ndjson" if ndjson else "text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    def predict_batch(self):
+        """
+        Handle POST requests to /predict_batch endpoint.
+
+        Accepts a JSON array of `/predict` payloads and answers them together:
+
+        1. Validate every item; invalid items get a per-item error.
+        2. Answer cache hits immediately.
+        3. Resolve zodiac signs of the misses and group them by (zodiac, language).
+        4. Generate each group with shared multi-person LLM prompts (or the dummy
+           predictor and translator in dummy mode), at batch priority: the LLM
+           quota serves interactive requests first.
+        5. Cache the generated results.
+
+        When the LLM quota is so busy that batch calls would not start within
+        their maximum wait, the batch is refused with 429 and a Retry-After
+        header instead of being answered with fallback insights.
+
+        Returns
+        -------
+        Flask Response (JSON)
+            {"results": [...]} with one entry per input item, in input order.
+            Each entry is shaped like a `/predict` response, or {"error": str}.
+        """
+
+        try:
+            items = request.get_json(force=True)
+            if not isinstance(items, list):
+                return jsonify({"error": "Expected a JSON array of payloads"}), 400
+            if len(items) > Config.BATCH["MAX_ITEMS"]:
+                return (
+                    jsonify(
+                        {"error": f"At most {Config.BATCH['MAX_ITEMS']} items allowed"}
+                    ),
+                    400,
                 )
 
-            if not all([name, birth_date, birth_time, birth_place]):
-                return jsonify({"error": "Missing required fields"}), 400
-            if not Utils.validate_date(birth_date):
-                return jsonify({"error": "Invalid date format"}), 400
+            results = [None] * len(items)
+            misses = {}  # key -> (fields, indices)
+            for i, item in enumerate(items):
+                fields, error = self._parse_payload(item)
+                if error:
+                    results[i] = {"error": error}
+                    continue
+                key = self._user_key(fields)
+                cached = self._lookup_cache(key)
+                if cached:
+                    results[i] = {**cached, "cached": True}
+                elif key in misses:
+                    misses[key][1].append(i)
+                else:
+                    misses[key] = (fields, [i])
 
-            key = Utils.user_key(name, birth_date)
+            retry_after = self._quota_retry_after(BATCH) if misses else None
+            if retry_after is not None:
+                response = jsonify(
+                    {
+                        "error": "LLM quota exhausted, retry later",
+                        "retry_after": retry_after,
+                    }
+                )
+                response.headers["Retry-After"] = str(retry_after)
+                return response, 429
 
-            cached = self.cache.get(key)
-            if cached:
-                return jsonify({**cached, "cached": True})
+            with self._stage("zodiac"):
+                zodiacs = self.model_infer.get_zodiac_signs(
+                    [fields["birth_date"] for fields, _ in misses.values()],
+                    [fields["birth_time"] for fields, _ in misses.values()],
+                    [fields["timezone"] for fields, _ in misses.values()],
+                )
+            groups = {}  # (zodiac, language) -> [key, ...]
+            for (key, (fields, _)), zodiac in zip(misses.items(), zodiacs):
+                groups.setdefault((zodiac, fields["language"]), []).append(key)
+
+            for (zodiac, language), keys in groups.items():
+                names = list(dict.fromkeys(misses[key][0]["name"] for key in keys))
+                try:
+                    with llm_priority(BATCH):
+                        insights = self._generate_group(zodiac, names, language)
+                except Exception as e:
+                    for key in keys:
+                        for i in misses[key][1]:
+                            results[i] = {"error": str(e)}
+                    continue
+
+                for key in keys:
+                    insight = insights[misses[key][0]["name"]]
+                    with self._stage("cache_write"):
+                        self.cache.set(
+                            key, zodiac, insight, language, misses[key][0]["timezone"]
+                        )
+                    for i in misses[key][1]:
+                        results[i] = {
+                            "zodiac": zodiac,
+                            "insight": insight,
+                            "language": language,
+                            "cached": False,
+                        }
 
-            zodiac = self.model_infer.get_zodiac_sign(birth_date)
+            return jsonify({"results": results})
+
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
 
-            if Config.USE_DUMMY_LLM:
+    def cache_stats(self):
+        """
+        Handle GET requests to /cache/stats.
+
+        Returns
+        -------
+        Flask Response (JSON)
+            Counters and size reported by `Cache.stats()`, with the translation
+            memo counters under "translations" and the LLM response cache
+            counters under "prompts" when those caches are enabled.
+        """
+
+        stats = self.cache.stats()
+        if self.translator.memo is not None:
+            stats["translations"] = self.translator.memo.stats()
+        if self.model_infer.responses is not None:
+            stats["prompts"] = self.model_infer.responses.stats()
+        return jsonify(stats)
+
+    def metrics_endpoint(self):
+        """
+        Handle GET requests to /metrics.
+
+        Samples the insight cache size, then renders every metric of this
+        process.
+
+        Returns
+        -------
+        Flask Response (text/plain; version=0.0.4)
+            The metrics in the Prometheus text exposition format.
+        """
+
+        stats = self.cache.stats()
+        for name, gauge in self._cache_gauges.items():
+            if name in stats:
+                gauge.set(stats[name])
+        return Response(self.metrics.render(), mimetype="text/plain; version=0.0.4")
+
+    def admin_profile(self):
+        """
+        Handle requests to /admin/profile.
+
+        - GET returns the profiler status and the profiles on disk.
+        - POST arms profiling of the next prediction requests with a JSON body
+          {"mode": "cprofile" | "sample", "requests": int, "all_threads": bool};
+          ``all_threads`` samples every thread (e.g. the background event loop),
+          not only the one serving the request.
+        - DELETE disarms it.
+
+        Requires the ``X-Profile-Token`` header when `Config.PROFILING["TOKEN"]`
+        is set, otherwise a request from localhost.
+
+        Returns
+        -------
+        Flask Response (JSON)
+            The profiler status, or {"error": str} with status 400 or 403.
+        """
+
+        if not self._profiling_allowed():
+            return jsonify({"error": "Profiling not allowed"}), 403
+
+        if request.method == "POST":
+            data = request.get_json(force=True, silent=True) or {}
+            try:
+                self.profiler.arm(
+                    data.get("mode", "sample"),
+                    int(data.get("requests", 1)),
+                    all_threads=bool(data.get("all_threads", False)),
+                )
+            except (TypeError, ValueError) as e:
+                return jsonify({"error": str(e)}), 400
+        elif request.method == "DELETE":
+            self.profiler.disarm()
+
+        return jsonify(self.profiler.status())
+
+    def _parse_payload(self, data):
+        """
+        Extract and validate the fields of a `/predict` payload.
+
+        Every field must be a string; unsupported languages fall back to
+        English.
+
+        Returns
+        -------
+        tuple[dict | None, str | None]
+            The fields (name, birth_date, birth_time, birth_place, timezone,
+            language) and None, or None and an error message. ``timezone`` is
+            the birth place's IANA timezone, or None if it is unknown.
+        """
+
+        if not isinstance(data, dict):
+            return None, "Payload must be a JSON object"
+
+        name = data.get("name")
+        birth_date = data.get("birth_date")
+        birth_time = data.get("birth_time")
+        birth_place = data.get("birth_place")
+        language = data.get("language", "English")
+
+        required = (name, birth_date, birth_time, birth_place)
+        if not all(required):
+            return None, "Missing required fields"
+        if not all(isinstance(value, str) for value in (*required, language)):
+            return None, "Fields must be strings"
+
+        if language not in self.translator.lang_to_code:
+            language = "English"
+            print(
+                "Choice of language not Supported or LAnguage name not started with Upper Case!!"
+            )
+
+        if not Utils.validate_date(birth_date):
+            return None, "Invalid date format"
+
+        return {
+            "name": name,
+            "birth_date": birth_date,
+            "birth_time": birth_time,
+            "birth_place": birth_place,
+            "timezone": self._birth_timezone(birth_place),
+            "language": language,
+        }, None
+
+    @staticmethod
+    def _user_key(fields):
+        """
+        Returns
+        -------
+        str
+            Cache and single-flight key of a payload parsed by `_parse_payload`.
+        """
+
+        return Utils.user_key(
+            fields["name"],
+            fields["birth_date"],
+            fields["birth_time"],
+            fields["timezone"],
+        )
+
+    def _birth_timezone(self, birth_place):
+        """
+        Resolve a birth place to its IANA timezone with the offline gazetteer.
+
+        Returns
+        -------
+        str or None
+            The timezone, or None if the gazetteer is disabled or the place
+            is unknown.
+        """
+
+        if self.gazetteer is None or not isinstance(birth_place, str):
+            return None
+        return self.gazetteer.timezone_for(birth_place)
+
+    def _generate_insight(self, zodiac, name, language):
+        """
+        Generate the insight text for one user in the requested language.
+
+        Uses the dummy predictor plus translator in dummy mode, otherwise today's
+        sign template (when enabled) with the live LLM as fallback.
+        """
+
+        if Config.USE_DUMMY_LLM:
+            with self._stage("generate"):
                 insight = self.model_infer.generate_insight_from_dummy_predictor(
                     zodiac, name
                 )
-                if language != "English":
+            if language != "English":
+                self._translations.inc(language=language)
+                with self._stage("translate"):
                     language_code = self.translator.lang_to_code[language]
-                    translated = self.translator.translate(insight, language_code)
+                    return self.translator.translate(insight, language_code)
+            return insight
 
-                else:
-                    translated = insight
-            else:
+        with self._stage("generate"):
+            insight = None
+            if Config.SIGN_TEMPLATES["ENABLED"]:
+                insight = self.model_infer.generate_insight_from_template(
+                    zodiac, name, language
+                )
+            if insight is None:
                 insight = self.model_infer.generate_insight_from_llm(
                     zodiac, name, language
                 )
+        return insight
+
+    def _generate_insight_stream(self, zodiac, name, language):
+        """
+        Streaming counterpart of `_generate_insight`.
+
+        Yields
+        ------
+        str
+            Pieces of the insight text: streamed from the live LLM, or the whole
+            text at once for dummy predictions and sign templates.
+        """
+
+        if Config.USE_DUMMY_LLM:
+            yield self._generate_insight(zodiac, name, language)
+            return
+
+        if Config.SIGN_TEMPLATES["ENABLED"]:
+            insight = self.model_infer.generate_insight_from_template(
+                zodiac, name, language
+            )
+            if insight is not None:
+                yield insight
+                return
+
+        yield from self.model_infer.generate_insight_stream_from_llm(
+            zodiac, name, language
+        )
+
+    def _stream_insight(self, key, fields, ndjson=False):
+        """
+        Produce the `/predict_stream` events for one validated payload.
+
+        Yields
+        ------
+        str
+            Encoded ``meta``, ``chunk``, ``done`` or ``error`` events.
+        """
 
-                translated = insight
+        def meta(zodiac, language, cached):
+            return event(
+                "meta", {"zodiac": zodiac, "language": language, "cached": cached}
+            )
+
+        def event(name, data):
+            if ndjson:
+                return json.dumps({"event": name, **data}, ensure_ascii=False) + "\n"
+            return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+        try:
+            cached = self._lookup_cache(key)
+            if cached:
+                yield meta(cached["zodiac"], cached["language"], True)
+                yield event("chunk", {"text": cached["insight"]})
+                yield event("done", {**cached, "cached": True})
+                return
+
+            name, language = fields["name"], fields["language"]
+            with self._stage("zodiac"):
+                zodiac = self.model_infer.get_zodiac_sign(
+                    fields["birth_date"], fields["birth_time"], fields["timezone"]
+                )
+            yield meta(zodiac, language, False)
 
-            self.cache.set(key, zodiac, translated, language)
+            pieces = []
+            for piece in self._generate_insight_stream(zodiac, name, language):
+                pieces.append(piece)
+                yield event("chunk", {"text": piece})
+            insight = "".join(pieces)
 
-            return jsonify(
+            with self._stage("cache_write"):
+                self.cache.set(key, zodiac, insight, language, fields["timezone"])
+            yield event(
+                "done",
                 {
                     "zodiac": zodiac,
-                    "insight": translated,
+                    "insight": insight,
                     "language": language,
                     "cached": False,
-                }
+                },
             )
 
         except Exception as e:
-            return jsonify({"error": str(e)}), 500
+            yield event("error", {"error": str(e)})
+
+    def _quota_retry_after(self, priority):
+        """
+        Returns
+        -------
+        int or None
+            Seconds after which LLM calls at ``priority`` are expected to start
+            within their maximum wait, or None if they can be made now (or the
+            LLM quota is not scheduled).
+        """
+
+        if Config.USE_DUMMY_LLM or not Config.LLM_QUOTA["ENABLED"]:
+            return None
+        scheduler = QuotaScheduler.shared()
+        max_wait = scheduler.max_wait.get(priority)
+        wait = scheduler.estimated_wait(priority)
+        if max_wait is None or wait <= max_wait:
+            return None
+        return math.ceil(wait - max_wait)
+
+    def _generate_group(self, zodiac, names, language):
+        """
+        Generate insights for several users sharing a zodiac sign and language.
+
+        Sign templates are used where available; the remaining names share
+        multi-person LLM prompts. In dummy mode every name is generated on its own.
+
+        Returns
+        -------
+        dict[str, str]
+            Insight text for every name.
+        """
+
+        if Config.USE_DUMMY_LLM:
+            return {
+                name: self._generate_insight(zodiac, name, language) for name in names
+            }
+
+        insights = {}
+        with self._stage("generate"):
+            if Config.SIGN_TEMPLATES["ENABLED"]:
+                for name in names:
+                    insight = self.model_infer.generate_insight_from_template(
+                        zodiac, name, language
+                    )
+                    if insight is not None:
+                        insights[name] = insight
+
+            remaining = [name for name in names if name not in insights]
+            if remaining:
+                insights.update(
+                    self.model_infer.generate_insights_batch(
+                        zodiac, remaining, language
+                    )
+                )
+        return insights
+
+    def _resolve_miss(self, key, fields):
+        """
+        Answer a cache miss. Concurrent misses for the same user, in request
+        threads or background jobs, share one generation.
+
+        Returns
+        -------
+        dict
+            The `/predict` response: the cache entry and its "cached" flag.
+        """
+
+        (entry, cached), shared = self.in_flight.do(
+            key, self._lookup_or_generate, key, fields
+        )
+        if shared:
+            self._coalesced.inc()
+        return {**entry, "cached": cached}
+
+    def _lookup_or_generate(self, key, fields):
+        """
+        Resolve a cache miss: generate, translate and cache the insight.
+
+        Runs once per key at a time under `self.in_flight`. The cache is
+        checked again first, because an identical request may have finished
+        between the caller's cache lookup and joining the in-flight registry.
+
+        Returns
+        -------
+        tuple[dict, bool]
+            The cache entry (zodiac, insight, language) and whether it was
+            already cached.
+        """
+
+        cached = self.cache.get(key)
+        if cached:
+            return cached, True
+
+        name, language = fields["name"], fields["language"]
+        with self._stage("zodiac"):
+            zodiac = self.model_infer.get_zodiac_sign(
+                fields["birth_date"], fields["birth_time"], fields["timezone"]
+            )
+        translated = self._generate_insight(zodiac, name, language)
+
+        with self._stage("cache_write"):
+            self.cache.set(key, zodiac, translated, language, fields["timezone"])
+
+        return {"zodiac": zodiac, "insight": translated, "language": language}, False
 
     def run(self, host="0.0.0.0", port=8000, debug=True):
         """
@@ -193,6 +1021,9 @@ class UIInterface:
             Enable or disable Flask debug mode (default is True).
 
         This method blocks and runs the Flask server to handle incoming API requests.
+        The auto-reloader stays off even in debug mode: it would serve from a
+        child process while this one keeps the cache log files open, and a
+        log file has a single owner process.
         """
 
-        self.app.run(host=host, port=port, debug=debug)
+        self.app.run(host=host, port=port, debug=debug, use_reloader=False)
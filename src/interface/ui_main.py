@@ -6,7 +6,9 @@ Module to initialize and launch the Astro Insight Generator UI backend.
 This module defines the `UIStarter` class, which orchestrates:
 - Loading global configuration from `Config`.
 - Setting up the model pipeline via `ModelSetUp` and `ModelInference`.
-- Launching the Flask-based UI interface (`UIInterface`) for handling API requests.
+- Launching the Flask-based UI interface (`UIInterface`) for handling API requests,
+  on the Flask development server or, in production mode, on the pre-fork
+  `ProductionServer`.
 
 Classes
 -------
@@ -33,7 +35,9 @@ class UIStarter:
     Methods
     -------
     launch():
-        Starts the Flask server with configured host, port, and debug mode.
+        Starts the server selected by `Config.SERVER["MODE"]`: the Flask
+        development server with configured host, port, and debug mode, or the
+        multi-process production server with configured workers and threads.
 
     start() -> classmethod:
         Convenience method to create a `UIStarter` instance and immediately launch the server.
@@ -46,6 +50,13 @@ class UIStarter:
         self.ui_interface = UIInterface(self.model_infer)
 
     def launch(self):
+        if self.config.SERVER["MODE"] == "production":
+            # Imported here: gunicorn is POSIX-only and unused by the dev server.
+            from src.interface.server import ProductionServer
+
+            ProductionServer(self.ui_interface.app).run()
+            return
+
         self.ui_interface.run(
             host=self.config.SERVER["HOST"],
             port=self.config.SERVER["PORT"],
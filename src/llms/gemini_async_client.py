@@ -0,0 +1,282 @@
+import asyncio
+import os
+import queue
+import threading
+import weakref
+from google import genai
+from google.genai import types
+from dotenv import load_dotenv
+
+from src.utils.event_loop import BackgroundEventLoop
+
+
+class AsyncGoogle_LLM:
+    """
+    Asynchronous wrapper around Google's Gemini LLM API.
+
+    Uses the SDK's async surface (`client.aio`) so that many generations can
+    be in flight at once on a single event loop instead of parking one thread
+    per call.
+
+    - One `genai.Client` is shared per API key within a process, so the
+      underlying HTTP connection pool is reused across instances and calls.
+    - A semaphore bounds the number of concurrent generations per event loop.
+    - Every call is subject to a timeout.
+
+    `generate_text` and `generate_text_stream` are synchronous shims with the
+    same signatures as their `Google_LLM` counterparts: they run the coroutines
+    on the process-wide `BackgroundEventLoop`, so existing synchronous callers
+    keep working.
+
+    Attributes
+    ----------
+    client : genai.Client
+        Shared Google Generative AI client (one per API key and base URL).
+    model : str
+        The name of the Gemini model to use (default: "gemini-2.0-flash").
+    max_concurrency : int
+        Maximum number of concurrent generations per event loop.
+    timeout : float or None
+        Default per-call timeout in seconds.
+    """
+
+    _clients: dict[tuple[int, str, str | None], genai.Client] = {}
+    _clients_lock = threading.Lock()
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-2.0-flash",
+        max_concurrency: int = 64,
+        timeout: float | None = 30.0,
+        base_url: str | None = None,
+    ):
+        """
+        Initialize the async Google LLM client.
+
+        Parameters
+        ----------
+        api_key : str
+            API key for authenticating with Google Gemini API.
+        model : str, optional
+            Model name to use for generation (default: "gemini-2.0-flash").
+        max_concurrency : int, optional
+            Maximum concurrent generations per event loop (default: 64).
+        timeout : float, optional
+            Default per-call timeout in seconds (default: 30). None disables it.
+        base_url : str, optional
+            Alternative API endpoint, e.g. a local stand-in server for
+            benchmarks. Defaults to the public Gemini API.
+        """
+
+        self.client = self._shared_client(api_key, base_url)
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    @classmethod
+    def _shared_client(cls, api_key: str, base_url: str | None = None) -> genai.Client:
+        # Keyed by pid too: connection pools must not be shared across fork().
+        key = (os.getpid(), api_key, base_url)
+        with cls._clients_lock:
+            client = cls._clients.get(key)
+            if client is None:
+                http_options = (
+                    types.HttpOptions(base_url=base_url) if base_url else None
+                )
+                client = cls._clients[key] = genai.Client(
+                    api_key=api_key, http_options=http_options
+                )
+            return client
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        # asyncio primitives are bound to the loop they are first used on.
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(
+                self.max_concurrency
+            )
+        return semaphore
+
+    async def agenerate_text(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        top_p: float = 0.95,
+        max_tokens: int = 512,
+        timeout: float | None = None,
+    ) -> str:
+        """
+        Generate a single text response for a given prompt.
+
+        Parameters
+        ----------
+        prompt : str
+            Input text prompt for the model.
+        temperature : float, optional
+            Sampling temperature for controlling randomness (default: 0.3).
+        top_p : float, optional
+            Nucleus sampling parameter for probability mass (default: 0.95).
+        max_tokens : int, optional
+            Maximum number of tokens in the response (default: 512).
+        timeout : float, optional
+            Per-call timeout in seconds, waiting for a concurrency slot
+            included. Defaults to `self.timeout`.
+
+        Returns
+        -------
+        str
+            Generated text response.
+
+        Raises
+        ------
+        TimeoutError
+            If the call does not complete within the timeout.
+        """
+
+        timeout = self.timeout if timeout is None else timeout
+
+        async def _call():
+            async with self._semaphore():
+                response = await self.client.aio.models.generate_content(
+                    model=self.model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        temperature=temperature,
+                        top_p=top_p,
+                        max_output_tokens=max_tokens,
+                    ),
+                )
+                return response.text
+
+        return await asyncio.wait_for(_call(), timeout)
+
+    def generate_text(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        top_p: float = 0.95,
+        max_tokens: int = 512,
+    ) -> str:
+        """
+        Synchronous shim around `agenerate_text` for existing callers.
+
+        Runs the generation on the shared background event loop and blocks
+        the calling thread until it completes.
+        """
+
+        return BackgroundEventLoop.shared().run(
+            self.agenerate_text(prompt, temperature, top_p, max_tokens)
+        )
+
+    async def agenerate_text_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        top_p: float = 0.95,
+        max_tokens: int = 512,
+        timeout: float | None = None,
+    ):
+        """
+        Generate a text response for a given prompt, chunk by chunk.
+
+        Parameters are the same as `agenerate_text`; the timeout bounds the
+        wait for a concurrency slot and for each chunk.
+
+        Yields
+        ------
+        str
+            Successive pieces of the generated text.
+
+        Raises
+        ------
+        TimeoutError
+            If a concurrency slot or the next chunk takes longer than the timeout.
+        """
+
+        timeout = self.timeout if timeout is None else timeout
+        semaphore = self._semaphore()
+        await asyncio.wait_for(semaphore.acquire(), timeout)
+        try:
+            stream = await asyncio.wait_for(
+                self.client.aio.models.generate_content_stream(
+                    model=self.model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        temperature=temperature,
+                        top_p=top_p,
+                        max_output_tokens=max_tokens,
+                    ),
+                ),
+                timeout,
+            )
+            chunks = aiter(stream)
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(anext(chunks), timeout)
+                except StopAsyncIteration:
+                    break
+                if chunk.text:
+                    yield chunk.text
+        finally:
+            semaphore.release()
+
+    def generate_text_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        top_p: float = 0.95,
+        max_tokens: int = 512,
+    ):
+        """
+        Synchronous shim around `agenerate_text_stream` for existing callers.
+
+        The stream is consumed on the shared background event loop and its
+        chunks are handed to the calling thread through a queue. Closing the
+        generator early cancels the underlying stream.
+        """
+
+        chunks = queue.Queue()
+        done = object()
+
+        async def _pump():
+            try:
+                async for chunk in self.agenerate_text_stream(
+                    prompt, temperature, top_p, max_tokens
+                ):
+                    chunks.put(chunk)
+            except BaseException as e:
+                chunks.put(e)
+                raise
+            finally:
+                chunks.put(done)
+
+        future = BackgroundEventLoop.shared().submit(_pump())
+        try:
+            while True:
+                chunk = chunks.get()
+                if chunk is done:
+                    return
+                if isinstance(chunk, BaseException):
+                    raise chunk
+                yield chunk
+        finally:
+            future.cancel()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+
+    api_key = os.getenv("GEMINI_API_KEY")
+    llm = AsyncGoogle_LLM(api_key, max_concurrency=8)
+
+    async def main():
+        prompts = [f"Name a word that rhymes with number {i}." for i in range(5)]
+        replies = await asyncio.gather(*(llm.agenerate_text(p) for p in prompts))
+        for reply in replies:
+            print(reply)
+
+    BackgroundEventLoop.shared().run(main())
+    print(llm.generate_text("what comes after monday?"))
@@ -9,7 +9,7 @@ class Google_LLM:
     Wrapper class for interacting with Google's Gemini LLM API.
 
     Provides utility methods for:
-    - Single-prompt text generation.
+    - Single-prompt text generation, whole or streamed chunk by chunk.
     - Initializing and maintaining a persistent chat session.
     - Exchanging messages in a conversational context.
     - Retrieving chat history.
@@ -24,7 +24,12 @@ class Google_LLM:
         Active chat session object, initialized with `start_chat()`.
     """
 
-    def __init__(self, api_key: str, model: str = "gemini-2.0-flash"):
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "gemini-2.0-flash",
+        base_url: str | None = None,
+    ):
         """
         Initialize the Google LLM client with API key and model.
 
@@ -34,8 +39,12 @@ class Google_LLM:
             API key for authenticating with Google Gemini API.
         model : str, optional
             Model name to use for generation (default: "gemini-2.0-flash").
+        base_url : str, optional
+            Alternative API endpoint, e.g. a local stand-in server for
+            benchmarks. Defaults to the public Gemini API.
         """
-        self.client = genai.Client(api_key=api_key)
+        http_options = types.HttpOptions(base_url=base_url) if base_url else None
+        self.client = genai.Client(api_key=api_key, http_options=http_options)
         self.model = model
         self.chat = None
 
@@ -77,6 +86,38 @@ class Google_LLM:
         )
         return response.text
 
+    def generate_text_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        top_p: float = 0.95,
+        max_tokens: int = 512,
+    ):
+        """
+        Generate a text response for a given prompt, chunk by chunk.
+
+        Parameters are the same as `generate_text`.
+
+        Yields
+        ------
+        str
+            Successive pieces of the generated text, as soon as the model
+            produces them. Their concatenation is the full response.
+        """
+
+        stream = self.client.models.generate_content_stream(
+            model=self.model,
+            contents=prompt,
+            config=types.GenerateContentConfig(
+                temperature=temperature,
+                top_p=top_p,
+                max_output_tokens=max_tokens,
+            ),
+        )
+        for chunk in stream:
+            if chunk.text:
+                yield chunk.text
+
 
 if __name__ == "__main__":
     load_dotenv()
@@ -90,3 +131,8 @@ if __name__ == "__main__":
     # Single text generation
     story = llm.generate_text("what comes after monday?")
     print("Story:\n", story)
+
+    # Streamed generation
+    for piece in llm.generate_text_stream("Tell a two-line story about monday."):
+        print(piece, end="", flush=True)
+    print()
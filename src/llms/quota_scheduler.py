@@ -0,0 +1,633 @@
+"""
+quota_scheduler.py
+
+Quota-aware scheduling of LLM calls.
+
+Gemini enforces per-minute quotas on requests and tokens; a call over quota
+fails, and every request of a burst ends up with a fallback insight. The
+`QuotaScheduler` keeps calls under the quota instead:
+
+- two token buckets, refilled continuously, limit requests per minute and
+  tokens per minute (prompt plus reserved output budget; the unused part of
+  the output budget is refunded when the reply is known),
+- calls that cannot start right away wait in a priority queue, so
+  interactive traffic goes ahead of batch and pre-warm work; within a
+  priority, calls are served in arrival order,
+- every call has a maximum queueing time (per priority by default). A call
+  that would wait longer is refused at once with `QuotaExceededError`, whose
+  ``retry_after`` tells the caller when capacity is expected; `estimated_wait`
+  gives the same signal without queueing, so callers can choose between
+  waiting and falling back.
+
+The priority and maximum wait of the calls made in a block of code are set
+with `llm_priority`; they follow the code into coroutines run on the
+`BackgroundEventLoop`.
+
+Classes
+-------
+QuotaExceededError
+    The call was refused because the quota would not allow it in time.
+TokenBucket
+    Continuously refilled budget of requests or tokens.
+QuotaScheduler
+    Token buckets, priority queue and dispatcher thread.
+ScheduledLLM
+    LLM wrapper acquiring quota from a `QuotaScheduler` before every call.
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import os
+import threading
+import time
+
+from src.utils.metrics import Metrics
+
+INTERACTIVE, BATCH, PREWARM = "interactive", "batch", "prewarm"
+PRIORITIES = (INTERACTIVE, BATCH, PREWARM)  # highest first
+_RANK = {priority: rank for rank, priority in enumerate(PRIORITIES)}
+
+_UNSET = object()
+# (priority, max_wait) of the LLM calls made in the current context.
+_call_options = contextvars.ContextVar("llm_call_options", default=(None, _UNSET))
+
+
+@contextlib.contextmanager
+def llm_priority(priority: str | None = None, max_wait=_UNSET):
+    """
+    Set the priority and maximum queueing time of the LLM calls in a block.
+
+    Parameters
+    ----------
+    priority : str, optional
+        One of `PRIORITIES`; None keeps the current priority.
+    max_wait : float or None, optional
+        Seconds a call may wait for quota; None waits as long as needed.
+        Defaults to the scheduler's setting for the priority.
+    """
+
+    if priority is None:
+        priority = _call_options.get()[0]
+    elif priority not in _RANK:
+        raise ValueError(f"Unknown priority {priority!r}; use one of {PRIORITIES}")
+    token = _call_options.set((priority, max_wait))
+    try:
+        yield
+    finally:
+        _call_options.reset(token)
+
+
+class QuotaExceededError(RuntimeError):
+    """
+    The LLM quota would not allow the call within its maximum wait.
+
+    Attributes
+    ----------
+    priority : str
+        Priority of the refused call.
+    retry_after : float or None
+        Estimated seconds until the call could start, if known.
+    """
+
+    def __init__(self, message: str, priority: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.priority = priority
+        self.retry_after = retry_after
+
+
+class TokenBucket:
+    """
+    Budget refilled at a constant rate up to a burst capacity.
+
+    Not thread-safe: `QuotaScheduler` only uses it under its own lock.
+    A per-minute limit of None or 0 means unlimited. A single demand larger
+    than the capacity is admitted when the bucket is full and leaves it in
+    debt, so oversized calls are slowed down but never starved.
+
+    Attributes
+    ----------
+    rate : float
+        Units added per second.
+    capacity : float
+        Maximum units held (the largest burst).
+    """
+
+    def __init__(self, per_minute: float | None, burst_seconds: float = 5.0):
+        self.rate = (per_minute or 0) / 60.0
+        self.capacity = max(self.rate * burst_seconds, 1.0)
+        self.available = self.capacity
+        self._updated = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def refill(self, now: float):
+        if self.unlimited:
+            return
+        elapsed = now - self._updated
+        self._updated = now
+        if elapsed > 0:
+            self.available = min(self.capacity, self.available + elapsed * self.rate)
+
+    def delay(self, amount: float) -> float:
+        """
+        Returns
+        -------
+        float
+            Seconds until ``amount`` units can be taken (0 if they can now).
+        """
+
+        if self.unlimited:
+            return 0.0
+        missing = min(amount, self.capacity) - self.available
+        return max(missing, 0.0) / self.rate
+
+    def take(self, amount: float):
+        if not self.unlimited:
+            self.available -= amount
+
+    def refund(self, amount: float):
+        if not self.unlimited:
+            self.available = min(self.capacity, self.available + amount)
+
+
+class _Waiter:
+    __slots__ = ("priority", "tokens", "enqueued_at", "granted", "cancelled", "wake")
+
+    def __init__(self, priority: str, tokens: int, wake):
+        self.priority = priority
+        self.tokens = tokens
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.cancelled = False
+        self.wake = wake
+
+
+class QuotaScheduler:
+    """
+    Admits LLM calls under request and token rate limits, by priority.
+
+    A call that fits in both buckets and finds no queue starts at once, on
+    the caller's thread. Otherwise it joins a priority queue served by a
+    dispatcher thread, which grants the head of the queue as soon as both
+    buckets can pay for it; callers block (`acquire`) or await (`aacquire`)
+    their turn. Only the head is considered, so a large call is not
+    overtaken forever by smaller ones of the same or lower priority.
+
+    Use `QuotaScheduler.shared()` to get the process-wide instance configured
+    by `Config.LLM_QUOTA`; its dispatcher is restarted after `fork()`.
+
+    Attributes
+    ----------
+    requests : TokenBucket
+        Requests-per-minute budget.
+    tokens : TokenBucket
+        Tokens-per-minute budget.
+    max_queue : int
+        Calls allowed to wait at once; further calls are refused.
+    max_wait : dict[str, float | None]
+        Default maximum queueing time per priority (None: unbounded).
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        requests_per_minute: float | None,
+        tokens_per_minute: float | None,
+        burst_seconds: float = 5.0,
+        max_queue: int = 1000,
+        max_wait: dict | None = None,
+    ):
+        self.requests = TokenBucket(requests_per_minute, burst_seconds)
+        self.tokens = TokenBucket(tokens_per_minute, burst_seconds)
+        self.max_queue = max_queue
+        self.max_wait = dict(max_wait or {})
+
+        self._cond = threading.Condition()
+        self._queue = []  # heap of (rank, sequence, waiter)
+        self._sequence = itertools.count()
+        self._queued = {p: [0, 0] for p in PRIORITIES}  # priority -> [calls, tokens]
+        self._dispatcher = None
+        self._pid = os.getpid()
+
+        metrics = Metrics.shared()
+        self._wait_seconds = metrics.histogram(
+            "llm_quota_wait_seconds",
+            "Time LLM calls waited for quota, by priority.",
+            ("priority",),
+        )
+        self._queue_depth = metrics.gauge(
+            "llm_quota_queue_depth", "LLM calls waiting for quota.", ("priority",)
+        )
+        self._rejected = metrics.counter(
+            "llm_quota_rejected_total",
+            "LLM calls refused by the quota scheduler, by priority and reason.",
+            ("priority", "reason"),
+        )
+        for priority in PRIORITIES:
+            self._queue_depth.set(0, priority=priority)
+
+    @classmethod
+    def shared(cls) -> "QuotaScheduler":
+        """
+        Returns
+        -------
+        QuotaScheduler
+            The process-wide scheduler configured by `Config.LLM_QUOTA`. In
+            production mode each worker process gets an equal share of the
+            quota.
+        """
+
+        with cls._shared_lock:
+            if cls._shared is None or cls._shared._pid != os.getpid():
+                from config.config import Config
+
+                settings = Config.LLM_QUOTA
+                processes = 1
+                if Config.SERVER["MODE"] == "production":
+                    processes = max(int(Config.SERVER["WORKERS"]), 1)
+
+                def share(limit):
+                    return limit / processes if limit else limit
+
+                cls._shared = cls(
+                    share(settings["REQUESTS_PER_MINUTE"]),
+                    share(settings["TOKENS_PER_MINUTE"]),
+                    burst_seconds=settings["BURST_SECONDS"],
+                    max_queue=settings["MAX_QUEUE"],
+                    max_wait=settings["MAX_WAIT"],
+                )
+            return cls._shared
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def acquire(self, tokens: int, priority: str | None = None, max_wait=_UNSET):
+        """
+        Block until the quota allows a call of ``tokens`` tokens.
+
+        Parameters
+        ----------
+        tokens : int
+            Tokens reserved for the call (prompt and output budget).
+        priority : str, optional
+            Defaults to the `llm_priority` of the context, else "interactive".
+        max_wait : float or None, optional
+            Defaults to the context's, else the scheduler's setting.
+
+        Raises
+        ------
+        QuotaExceededError
+            If the queue is full or the call would wait more than ``max_wait``.
+        """
+
+        priority, max_wait = self._options(priority, max_wait)
+        event = threading.Event()
+        waiter = _Waiter(priority, tokens, event.set)
+        if not self._admit(waiter, max_wait):
+            if not event.wait(max_wait):
+                self._give_up(waiter)
+        self._wait_seconds.observe(
+            time.monotonic() - waiter.enqueued_at, priority=priority
+        )
+
+    async def aacquire(self, tokens: int, priority: str | None = None, max_wait=_UNSET):
+        """
+        Awaitable variant of `acquire`. Cancelling it gives back the quota.
+        """
+
+        priority, max_wait = self._options(priority, max_wait)
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake():
+            loop.call_soon_threadsafe(_resolve, future)
+
+        waiter = _Waiter(priority, tokens, wake)
+        if not self._admit(waiter, max_wait):
+            try:
+                await asyncio.wait_for(future, max_wait)
+            except asyncio.TimeoutError:
+                self._give_up(waiter)
+            except asyncio.CancelledError:
+                with self._cond:
+                    granted = waiter.granted
+                    if not granted:
+                        self._cancel(waiter)
+                if granted:
+                    self.refund(tokens, requests=1)
+                raise
+        self._wait_seconds.observe(
+            time.monotonic() - waiter.enqueued_at, priority=priority
+        )
+
+    def refund(self, tokens: int, requests: int = 0):
+        """
+        Give back quota that was reserved but not used (e.g. the unused part
+        of an output budget).
+        """
+
+        with self._cond:
+            self.tokens.refund(tokens)
+            self.requests.refund(requests)
+            if self._queue:
+                self._cond.notify()
+
+    def estimated_wait(self, priority: str = INTERACTIVE, tokens: int = 0) -> float:
+        """
+        Backpressure signal: how long a new call would wait for quota.
+
+        Returns
+        -------
+        float
+            Estimated seconds before a call of ``tokens`` tokens at
+            ``priority`` could start, counting the calls queued ahead of it.
+        """
+
+        with self._cond:
+            self._refill()
+            return self._estimate(priority, tokens)
+
+    def stats(self) -> dict:
+        """
+        Returns
+        -------
+        dict
+            Available budgets, queued calls and estimated wait per priority.
+        """
+
+        with self._cond:
+            self._refill()
+            return {
+                "requests_available": round(self.requests.available, 2),
+                "tokens_available": round(self.tokens.available, 2),
+                "queued": {p: calls for p, (calls, _) in self._queued.items()},
+                "estimated_wait": {
+                    p: round(self._estimate(p, 0), 3) for p in PRIORITIES
+                },
+            }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    def _options(self, priority, max_wait):
+        context_priority, context_max_wait = _call_options.get()
+        priority = priority or context_priority or INTERACTIVE
+        if priority not in _RANK:
+            raise ValueError(f"Unknown priority {priority!r}; use one of {PRIORITIES}")
+        if max_wait is _UNSET:
+            max_wait = context_max_wait
+        if max_wait is _UNSET:
+            max_wait = self.max_wait.get(priority)
+        return priority, max_wait
+
+    def _admit(self, waiter: _Waiter, max_wait) -> bool:
+        """
+        Grant the call at once (True) or queue it (False).
+
+        Raises
+        ------
+        QuotaExceededError
+            If the queue is full or the estimated wait exceeds ``max_wait``.
+        """
+
+        with self._cond:
+            self._refill()
+            if not self._queue and self._delay(waiter.tokens) == 0:
+                self._take(waiter)
+                return True
+            if len(self._queue) >= self.max_queue:
+                self._reject(waiter.priority, "queue_full", None)
+            wait = self._estimate(waiter.priority, waiter.tokens)
+            if max_wait is not None and wait > max_wait:
+                self._reject(waiter.priority, "wait", wait)
+
+            rank = _RANK[waiter.priority]
+            heapq.heappush(self._queue, (rank, next(self._sequence), waiter))
+            queued = self._queued[waiter.priority]
+            queued[0] += 1
+            queued[1] += waiter.tokens
+            self._queue_depth.set(queued[0], priority=waiter.priority)
+            self._start_dispatcher()
+            self._cond.notify()
+            return False
+
+    def _give_up(self, waiter: _Waiter):
+        # The caller's max_wait ran out; the grant may have raced with it.
+        with self._cond:
+            if waiter.granted:
+                return
+            self._cancel(waiter)
+            retry_after = self._estimate(waiter.priority, waiter.tokens)
+            self._reject(waiter.priority, "wait", retry_after)
+
+    def _dispatch(self):
+        with self._cond:
+            while True:
+                delay = None
+                self._refill()
+                while self._queue:
+                    waiter = self._queue[0][2]
+                    if waiter.cancelled:
+                        heapq.heappop(self._queue)
+                        continue
+                    delay = self._delay(waiter.tokens)
+                    if delay > 0:
+                        break
+                    heapq.heappop(self._queue)
+                    self._dequeue(waiter)
+                    self._take(waiter)
+                    waiter.granted = True
+                    waiter.wake()
+                    delay = None
+                self._cond.wait(delay)
+
+    # Helpers below expect self._cond to be held.
+
+    def _start_dispatcher(self):
+        if self._dispatcher is None:
+            self._dispatcher = threading.Thread(
+                target=self._dispatch, name="llm-quota", daemon=True
+            )
+            self._dispatcher.start()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.requests.refill(now)
+        self.tokens.refill(now)
+
+    def _delay(self, tokens: int) -> float:
+        return max(self.requests.delay(1), self.tokens.delay(tokens))
+
+    def _estimate(self, priority: str, tokens: int) -> float:
+        rank = _RANK[priority]
+        calls, queued_tokens = 1, tokens
+        for other in PRIORITIES[: rank + 1]:
+            calls += self._queued[other][0]
+            queued_tokens += self._queued[other][1]
+        waits = [0.0]
+        for bucket, demand in ((self.requests, calls), (self.tokens, queued_tokens)):
+            if not bucket.unlimited:
+                waits.append(max(demand - bucket.available, 0.0) / bucket.rate)
+        return max(waits)
+
+    def _take(self, waiter: _Waiter):
+        self.requests.take(1)
+        self.tokens.take(waiter.tokens)
+
+    def _dequeue(self, waiter: _Waiter):
+        queued = self._queued[waiter.priority]
+        queued[0] -= 1
+        queued[1] -= waiter.tokens
+        self._queue_depth.set(queued[0], priority=waiter.priority)
+
+    def _cancel(self, waiter: _Waiter):
+        # Left in the heap and skipped by the dispatcher.
+        waiter.cancelled = True
+        self._dequeue(waiter)
+        self._cond.notify()
+
+    def _reject(self, priority: str, reason: str, retry_after: float | None):
+        self._rejected.inc(priority=priority, reason=reason)
+        detail = "queue is full" if reason == "queue_full" else "wait is too long"
+        raise QuotaExceededError(
+            f"LLM quota exceeded for {priority} call: {detail}",
+            priority,
+            retry_after,
+        )
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class ScheduledLLM:
+    """
+    LLM wrapper waiting for quota from a `QuotaScheduler` before each call.
+
+    Every call reserves one request and an estimate of its tokens (prompt
+    plus the whole output budget); once the reply is known, the unused part
+    of the reservation is refunded. Exposes the same `generate_text` /
+    `agenerate_text` / `generate_text_stream` surface as the Gemini clients.
+
+    Attributes
+    ----------
+    llm : Google_LLM or AsyncGoogle_LLM
+        The wrapped client.
+    scheduler : QuotaScheduler
+        Scheduler granting the quota.
+    """
+
+    CHARS_PER_TOKEN = 4
+
+    def __init__(self, llm, scheduler: QuotaScheduler):
+        self.llm = llm
+        self.scheduler = scheduler
+
+    def __getattr__(self, name):
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    def generate_text(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        top_p: float = 0.95,
+        max_tokens: int = 512,
+    ) -> str:
+        """
+        Wait for quota, then generate a reply with the wrapped client.
+
+        Raises
+        ------
+        QuotaExceededError
+            If the quota does not allow the call in time.
+        """
+
+        reserved = self._count(prompt) + max_tokens
+        self.scheduler.acquire(reserved)
+        try:
+            reply = self.llm.generate_text(
+                prompt, temperature=temperature, top_p=top_p, max_tokens=max_tokens
+            )
+        except BaseException:
+            self.scheduler.refund(max_tokens)
+            raise
+        self._settle(prompt, reserved, reply)
+        return reply
+
+    async def agenerate_text(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        top_p: float = 0.95,
+        max_tokens: int = 512,
+    ) -> str:
+        """
+        Awaitable variant of `generate_text`. Blocking clients run in a
+        worker thread.
+        """
+
+        kwargs = {"temperature": temperature, "top_p": top_p, "max_tokens": max_tokens}
+        reserved = self._count(prompt) + max_tokens
+        await self.scheduler.aacquire(reserved)
+        try:
+            if hasattr(self.llm, "agenerate_text"):
+                reply = await self.llm.agenerate_text(prompt, **kwargs)
+            else:
+                reply = await asyncio.to_thread(
+                    self.llm.generate_text, prompt, **kwargs
+                )
+        except BaseException:
+            self.scheduler.refund(max_tokens)
+            raise
+        self._settle(prompt, reserved, reply)
+        return reply
+
+    def generate_text_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        top_p: float = 0.95,
+        max_tokens: int = 512,
+    ):
+        """
+        Wait for quota, then stream a reply (the whole `generate_text` reply
+        at once if the wrapped client cannot stream).
+        """
+
+        kwargs = {"temperature": temperature, "top_p": top_p, "max_tokens": max_tokens}
+        reserved = self._count(prompt) + max_tokens
+        self.scheduler.acquire(reserved)
+        produced = 0
+        try:
+            if hasattr(self.llm, "generate_text_stream"):
+                for chunk in self.llm.generate_text_stream(prompt, **kwargs):
+                    produced += len(chunk)
+                    yield chunk
+            else:
+                reply = self.llm.generate_text(prompt, **kwargs)
+                produced = len(reply)
+                yield reply
+        finally:
+            used = self._count(prompt) + produced // self.CHARS_PER_TOKEN
+            self.scheduler.refund(max(reserved - used, 0))
+
+    def _count(self, text: str) -> int:
+        # Rough token estimate, good enough for rate limiting.
+        return len(text) // self.CHARS_PER_TOKEN + 1
+
+    def _settle(self, prompt: str, reserved: int, reply: str | None):
+        used = self._count(prompt) + self._count(reply or "")
+        if reserved > used:
+            self.scheduler.refund(reserved - used)
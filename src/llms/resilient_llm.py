@@ -0,0 +1,535 @@
+"""
+resilient_llm.py
+
+Resilience layer around an LLM client: deadlines, hedged requests and a
+circuit breaker.
+
+Without it, a slow Gemini call holds a request thread for as long as the
+upstream takes, and during an incident every request pays the full failing
+call before falling back. `ResilientLLM` wraps any client exposing
+`generate_text` (and optionally `agenerate_text` / `generate_text_stream`)
+and bounds the time a caller can spend on it:
+
+- every call has a deadline; when it passes the caller gets `TimeoutError`
+  and the attempt is cancelled (async clients) or abandoned to a bounded
+  worker pool (blocking clients),
+- once enough latencies are known, a second identical request is started
+  when the first one is slower than the recent p95 ("hedging"); the first
+  reply wins and the other attempt is cancelled. A token budget keeps
+  hedges to a small fraction of the calls,
+- a `CircuitBreaker` tracks the outcome of recent calls. When their error
+  rate crosses a threshold it opens and calls fail immediately with
+  `CircuitOpenError`, so callers fall back without waiting. After a cool-down
+  a few probe calls are let through (half-open); success closes the circuit,
+  failure opens it again.
+
+Calls refused by a `QuotaScheduler` in front of the client are not upstream
+failures: they raise `QuotaExceededError` without affecting the breaker, and
+hedges are only sent when quota is available right away.
+
+Classes
+-------
+CircuitOpenError
+    Raised instead of calling the upstream while the circuit is open.
+CircuitBreaker
+    Closed / open / half-open state machine over a window of call outcomes.
+ResilientLLM
+    LLM wrapper applying the deadline, hedging and circuit breaker.
+"""
+
+import asyncio
+import contextvars
+import functools
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from src.llms.quota_scheduler import QuotaExceededError, llm_priority
+from src.utils.event_loop import BackgroundEventLoop
+from src.utils.metrics import Metrics
+
+_END = object()
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    The circuit breaker is open: the upstream is failing and was not called.
+    """
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker over a sliding window of call outcomes.
+
+    States
+    ------
+    closed
+        Calls go through. Each outcome is recorded; when at least
+        ``min_calls`` of the last ``window`` calls are known and the share of
+        failures reaches ``error_rate``, the circuit opens.
+    open
+        Calls are refused for ``open_seconds``.
+    half_open
+        Up to ``half_open_probes`` calls at a time are let through. The first
+        success closes the circuit (with a fresh window), a failure opens it
+        again.
+
+    Thread-safe.
+    """
+
+    CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 10,
+        error_rate: float = 0.5,
+        open_seconds: float = 30.0,
+        half_open_probes: int = 1,
+    ):
+        self.window = window
+        self.min_calls = min_calls
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window)  # True for success
+        self._failures = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            return self._state
+
+    def allow(self) -> bool:
+        """
+        Ask to make a call. Every allowed call must be followed by `record`
+        or, if it was abandoned without an outcome, `release`.
+
+        Returns
+        -------
+        bool
+            False if the circuit is open (or all half-open probes are taken).
+        """
+
+        with self._lock:
+            self._maybe_half_open(time.monotonic())
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.HALF_OPEN and self._probes < self.half_open_probes:
+                self._probes += 1
+                return True
+            return False
+
+    def record(self, success: bool):
+        """
+        Record the outcome of an allowed call.
+        """
+
+        with self._lock:
+            if self._state != self.CLOSED:
+                self._probes = max(self._probes - 1, 0)
+                if self._state == self.HALF_OPEN:
+                    if success:
+                        self._close()
+                    else:
+                        self._open()
+                return
+
+            if len(self._outcomes) == self._outcomes.maxlen:
+                self._failures -= not self._outcomes[0]
+            self._outcomes.append(success)
+            self._failures += not success
+            if (
+                len(self._outcomes) >= self.min_calls
+                and self._failures >= self.error_rate * len(self._outcomes)
+            ):
+                self._open()
+
+    def release(self):
+        """
+        Give back an allowed call that ended without an outcome (cancelled).
+        """
+
+        with self._lock:
+            if self._state != self.CLOSED:
+                self._probes = max(self._probes - 1, 0)
+
+    # Helpers below expect self._lock to be held.
+
+    def _maybe_half_open(self, now: float):
+        if self._state == self.OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+
+    def _open(self):
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probes = 0
+
+    def _close(self):
+        self._state = self.CLOSED
+        self._outcomes.clear()
+        self._failures = 0
+        self._probes = 0
+
+
+class ResilientLLM:
+    """
+    LLM wrapper bounding the latency of every call.
+
+    Exposes the same `generate_text` / `agenerate_text` / `generate_text_stream`
+    surface as the Gemini clients, so it can replace them transparently.
+    Attempts run on the process-wide `BackgroundEventLoop`: natively for async
+    clients, otherwise in a bounded thread pool, whose threads may stay
+    blocked on an abandoned call until the upstream answers.
+
+    Attributes
+    ----------
+    llm : Google_LLM or AsyncGoogle_LLM
+        The wrapped client.
+    deadline : float
+        Seconds a call may take for the default output budget of 512 tokens;
+        calls with a larger ``max_tokens`` get a proportionally longer deadline.
+    hedge : bool
+        Whether hedged second requests are sent.
+    hedge_percentile : float
+        Latency percentile after which a call is hedged.
+    hedge_min_samples : int
+        Successful calls needed (per output budget) before hedging starts.
+    hedge_max_ratio : float
+        Long-run upper bound of hedged requests per call.
+    breaker : CircuitBreaker
+        Breaker guarding the upstream.
+    """
+
+    DEFAULT_MAX_TOKENS = 512
+
+    def __init__(
+        self,
+        llm,
+        deadline: float = 10.0,
+        hedge: bool = True,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20,
+        hedge_max_ratio: float = 0.1,
+        breaker: CircuitBreaker | None = None,
+        max_workers: int = 32,
+    ):
+        self.llm = llm
+        self.deadline = deadline
+        self.hedge = hedge
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_max_ratio = hedge_max_ratio
+        self.breaker = breaker or CircuitBreaker()
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._latencies: dict[int, deque] = {}  # max_tokens -> recent seconds
+        self._hedge_tokens = 1.0
+        self._pool = None
+        self._pool_pid = None
+
+        metrics = Metrics.shared()
+        self._call_seconds = metrics.histogram(
+            "llm_call_duration_seconds", "Latency of successful LLM calls."
+        )
+        self._hedges = metrics.counter(
+            "llm_hedged_requests_total", "Hedged second LLM requests sent."
+        )
+        self._deadlines = metrics.counter(
+            "llm_deadline_exceeded_total", "LLM calls abandoned at their deadline."
+        )
+        self._short_circuited = metrics.counter(
+            "llm_short_circuited_total", "LLM calls refused by the open circuit."
+        )
+        self._circuit_state = metrics.gauge(
+            "llm_circuit_open", "1 if the LLM circuit breaker is open or half-open."
+        )
+
+    @classmethod
+    def from_config(cls, llm, settings: dict) -> "ResilientLLM":
+        """
+        Wrap ``llm`` with the settings of `Config.LLM_RESILIENCE`.
+        """
+
+        breaker = CircuitBreaker(
+            window=settings["BREAKER_WINDOW"],
+            min_calls=settings["BREAKER_MIN_CALLS"],
+            error_rate=settings["BREAKER_ERROR_RATE"],
+            open_seconds=settings["BREAKER_OPEN_SECONDS"],
+            half_open_probes=settings["BREAKER_HALF_OPEN_PROBES"],
+        )
+        return cls(
+            llm,
+            deadline=settings["DEADLINE"],
+            hedge=settings["HEDGE"],
+            hedge_percentile=settings["HEDGE_PERCENTILE"],
+            hedge_min_samples=settings["HEDGE_MIN_SAMPLES"],
+            hedge_max_ratio=settings["HEDGE_MAX_RATIO"],
+            breaker=breaker,
+            max_workers=settings["MAX_WORKERS"],
+        )
+
+    def __getattr__(self, name):
+        # Anything not wrapped (chat sessions, model name, ...) goes straight
+        # to the underlying client.
+        if name == "llm":
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def generate_text(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        top_p: float = 0.95,
+        max_tokens: int = 512,
+    ) -> str:
+        """
+        Blocking `agenerate_text`, run on the background event loop.
+
+        Raises
+        ------
+        CircuitOpenError
+            If the circuit is open.
+        TimeoutError
+            If no attempt succeeded before the deadline.
+        Exception
+            The error of the last failed attempt.
+        """
+
+        return BackgroundEventLoop.shared().run(
+            self.agenerate_text(prompt, temperature, top_p, max_tokens)
+        )
+
+    async def agenerate_text(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        top_p: float = 0.95,
+        max_tokens: int = 512,
+    ) -> str:
+        """
+        Generate a reply within the deadline, hedging slow attempts.
+
+        Returns
+        -------
+        str
+            The first successful reply.
+        """
+
+        if not self._allow():
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        kwargs = {"temperature": temperature, "top_p": top_p, "max_tokens": max_tokens}
+        deadline = self.deadline * max(1.0, max_tokens / self.DEFAULT_MAX_TOKENS)
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        tasks = [asyncio.ensure_future(self._attempt(prompt, kwargs))]
+        recorded = False
+        try:
+            hedge_after = self._hedge_delay(max_tokens)
+            if hedge_after is not None and hedge_after < deadline:
+                done, _ = await asyncio.wait(tasks, timeout=hedge_after)
+                if not done and self._take_hedge_token():
+                    self._hedges.inc()
+                    with llm_priority(max_wait=0):  # never queue a hedge
+                        hedge = asyncio.ensure_future(self._attempt(prompt, kwargs))
+                    tasks.append(hedge)
+
+            error = None
+            upstream_failed = False
+            pending = set(tasks)
+            while pending:
+                remaining = deadline - (loop.time() - started)
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        self._record_success(max_tokens, loop.time() - started)
+                        recorded = True
+                        return task.result()
+                    if not isinstance(task.exception(), QuotaExceededError):
+                        upstream_failed = True
+                        error = task.exception()
+                    elif error is None:
+                        error = task.exception()
+
+            if pending:
+                self._deadlines.inc()
+                error = TimeoutError(f"LLM call exceeded its {deadline:.1f}s deadline")
+                upstream_failed = True
+            if upstream_failed:
+                self._record_failure()
+                recorded = True
+            raise error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled():
+                    task.exception()  # a losing attempt's error is not a failure
+            if not recorded:
+                self.breaker.release()  # cancelled, or refused by the quota
+
+    def generate_text_stream(
+        self,
+        prompt: str,
+        temperature: float = 0.3,
+        top_p: float = 0.95,
+        max_tokens: int = 512,
+    ):
+        """
+        Stream a reply through the circuit breaker.
+
+        Streams are not hedged. The deadline bounds the wait for each chunk
+        (time to first token, then every gap between chunks).
+
+        Yields
+        ------
+        str
+            Successive pieces of the reply.
+        """
+
+        if not self._allow():
+            raise CircuitOpenError("LLM circuit breaker is open")
+
+        kwargs = {"temperature": temperature, "top_p": top_p, "max_tokens": max_tokens}
+        if hasattr(self.llm, "generate_text_stream"):
+            chunks = iter(self.llm.generate_text_stream(prompt, **kwargs))
+        else:
+            chunks = (self.llm.generate_text(prompt, **kwargs) for _ in range(1))
+
+        # The chunks are pulled on worker threads, in the caller's context
+        # (e.g. its `llm_priority`).
+        context = contextvars.copy_context()
+        started = time.monotonic()
+        recorded = False
+        try:
+            while True:
+                future = self._executor().submit(context.run, next, chunks, _END)
+                try:
+                    chunk = future.result(timeout=self.deadline)
+                except FutureTimeoutError:
+                    self._deadlines.inc()
+                    raise TimeoutError(
+                        f"LLM stream stalled for more than {self.deadline:.1f}s"
+                    )
+                if chunk is _END:
+                    break
+                yield chunk
+            self._record_success(max_tokens, time.monotonic() - started, sample=False)
+            recorded = True
+        except (GeneratorExit, QuotaExceededError):
+            raise  # closed by the consumer or refused locally: no upstream outcome
+        except Exception:
+            self._record_failure()
+            recorded = True
+            raise
+        finally:
+            if not recorded:
+                self.breaker.release()
+
+    def stats(self) -> dict:
+        """
+        Returns
+        -------
+        dict
+            Circuit state and the current hedge delay per output budget.
+        """
+
+        with self._lock:
+            budgets = list(self._latencies)
+        return {
+            "circuit": self.breaker.state,
+            "hedge_after": {
+                budget: self._hedge_delay(budget) for budget in sorted(budgets)
+            },
+        }
+
+    # ------------------------------------------------------------------
+    # Internals
+    # ------------------------------------------------------------------
+
+    async def _attempt(self, prompt: str, kwargs: dict) -> str:
+        if hasattr(self.llm, "agenerate_text"):
+            return await self.llm.agenerate_text(prompt, **kwargs)
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self.llm.generate_text, prompt, **kwargs)
+        return await loop.run_in_executor(self._executor(), call)
+
+    def _executor(self) -> ThreadPoolExecutor:
+        # Worker threads do not survive fork(); start a pool per process.
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="llm-call"
+                )
+                self._pool_pid = os.getpid()
+            return self._pool
+
+    def _allow(self) -> bool:
+        allowed = self.breaker.allow()
+        if not allowed:
+            self._short_circuited.inc()
+        self._circuit_state.set(int(self.breaker.state != CircuitBreaker.CLOSED))
+        return allowed
+
+    def _hedge_delay(self, max_tokens: int) -> float | None:
+        """
+        Returns
+        -------
+        float or None
+            Seconds after which a call with this output budget is hedged, or
+            None if hedging is off or too few latencies are known.
+        """
+
+        if not self.hedge:
+            return None
+        with self._lock:
+            samples = sorted(self._latencies.get(max_tokens, ()))
+        if len(samples) < self.hedge_min_samples:
+            return None
+        index = min(int(len(samples) * self.hedge_percentile / 100), len(samples) - 1)
+        return samples[index]
+
+    def _take_hedge_token(self) -> bool:
+        with self._lock:
+            if self._hedge_tokens >= 1.0:
+                self._hedge_tokens -= 1.0
+                return True
+            return False
+
+    def _record_success(self, max_tokens: int, seconds: float, sample: bool = True):
+        self.breaker.record(True)
+        self._circuit_state.set(int(self.breaker.state != CircuitBreaker.CLOSED))
+        with self._lock:
+            # Every call earns a fraction of a hedge, up to a small burst.
+            self._hedge_tokens = min(self._hedge_tokens + self.hedge_max_ratio, 5.0)
+            if sample:
+                window = self._latencies.setdefault(max_tokens, deque(maxlen=200))
+                window.append(seconds)
+        if sample:
+            self._call_seconds.observe(seconds)
+
+    def _record_failure(self):
+        self.breaker.record(False)
+        with self._lock:
+            self._hedge_tokens = min(self._hedge_tokens + self.hedge_max_ratio, 5.0)
+        self._circuit_state.set(int(self.breaker.state != CircuitBreaker.CLOSED))
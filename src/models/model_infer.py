@@ -6,11 +6,29 @@ Module for running model inference in the Astro Insight Generator.
 Provides methods to:
 - Compute zodiac sign from a birth date.
 - Generate astrological insights using either a real LLM or a dummy predictor.
+- Precompute and serve per-sign daily templates (one LLM call per sign and language).
+- Share LLM replies between users whose prompts are identical (same name,
+  zodiac sign and language) through a prompt-level response cache.
 """
 
-from src.prompts.prompt import SUMMARY_PROMPT_TEMPLATE
+import asyncio
+import json
+
+from config.config import Config
+from src.prompts.prompt import (
+    SUMMARY_PROMPT_TEMPLATE,
+    SIGN_TEMPLATE_PROMPT_TEMPLATE,
+    BATCH_SUMMARY_PROMPT_TEMPLATE,
+    NAME_PLACEHOLDER,
+)
 from src.zodiac.zodiac import Zodiac
+from src.utils.utils import Utils
 from src.llms.dummy_insight_generator import DummyPredictor
+from src.llms.quota_scheduler import PREWARM, QuotaExceededError, llm_priority
+from src.models.sign_templates import SignTemplateTable
+from src.utils.metrics import Metrics
+from src.utils.single_flight import SingleFlight
+from src.cache.response_cache import ResponseCache
 
 
 class ModelInference:
@@ -22,15 +40,31 @@ class ModelInference:
     1. Generate personalized daily insights for a given zodiac and user name.
     2. Retrieve zodiac sign from birth date.
     3. Support both LLM-based and dummy prediction pipelines.
+    4. Maintain the table of per-sign daily templates.
 
     Attributes
     ----------
+    model_setup : ModelSetUp
+        Holder of the LLM and other model configurations.
     llm : object
-        LLM object initialized by ModelSetUp to generate text-based insights.
+        LLM object provided by ModelSetUp to generate text-based insights,
+        resolved on first use.
     dummy_predictor : DummyPredictor
         Simple rule-based predictor for generating insights without an LLM.
+    sign_templates : SignTemplateTable
+        Today's precomputed (sign, language) templates.
+    llm_errors : Counter
+        Failed LLM calls, by call type ("generate", "stream" or "batch").
+    fallback_insights : Counter
+        Fallback messages served instead of a generated insight, by source.
+    responses : ResponseCache or None
+        Prompt-level cache of LLM replies, if enabled; opened on first use.
     """
 
+    # Generation parameters of single-insight prompts, part of the response
+    # cache key so that a change of parameters never serves stale replies.
+    INSIGHT_PARAMS = {"temperature": 0.3, "top_p": 0.95, "max_tokens": 512}
+
     def __init__(self, model_setup):
         """
         Initialize the ModelInference instance.
@@ -41,8 +75,41 @@ class ModelInference:
             Object that holds the loaded LLM or other model configurations.
         """
 
-        self.llm = model_setup.llm
+        self.model_setup = model_setup
         self.dummy_predictor = DummyPredictor()
+        self.sign_templates = SignTemplateTable(
+            Config.SIGN_TEMPLATES["FILE"], timezone=Config.SIGN_TEMPLATES["TIMEZONE"]
+        )
+        self._response_flight = SingleFlight()
+
+        metrics = Metrics.shared()
+        response_lookups = metrics.counter(
+            "llm_response_cache_lookups_total",
+            "Prompt-level LLM response cache lookups, by result.",
+            ("result",),
+        )
+        self._response_hits = response_lookups.labels(result="hit")
+        self._response_misses = response_lookups.labels(result="miss")
+        self.llm_errors = metrics.counter(
+            "llm_errors_total", "Failed LLM calls, by call type.", ("call",)
+        )
+        self.fallback_insights = metrics.counter(
+            "fallback_insights_total",
+            "Fallback messages served instead of a generated insight, by source.",
+            ("source",),
+        )
+
+    @property
+    def llm(self):
+        # Resolved on every use so that the LLM client is only created by
+        # the first request that needs it.
+        return self.model_setup.llm
+
+    @property
+    def responses(self):
+        # Opened by the first LLM call, so processes that never generate
+        # (e.g. a bulk run's main process) do not open its log file.
+        return ResponseCache.shared() if Config.PROMPT_CACHE["ENABLED"] else None
 
     def generate_insight_from_llm(self, zodiac: str, name: str, language: str) -> str:
         """
@@ -61,34 +128,291 @@ class ModelInference:
         -------
         str
             Generated insight text. If the LLM fails, returns a fallback message.
+
+        Notes
+        -----
+        The prompt only depends on name, zodiac and language, so the reply is
+        looked up in the response cache first, and concurrent requests for the
+        same prompt share one LLM call. Fallback messages are never cached.
         """
 
         try:
             prompt = SUMMARY_PROMPT_TEMPLATE.format(
                 zodiac=zodiac, name=name, language=language
             )
+            if self.responses is None:
+                return self.llm.generate_text(prompt, **self.INSIGHT_PARAMS)
 
-            return self.llm.generate_text(prompt)
-        except Exception:
-            return f"{name}, as a {zodiac}, your grounded nature will guide you today."
+            key = self._response_key(prompt)
+            reply = self._cached_response(key)
+            if reply is None:
+                reply, _ = self._response_flight.do(
+                    key, self._generate_response, key, prompt
+                )
+            return reply
+        except Exception as e:
+            self.llm_errors.inc(call="generate")
+            return self._fallback(zodiac, name, self._failure_source(e))
+
+    async def agenerate_insight_from_llm(
+        self, zodiac: str, name: str, language: str
+    ) -> str:
+        """
+        Awaitable variant of `generate_insight_from_llm`.
+
+        Uses the LLM's native `agenerate_text` when available (`AsyncGoogle_LLM`),
+        otherwise runs the blocking client in a worker thread.
+
+        Returns
+        -------
+        str
+            Generated insight text (from the response cache when possible).
+            If the LLM fails, returns a fallback message.
+        """
+
+        try:
+            prompt = SUMMARY_PROMPT_TEMPLATE.format(
+                zodiac=zodiac, name=name, language=language
+            )
+            key = self._response_key(prompt)
+            reply = self._cached_response(key)
+            if reply is not None:
+                return reply
+
+            if hasattr(self.llm, "agenerate_text"):
+                reply = await self.llm.agenerate_text(prompt, **self.INSIGHT_PARAMS)
+            else:
+                reply = await asyncio.to_thread(
+                    self.llm.generate_text, prompt, **self.INSIGHT_PARAMS
+                )
+            self._store_response(key, reply)
+            return reply
+        except Exception as e:
+            self.llm_errors.inc(call="generate")
+            return self._fallback(zodiac, name, self._failure_source(e))
+
+    def generate_insight_stream_from_llm(self, zodiac: str, name: str, language: str):
+        """
+        Streaming variant of `generate_insight_from_llm`.
+
+        Uses the LLM's `generate_text_stream` when available, otherwise yields
+        the whole `generate_text` reply as a single chunk.
+
+        Yields
+        ------
+        str
+            Successive pieces of the insight text, or the whole text at once
+            if it is in the response cache. If the LLM fails before producing
+            anything, the fallback message is yielded instead.
+
+        Raises
+        ------
+        Exception
+            If the LLM fails after part of the text has been yielded, since
+            the fallback message can no longer replace it.
+        """
+
+        prompt = SUMMARY_PROMPT_TEMPLATE.format(
+            zodiac=zodiac, name=name, language=language
+        )
+        key = self._response_key(prompt)
+        reply = self._cached_response(key)
+        if reply is not None:
+            yield reply
+            return
 
-    def get_zodiac_sign(self, birth_date):
+        started = False
+        try:
+            if hasattr(self.llm, "generate_text_stream"):
+                pieces = []
+                for chunk in self.llm.generate_text_stream(
+                    prompt, **self.INSIGHT_PARAMS
+                ):
+                    started = True
+                    pieces.append(chunk)
+                    yield chunk
+                self._store_response(key, "".join(pieces))
+            else:
+                reply = self.llm.generate_text(prompt, **self.INSIGHT_PARAMS)
+                self._store_response(key, reply)
+                yield reply
+        except Exception as e:
+            self.llm_errors.inc(call="stream")
+            if started:
+                raise
+            yield self._fallback(zodiac, name, self._failure_source(e))
+
+    def generate_insights_batch(
+        self, zodiac: str, names: list[str], language: str
+    ) -> dict[str, str]:
         """
-        Compute the zodiac sign from the user's birth date.
+        Generate insights for several people sharing a zodiac sign and language
+        with one multi-person LLM prompt per chunk of names.
+
+        Names whose single-person reply is already in the response cache are
+        served from it and left out of the prompts. Names missing from the LLM's
+        reply, or every name of a chunk whose reply cannot be parsed, fall back
+        to `generate_insight_from_llm`. Once the LLM quota refuses a chunk, the
+        remaining names get fallback insights without further calls.
+
+        Parameters
+        ----------
+        zodiac : str
+            Zodiac sign shared by every person.
+        names : list[str]
+            Names of the people.
+        language : str
+            Language in which to generate the insights.
+
+        Returns
+        -------
+        dict[str, str]
+            Insight text for every name.
+        """
+
+        chunk_size = Config.BATCH["MAX_NAMES_PER_PROMPT"]
+        insights = {}
+        for name in names:
+            prompt = SUMMARY_PROMPT_TEMPLATE.format(
+                zodiac=zodiac, name=name, language=language
+            )
+            reply = self._cached_response(self._response_key(prompt))
+            if reply is not None:
+                insights[name] = reply
+
+        pending = [name for name in names if name not in insights]
+        quota_exceeded = False
+        for start in range(0, len(pending), chunk_size):
+            chunk = pending[start : start + chunk_size]
+            prompt = BATCH_SUMMARY_PROMPT_TEMPLATE.format(
+                zodiac=zodiac,
+                names=json.dumps(chunk, ensure_ascii=False),
+                language=language,
+            )
+            try:
+                reply = self.llm.generate_text(
+                    prompt, max_tokens=Config.BATCH["MAX_TOKENS_PER_NAME"] * len(chunk)
+                )
+                insights.update(self._parse_batch_reply(reply, chunk))
+            except QuotaExceededError:
+                self.llm_errors.inc(call="batch")
+                quota_exceeded = True
+                break
+            except Exception:
+                self.llm_errors.inc(call="batch")
+
+        for name in names:
+            if name in insights:
+                continue
+            if quota_exceeded:
+                insights[name] = self._fallback(zodiac, name, "quota")
+            else:
+                insights[name] = self.generate_insight_from_llm(zodiac, name, language)
+        return insights
+
+    @staticmethod
+    def _parse_batch_reply(reply: str, names: list[str]) -> dict[str, str]:
+        """
+        Extract the ``{name: insight}`` JSON object from a multi-person LLM reply.
+
+        Tolerates Markdown code fences and text around the object. Only string
+        insights for the requested names are kept.
+        """
+
+        start, end = reply.find("{"), reply.rfind("}")
+        if start == -1 or end <= start:
+            return {}
+        parsed = json.loads(reply[start : end + 1])
+        if not isinstance(parsed, dict):
+            return {}
+        return {
+            name: parsed[name]
+            for name in names
+            if isinstance(parsed.get(name), str) and parsed[name].strip()
+        }
+
+    def get_zodiac_sign(
+        self,
+        birth_date: str,
+        birth_time: str | None = None,
+        timezone: str | None = None,
+    ) -> str:
+        """
+        Compute the zodiac sign from the user's birth date, and birth time when
+        exact resolution is enabled.
+
+        With `Config.ZODIAC["EXACT"]` on and a parsable ``birth_time``, the local
+        birth instant is converted to UTC and looked up in the sun-ingress table,
+        which resolves cusp days correctly. Otherwise the calendar boundaries
+        of `Zodiac.ZODIAC_DATES` are used.
 
         Parameters
         ----------
         birth_date : str
             Date of birth in YYYY-MM-DD format.
+        birth_time : str, optional
+            Local time of birth as HH:MM.
+        timezone : str, optional
+            IANA timezone of the birth place. Defaults to
+            `Config.ZODIAC["DEFAULT_TIMEZONE"]`.
 
         Returns
         -------
         str
-            Zodiac sign corresponding to the birth date.
+            Zodiac sign corresponding to the birth date (and time).
         """
 
+        if Config.ZODIAC["EXACT"] and birth_time:
+            instant = Utils.birth_instant(
+                birth_date, birth_time, timezone or Config.ZODIAC["DEFAULT_TIMEZONE"]
+            )
+            if instant is not None:
+                return Zodiac.get_zodiac_exact(instant, birth_date)
+
         return Zodiac.get_zodiac(birth_date)
 
+    def get_zodiac_signs(
+        self,
+        birth_dates: list[str],
+        birth_times: list[str] | None = None,
+        timezones: list[str | None] | None = None,
+    ) -> list[str]:
+        """
+        Compute the zodiac signs of many users.
+
+        Date-only resolution runs in one vectorized pass; exact resolution
+        (see `get_zodiac_sign`) looks up each birth instant in the ingress table.
+
+        Parameters
+        ----------
+        birth_dates : list[str]
+            Dates of birth in YYYY-MM-DD format.
+        birth_times : list[str], optional
+            Local times of birth as HH:MM, aligned with ``birth_dates``.
+        timezones : list[str], optional
+            IANA timezones of the birth places, aligned with ``birth_dates``.
+
+        Returns
+        -------
+        list[str]
+            Zodiac signs, in input order.
+        """
+
+        if Config.ZODIAC["EXACT"] and birth_times is not None:
+            timezones = timezones or [None] * len(birth_dates)
+            return [
+                self.get_zodiac_sign(birth_date, birth_time, tz)
+                for birth_date, birth_time, tz in zip(
+                    birth_dates, birth_times, timezones
+                )
+            ]
+
+        try:
+            return Zodiac.get_zodiac_many(birth_dates).tolist()
+        except ValueError:
+            # Dates that are valid but not zero-padded ISO (e.g. "1995-8-20").
+            return [Zodiac.get_zodiac(birth_date) for birth_date in birth_dates]
+
     def generate_insight_from_dummy_predictor(self, zodiac: str, name: str) -> str:
         """
         Generate a personalized insight using the dummy predictor (rule-based).
@@ -109,4 +433,120 @@ class ModelInference:
         try:
             return self.dummy_predictor.generate_text(zodiac=zodiac, name=name)
         except Exception:
-            return f"{name}, as a {zodiac}, your grounded nature will guide you today."
+            return self._fallback(zodiac, name, "dummy")
+
+    def _response_key(self, prompt: str) -> str | None:
+        if self.responses is None:
+            return None
+        return ResponseCache.key(prompt, Config.MODELS["GEMINI"], self.INSIGHT_PARAMS)
+
+    def _cached_response(self, key: str | None) -> str | None:
+        """
+        Counted response cache lookup; None on a miss or when disabled.
+        """
+
+        if key is None:
+            return None
+        reply = self.responses.get(key)
+        (self._response_misses if reply is None else self._response_hits).inc()
+        return reply
+
+    def _store_response(self, key: str | None, reply: str):
+        if key is not None and reply:
+            self.responses.put(key, reply)
+
+    def _generate_response(self, key: str, prompt: str) -> str:
+        """
+        Resolve a response cache miss, once per prompt at a time.
+
+        The cache is checked again first: an identical prompt may have been
+        answered between the caller's lookup and joining the in-flight registry.
+        """
+
+        reply = self.responses.get(key)
+        if reply is None:
+            reply = self.llm.generate_text(prompt, **self.INSIGHT_PARAMS)
+            self._store_response(key, reply)
+        return reply
+
+    def _fallback(self, zodiac: str, name: str, source: str) -> str:
+        """
+        Count and return the insight served when generation fails.
+
+        A failed LLM call (error, deadline exceeded, open circuit breaker or
+        exhausted quota) falls back to the dummy predictor, which answers
+        instantly; if that fails too, a generic message is returned.
+        """
+
+        self.fallback_insights.inc(source=source)
+        if source != "dummy":
+            try:
+                return self.dummy_predictor.generate_text(zodiac=zodiac, name=name)
+            except Exception:
+                pass
+        return f"{name}, as a {zodiac}, your grounded nature will guide you today."
+
+    @staticmethod
+    def _failure_source(error: Exception) -> str:
+        return "quota" if isinstance(error, QuotaExceededError) else "llm"
+
+    def generate_insight_from_template(
+        self, zodiac: str, name: str, language: str
+    ) -> str | None:
+        """
+        Personalize today's precomputed template for the user's sign and language.
+
+        Parameters
+        ----------
+        zodiac : str
+            Zodiac sign of the user.
+        name : str
+            Name of the user.
+        language : str
+            Language of the insight.
+
+        Returns
+        -------
+        str or None
+            The personalized insight, or None if no template exists for today,
+            in which case the caller should fall back to the live LLM.
+        """
+
+        return self.sign_templates.render(zodiac, name, language)
+
+    def precompute_sign_templates(self, languages: list[str]) -> int:
+        """
+        Ask the LLM for one template per zodiac sign and language and store them.
+
+        Templates that come back without the name placeholder are skipped, so
+        those combinations keep falling back to the live LLM. The calls run
+        at prewarm priority, so the LLM quota serves live requests first.
+
+        Parameters
+        ----------
+        languages : list[str]
+            Languages to generate templates for.
+
+        Returns
+        -------
+        int
+            Number of templates stored.
+        """
+
+        date = self.sign_templates.today()
+        stored = 0
+        with llm_priority(PREWARM):
+            for language in languages:
+                for zodiac in Zodiac.SIGNS:
+                    prompt = SIGN_TEMPLATE_PROMPT_TEMPLATE.format(
+                        zodiac=zodiac, language=language, placeholder=NAME_PLACEHOLDER
+                    )
+                    try:
+                        template = self.llm.generate_text(prompt)
+                        self.sign_templates.put(zodiac, language, template, date=date)
+                        stored += 1
+                    except Exception as e:
+                        print(f"Skipping template for {zodiac}/{language}: {e}")
+
+        self.sign_templates.save()
+        return stored
@@ -1,4 +1,5 @@
-from src.llms.gemini_client import Google_LLM
+import threading
+
 from config.config import Config
 
 
@@ -23,33 +24,79 @@ class ModelSetUp:
         The pretrained BLIP model for image captioning and vision-language tasks.
     blip_processor : transformers.BlipProcessor
         The processor (tokenizer + feature extractor) for BLIP.
-    llm : Google_LLM
-        A wrapper for interacting with Google's Gemini LLM API.
+    llm : Google_LLM, AsyncGoogle_LLM, ScheduledLLM or ResilientLLM
+        A wrapper for interacting with Google's Gemini LLM API. The async client
+        is used when `Config.LLM_ASYNC["ENABLED"]` is set. Calls wait for quota
+        in a `ScheduledLLM` when `Config.LLM_QUOTA["ENABLED"]` is set, and the
+        whole is wrapped in a `ResilientLLM` (deadline, hedging, circuit
+        breaker) when `Config.LLM_RESILIENCE["ENABLED"]` is set.
+
+    Nothing is loaded at construction: the device is probed and the LLM client
+    (with the Gemini SDK import) is created on first access, so a process that
+    never calls the LLM (e.g. with `Config.USE_DUMMY_LLM`) never pays for it.
     """
 
     def __init__(self):
         """
-        Initialize the ModelSetUp instance by loading all models
-        (CLIP, BLIP, and Gemini LLM) onto the configured device.
+        Initialize the ModelSetUp instance. Models are loaded lazily, on first
+        access to the corresponding attribute.
         """
 
-        self.device = Config.DEVICE
-        self._load_models()
+        self._llm = None
+        self._lock = threading.Lock()
+
+    @property
+    def device(self) -> str:
+        return Config.DEVICE
 
-    def _load_models(self):
+    @property
+    def llm(self):
         """
-        Internal helper method to load all required models and processors.
+        The Gemini LLM client, created on first access.
+        """
+
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    llm = self._load_llm()
+                    if Config.LLM_QUOTA["ENABLED"]:
+                        from src.llms.quota_scheduler import (
+                            QuotaScheduler,
+                            ScheduledLLM,
+                        )
+
+                        llm = ScheduledLLM(llm, QuotaScheduler.shared())
+                    if Config.LLM_RESILIENCE["ENABLED"]:
+                        from src.llms.resilient_llm import ResilientLLM
 
-        Loads:
-        - CLIP model & processor for image-text understanding.
-        - BLIP model & processor for image captioning/vision-language tasks.
-        - Google Gemini LLM client for natural language generation.
+                        llm = ResilientLLM.from_config(llm, Config.LLM_RESILIENCE)
+                    self._llm = llm
+        return self._llm
 
-        All models are loaded from the paths defined in Config.MODELS
-        and moved to the specified computation device.
+    def _load_llm(self):
         """
+        Internal helper method to create the Google Gemini LLM client for
+        natural language generation, as configured by `Config.MODELS` and
+        `Config.LLM_ASYNC`.
+        """
+
+        base_url = Config.GEMINI_BASE_URL
+        # A local stand-in server does not check the key, but the SDK needs one.
+        api_key = Config.GEMINI_API_KEY or ("local" if base_url else None)
+
+        if Config.LLM_ASYNC["ENABLED"]:
+            from src.llms.gemini_async_client import AsyncGoogle_LLM
+
+            return AsyncGoogle_LLM(
+                api_key=api_key,
+                model=Config.MODELS["GEMINI"],
+                max_concurrency=Config.LLM_ASYNC["MAX_CONCURRENCY"],
+                timeout=Config.LLM_ASYNC["TIMEOUT"],
+                base_url=base_url,
+            )
+
+        from src.llms.gemini_client import Google_LLM
 
-        # LLM
-        self.llm = Google_LLM(
-            api_key=Config.GEMINI_API_KEY, model=Config.MODELS["GEMINI"]
+        return Google_LLM(
+            api_key=api_key, model=Config.MODELS["GEMINI"], base_url=base_url
         )
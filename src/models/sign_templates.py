@@ -0,0 +1,185 @@
+"""
+sign_templates.py
+
+Precomputed per-sign daily insight templates.
+
+`SUMMARY_PROMPT_TEMPLATE` only depends on the user's name, zodiac sign and
+language, so the LLM's work is really per (sign, language). This module keeps
+a table of one LLM-generated template per (sign, language) for the current
+day, with the user's name left as `NAME_PLACEHOLDER`. Serving a request is then
+a dictionary lookup plus a string substitution.
+
+The table is filled once a day by `ModelInference.precompute_sign_templates`
+(run this module as a script, e.g. from cron) and persisted as JSON so every
+worker process can load it.
+
+Classes
+-------
+SignTemplateTable
+    Thread-safe, file-backed table of daily (sign, language) templates.
+
+Usage
+-----
+    python -m src.models.sign_templates
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from src.prompts.prompt import NAME_PLACEHOLDER
+
+
+class SignTemplateTable:
+    """
+    Table of today's insight templates keyed by (zodiac, language).
+
+    Templates are only served on the day they were generated for, so a
+    table left over from yesterday behaves as empty until it is refreshed.
+    Other processes may rewrite the file; it is reloaded when its
+    modification time changes, checked at most every ``reload_interval`` seconds.
+
+    Attributes
+    ----------
+    path : str
+        JSON file holding the table.
+    timezone : str
+        IANA timezone defining "today".
+    reload_interval : float
+        Minimum seconds between checks of the file for updates.
+    """
+
+    def __init__(
+        self, path: str, timezone: str = "UTC", reload_interval: float = 60.0
+    ):
+        self.path = path
+        self.timezone = timezone
+        self.reload_interval = reload_interval
+
+        self._lock = threading.Lock()
+        self._date = None
+        self._templates: dict[str, str] = {}
+        self._mtime = None
+        self._checked_at = 0.0
+        self._reload()
+
+    @staticmethod
+    def _key(zodiac: str, language: str) -> str:
+        return f"{zodiac}|{language}"
+
+    def today(self) -> str:
+        """
+        Returns
+        -------
+        str
+            Today's date (YYYY-MM-DD) in the table's timezone.
+        """
+
+        return datetime.now(ZoneInfo(self.timezone)).date().isoformat()
+
+    def _reload(self):
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return
+        with self._lock:
+            self._date = data.get("date")
+            self._templates = data.get("templates", {})
+            self._mtime = mtime
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at >= self.reload_interval:
+            self._checked_at = now
+            self._reload()
+
+    def get(self, zodiac: str, language: str) -> str | None:
+        """
+        Look up today's template for a sign and language.
+
+        Returns
+        -------
+        str or None
+            The template, or None if there is no template for today.
+        """
+
+        self._maybe_reload()
+        with self._lock:
+            if self._date != self.today():
+                return None
+            return self._templates.get(self._key(zodiac, language))
+
+    def render(self, zodiac: str, name: str, language: str) -> str | None:
+        """
+        Produce a personalized insight by substituting ``name`` into today's template.
+
+        Returns
+        -------
+        str or None
+            The personalized insight, or None if no template is available.
+        """
+
+        template = self.get(zodiac, language)
+        if template is None:
+            return None
+        return template.replace(NAME_PLACEHOLDER, name)
+
+    def put(
+        self, zodiac: str, language: str, template: str, date: str | None = None
+    ):
+        """
+        Store a template for a sign and language.
+
+        Storing a template for a new date discards all templates of the previous day.
+
+        Raises
+        ------
+        ValueError
+            If the template does not contain `NAME_PLACEHOLDER`.
+        """
+
+        if NAME_PLACEHOLDER not in template:
+            raise ValueError("Template does not contain the name placeholder")
+        date = date or self.today()
+        with self._lock:
+            if self._date != date:
+                self._date, self._templates = date, {}
+            self._templates[self._key(zodiac, language)] = template
+
+    def save(self):
+        """
+        Atomically persist the table to its JSON file.
+        """
+
+        with self._lock:
+            data = {"date": self._date, "templates": dict(self._templates)}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        self._mtime = os.path.getmtime(self.path)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._templates) if self._date == self.today() else 0
+
+
+if __name__ == "__main__":
+    from config.config import Config
+    from src.models.model_setup import ModelSetUp
+    from src.models.model_infer import ModelInference
+
+    model_infer = ModelInference(ModelSetUp())
+    languages = Config.SIGN_TEMPLATES["LANGUAGES"]
+    count = model_infer.precompute_sign_templates(languages)
+    print(f"Stored {count} sign templates in {Config.SIGN_TEMPLATES['FILE']}")
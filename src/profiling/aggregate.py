@@ -0,0 +1,136 @@
+"""
+aggregate.py
+
+Merge and summarize the request profiles written by `Profiler`.
+
+- ``.pstats`` files (cprofile mode) are merged with `pstats.Stats` and the
+  top functions are printed, sorted by cumulative time by default.
+- ``.folded`` files (sample mode) are merged by summing the sample counts of
+  identical stacks; the functions with the most samples, inclusive (anywhere
+  on the stack) and exclusive (on top of the stack), are printed.
+
+The merged profiles can be written out for other tools: ``--pstats-out``
+for snakeviz / `pstats`, ``--folded-out`` for flamegraph.pl or speedscope.
+
+Usage
+-----
+    python -m src.profiling.aggregate profiles/
+    python -m src.profiling.aggregate profiles/ --match predict --top 40 \\
+        --folded-out predict.folded
+    flamegraph.pl predict.folded > predict.svg
+"""
+
+import argparse
+import glob
+import os
+import pstats
+from collections import Counter
+
+
+def find_profiles(directory: str, match: str | None = None) -> tuple[list, list]:
+    """
+    Returns
+    -------
+    tuple[list[str], list[str]]
+        Paths of the ``.pstats`` and ``.folded`` files in ``directory`` whose
+        names contain ``match`` (all of them if None).
+    """
+
+    def select(extension):
+        paths = sorted(glob.glob(os.path.join(directory, f"*.{extension}")))
+        return [p for p in paths if match is None or match in os.path.basename(p)]
+
+    return select("pstats"), select("folded")
+
+
+def merge_folded(paths: list[str]) -> Counter:
+    """
+    Returns
+    -------
+    Counter
+        Sample count of every collapsed stack across ``paths``.
+    """
+
+    stacks = Counter()
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                stack, _, count = line.rstrip("\n").rpartition(" ")
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return stacks
+
+
+def hot_functions(stacks: Counter) -> tuple[Counter, Counter]:
+    """
+    Returns
+    -------
+    tuple[Counter, Counter]
+        Samples per function anywhere on the stack (counted once per stack)
+        and on top of the stack.
+    """
+
+    inclusive, exclusive = Counter(), Counter()
+    for stack, count in stacks.items():
+        frames = stack.split(";")
+        exclusive[frames[-1]] += count
+        for frame in set(frames):
+            inclusive[frame] += count
+    return inclusive, exclusive
+
+
+def report_pstats(paths: list[str], sort: str, top: int, out: str | None):
+    stats = pstats.Stats(*paths)
+    print(f"== {len(paths)} cProfile profile(s), sorted by {sort}")
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+    if out:
+        stats.dump_stats(out)
+        print(f"Merged profile written to {out}")
+
+
+def report_folded(paths: list[str], top: int, out: str | None):
+    stacks = merge_folded(paths)
+    total = sum(stacks.values())
+    print(f"== {len(paths)} sampled profile(s), {total} samples")
+    if not total:
+        return
+    inclusive, exclusive = hot_functions(stacks)
+    for title, counts in (("inclusive", inclusive), ("exclusive", exclusive)):
+        print(f"\nTop {top} functions by {title} samples:")
+        for frame, count in counts.most_common(top):
+            print(f"{count:8d} {100 * count / total:6.1f}%  {frame}")
+    if out:
+        with open(out, "w", encoding="utf-8") as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        print(f"\nMerged collapsed stacks written to {out}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge request profiles.")
+    parser.add_argument("directory", nargs="?", default=None)
+    parser.add_argument("--match", help="only files whose name contains this")
+    parser.add_argument("--top", type=int, default=25)
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key")
+    parser.add_argument("--pstats-out", help="write the merged cProfile profile")
+    parser.add_argument("--folded-out", help="write the merged collapsed stacks")
+    args = parser.parse_args()
+
+    directory = args.directory
+    if directory is None:
+        from config.config import Config
+
+        directory = Config.PROFILING["DIR"]
+
+    pstats_paths, folded_paths = find_profiles(directory, args.match)
+    if not pstats_paths and not folded_paths:
+        print(f"No profiles found in {directory}")
+        return
+    if pstats_paths:
+        report_pstats(pstats_paths, args.sort, args.top, args.pstats_out)
+    if folded_paths:
+        report_folded(folded_paths, args.top, args.folded_out)
+
+
+if __name__ == "__main__":
+    main()
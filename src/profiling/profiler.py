@@ -0,0 +1,344 @@
+"""
+profiler.py
+
+On-demand profiling of individual requests on a live server.
+
+A request is profiled when the profiler has been armed for the next N
+requests (see `Profiler.arm`, exposed as ``POST /admin/profile``) or when it
+carries an ``X-Profile`` header. Two modes are available:
+
+cprofile
+    Deterministic profiling with `cProfile` of the thread serving the
+    request. Every call is counted and timed exactly; the overhead is high
+    (often 2x), so use it for a handful of requests. Written as a ``.pstats``
+    file, readable with `pstats` or snakeviz.
+sample
+    Statistical profiling: a background thread records the stack of the
+    request thread every ``interval`` seconds (optionally the stacks of all
+    threads, e.g. to see work done on the background event loop). The
+    overhead is low and independent of how many calls are made. Written as
+    a ``.folded`` file of collapsed stacks (``frame;frame;frame count``),
+    the input format of flamegraph.pl and speedscope.
+
+Profiles are written to one directory, one file per request, and can be
+merged with ``python -m src.profiling.aggregate``.
+
+Classes
+-------
+Profiler
+    Arming state and output directory; starts `RequestProfile` objects.
+RequestProfile
+    Profile of one request in progress.
+"""
+
+import cProfile
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from functools import lru_cache
+
+MODES = ("cprofile", "sample")
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@lru_cache(maxsize=4096)
+def _short_path(filename: str) -> str:
+    """
+    Shorten a source path to its project-relative or package-relative form.
+    """
+
+    if filename.startswith(_ROOT + os.sep):
+        return os.path.relpath(filename, _ROOT)
+    for marker in ("site-packages" + os.sep, "dist-packages" + os.sep):
+        if marker in filename:
+            return filename.split(marker, 1)[1]
+    parts = filename.split(os.sep)
+    return os.sep.join(parts[-2:])
+
+
+def _frame_label(code) -> str:
+    return f"{code.co_name} ({_short_path(code.co_filename)}:{code.co_firstlineno})"
+
+
+def collapse_stack(frame) -> str:
+    """
+    Render a frame and its callers as one collapsed stack, outermost first.
+    """
+
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class _Sampler(threading.Thread):
+    """
+    Thread recording the stack of one thread (or of all threads) periodically.
+    """
+
+    def __init__(self, thread_id: int, interval: float, all_threads: bool):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.all_threads = all_threads
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        names = {}
+        own_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            frames = sys._current_frames()
+            if self.all_threads:
+                if len(names) != len(frames):
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in frames.items():
+                    if ident != own_id:
+                        name = names.get(ident, str(ident))
+                        self.stacks[f"{name};{collapse_stack(frame)}"] += 1
+            else:
+                frame = frames.get(self.thread_id)
+                if frame is not None:
+                    self.stacks[collapse_stack(frame)] += 1
+            self.samples += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+class RequestProfile:
+    """
+    Profile of one request, started on the thread serving it.
+
+    Attributes
+    ----------
+    mode : str
+        "cprofile" or "sample".
+    path : str
+        File the profile is written to by `stop`.
+    """
+
+    def __init__(
+        self,
+        mode: str,
+        path: str,
+        interval: float,
+        all_threads: bool = False,
+        release=None,
+    ):
+        self.mode = mode
+        self.path = path
+        self.started_at = time.perf_counter()
+        self._release = release
+        if mode == "cprofile":
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        else:
+            self._sampler = _Sampler(threading.get_ident(), interval, all_threads)
+            self._sampler.start()
+
+    def stop(self) -> str:
+        """
+        Stop profiling (on the same thread that started it) and write the file.
+
+        Returns
+        -------
+        str
+            Path of the written profile.
+        """
+
+        try:
+            if self.mode == "cprofile":
+                self._profile.disable()
+                self._profile.dump_stats(self.path)
+            else:
+                self._sampler.stop()
+                with open(self.path, "w", encoding="utf-8") as f:
+                    for stack, count in self._sampler.stacks.most_common():
+                        f.write(f"{stack} {count}\n")
+        finally:
+            if self._release is not None:
+                self._release()
+        return self.path
+
+
+class Profiler:
+    """
+    Decides which requests are profiled and where their profiles go.
+
+    Profiling is off until armed: `arm` selects a mode for the next
+    ``requests`` requests, and a single request may ask for its own profile
+    by passing a mode to `start`. Only one cProfile profile runs at a time in a process
+    (the interpreter supports a single active profiler on recent versions);
+    a request arriving while one is running is not profiled and does not use
+    up an armed slot.
+
+    Attributes
+    ----------
+    directory : str
+        Directory receiving the profile files.
+    interval : float
+        Seconds between stack samples in "sample" mode.
+    max_requests : int
+        Upper bound of ``requests`` accepted by `arm`.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, directory: str, interval: float = 0.005, max_requests=100):
+        self.directory = directory
+        self.interval = interval
+        self.max_requests = max_requests
+        self._lock = threading.Lock()
+        self._cprofile_lock = threading.Lock()
+        self._sequence = itertools.count(1)
+        self._armed_mode = None
+        self._remaining = 0
+        self._all_threads = False
+        self._started = 0
+
+    @classmethod
+    def shared(cls):
+        """
+        Returns
+        -------
+        Profiler
+            The process-wide profiler, configured from `Config.PROFILING`.
+        """
+
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    from config.config import Config
+
+                    cls._shared = cls(
+                        Config.PROFILING["DIR"],
+                        interval=Config.PROFILING["SAMPLE_INTERVAL"],
+                        max_requests=Config.PROFILING["MAX_REQUESTS"],
+                    )
+        return cls._shared
+
+    def arm(self, mode: str, requests: int = 1, all_threads: bool = False):
+        """
+        Profile the next ``requests`` requests in ``mode``.
+
+        Raises
+        ------
+        ValueError
+            If the mode is unknown or ``requests`` is out of range.
+        """
+
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}; use one of {MODES}")
+        if not 1 <= requests <= self.max_requests:
+            raise ValueError(f"requests must be between 1 and {self.max_requests}")
+        with self._lock:
+            self._armed_mode = mode
+            self._remaining = requests
+            self._all_threads = all_threads
+
+    def disarm(self):
+        with self._lock:
+            self._armed_mode = None
+            self._remaining = 0
+
+    def status(self) -> dict:
+        """
+        Returns
+        -------
+        dict
+            Armed mode and remaining requests, and the profiles on disk.
+        """
+
+        with self._lock:
+            status = {
+                "mode": self._armed_mode,
+                "remaining": self._remaining,
+                "all_threads": self._all_threads,
+                "started": self._started,
+                "directory": self.directory,
+            }
+        status["profiles"] = self.profiles()
+        return status
+
+    def profiles(self) -> list[str]:
+        """
+        Returns
+        -------
+        list[str]
+            Names of the profile files in the output directory, oldest first.
+        """
+
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return sorted(n for n in names if n.endswith((".pstats", ".folded")))
+
+    def start(self, label: str, mode: str | None = None):
+        """
+        Start profiling the current request if it is selected.
+
+        Parameters
+        ----------
+        label : str
+            Short name of the request (e.g. the endpoint), used in the file name.
+        mode : str, optional
+            Mode requested by the request itself; otherwise an armed slot is
+            used, if any.
+
+        Returns
+        -------
+        RequestProfile or None
+            The running profile, or None if this request is not profiled.
+        """
+
+        if mode is not None and mode not in MODES:
+            raise ValueError(f"Unknown profiling mode {mode!r}; use one of {MODES}")
+        if mode is None and self._armed_mode is None:
+            return None  # fast path: nothing armed
+
+        with self._lock:
+            armed = mode is None
+            if armed:
+                if self._remaining <= 0:
+                    return None
+                mode = self._armed_mode
+            all_threads = self._all_threads if armed else False
+            release = None
+            if mode == "cprofile":
+                if not self._cprofile_lock.acquire(blocking=False):
+                    return None
+                release = self._cprofile_lock.release
+            if armed:
+                self._remaining -= 1
+                if self._remaining == 0:
+                    self._armed_mode = None
+            self._started += 1
+
+        extension = "pstats" if mode == "cprofile" else "folded"
+        name = (
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-"
+            f"{next(self._sequence):05d}-{label}.{extension}"
+        )
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            return RequestProfile(
+                mode,
+                os.path.join(self.directory, name),
+                self.interval,
+                all_threads=all_threads,
+                release=release,
+            )
+        except Exception:
+            if release is not None:
+                release()
+            raise
@@ -1,3 +1,16 @@
 SUMMARY_PROMPT_TEMPLATE = """You are an astrology assistant.
 Generate an astrological insight for {name}, who is a {zodiac}.
 Keep astrological insight positive, short, crisp, personalized and generate atleast three lines of astrological insight about {name}. Remember your generation should be in {language} language."""
+
+# Placeholder the LLM must keep verbatim in sign templates; replaced by the user's name.
+NAME_PLACEHOLDER = "<<NAME>>"
+
+SIGN_TEMPLATE_PROMPT_TEMPLATE = """You are an astrology assistant.
+Generate today's astrological insight for a person who is a {zodiac}.
+Refer to the person by the exact placeholder {placeholder} wherever their name should appear, and keep the placeholder unchanged (do not translate it).
+Keep astrological insight positive, short, crisp, personalized and generate atleast three lines of astrological insight about {placeholder}. Remember your generation should be in {language} language."""
+
+BATCH_SUMMARY_PROMPT_TEMPLATE = """You are an astrology assistant.
+Generate a separate astrological insight for each of the following people, who are all {zodiac}: {names}.
+Keep every astrological insight positive, short, crisp, personalized and generate atleast three lines of astrological insight about each person. Remember your generation should be in {language} language.
+Return only a JSON object that maps each name exactly as given to that person's insight, with no other text."""
@@ -6,33 +6,62 @@ Translation module for the Astro Insight Generator application.
 Provides classes and methods to:
 - Translate text to multiple Indian languages and English.
 - Offer both real Google Translate integration and dummy translation for testing.
-- Support synchronous translation calls suitable for Flask endpoints.
+- Support synchronous translation calls suitable for Flask endpoints, and
+  awaitable calls for async code.
 
 Classes
 -------
 TranslateWithGoogle
-    Uses Google Translator API asynchronously and provides a synchronous wrapper.
+    Uses Google Translator API asynchronously on a long-lived background event
+    loop with a persistent HTTP session, and provides synchronous wrappers.
 DummyTranslator
     Simulates translation by prefixing text with language markers (useful for testing).
 """
 
 import asyncio
-from googletrans import Translator as GoogleTranslator
+import weakref
+
+from config.config import Config
+from src.utils.event_loop import BackgroundEventLoop
+from src.translator.translation_cache import TranslationCache
+
+
+def _default_memo():
+    if Config.TRANSLATION_CACHE["ENABLED"]:
+        return TranslationCache.shared()
+    return None
 
 
 class TranslateWithGoogle:
     """
     Translator class using Google Translator API asynchronously.
 
+    Translations run on the process-wide `BackgroundEventLoop`, and one
+    `GoogleTranslator` session (with its HTTP connection pool) is kept alive
+    per event loop instead of being created for every call. The synchronous
+    methods can be called concurrently from any number of Flask threads;
+    async code should await `atranslate` / `atranslate_many` directly.
+
     Attributes
     ----------
     lang_to_code : dict[str, str]
         Maps human-readable language names to Google Translator language codes.
     code_to_lang : dict[str, str]
         Reverse mapping of language codes to language names.
+    timeout : float or None
+        Per-request timeout in seconds.
+    max_concurrency : int
+        Maximum concurrent requests of one `translate_many` fan-out.
+    memo : TranslationCache or None
+        Translation memo consulted before every network call.
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        timeout: float | None = None,
+        max_concurrency: int | None = None,
+        memo: TranslationCache | None = None,
+    ):
         self.lang_to_code = {
             "English": "en",
             "Hindi": "hi",
@@ -57,8 +86,26 @@ class TranslateWithGoogle:
             "Bodo": "brx",
         }
         self.code_to_lang = {code: lang for lang, code in self.lang_to_code.items()}
+        self.timeout = Config.TRANSLATION["TIMEOUT"] if timeout is None else timeout
+        self.max_concurrency = max_concurrency or Config.TRANSLATION["MAX_CONCURRENCY"]
+        self.memo = memo if memo is not None else _default_memo()
+        self._sessions = weakref.WeakKeyDictionary()
+
+    def _session(self):
+        """
+        Return the persistent translator session of the running event loop.
+        """
+
+        loop = asyncio.get_running_loop()
+        session = self._sessions.get(loop)
+        if session is None:
+            # Imported on first network call: googletrans pulls in httpx.
+            from googletrans import Translator as GoogleTranslator
 
-    async def _translate_async(self, text: str, dest: str = "hi") -> str:
+            session = self._sessions[loop] = GoogleTranslator()
+        return session
+
+    async def atranslate(self, text: str, dest: str = "hi") -> str:
         """
         Asynchronously translate a given text to a target language.
 
@@ -73,17 +120,77 @@ class TranslateWithGoogle:
         -------
         str
             Translated text.
+
+        Raises
+        ------
+        TimeoutError
+            If the request does not complete within `self.timeout`.
         """
 
-        async with GoogleTranslator() as translator:
-            result = await translator.translate(text, dest=dest)
-            return result.text
+        if self.memo is not None:
+            translated = self.memo.get(text, dest)
+            if translated is not None:
+                return translated
+        return await self._fetch(text, dest)
+
+    async def _fetch(self, text: str, dest: str) -> str:
+        """
+        Translate over the network and memoize the result.
+        """
+
+        result = await asyncio.wait_for(
+            self._session().translate(text, dest=dest), self.timeout
+        )
+        if self.memo is not None:
+            self.memo.put(text, dest, result.text)
+        return result.text
+
+    async def atranslate_many(self, texts: list[str], dest: str = "hi") -> list[str]:
+        """
+        Translate several texts concurrently, at most `self.max_concurrency` at a time.
+
+        Returns
+        -------
+        list[str]
+            Translated texts, in input order.
+        """
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def _one(text):
+            async with semaphore:
+                return await self.atranslate(text, dest)
+
+        return list(await asyncio.gather(*(_one(text) for text in texts)))
 
     def translate(self, text: str, dest: str = "hi") -> str:
         """
         Synchronous wrapper for Flask usage.
         """
-        return asyncio.run(self._translate_async(text, dest))
+        if self.memo is not None:
+            # Answer memo hits without a hop through the event loop.
+            translated = self.memo.get(text, dest)
+            if translated is not None:
+                return translated
+        return BackgroundEventLoop.shared().run(self._fetch(text, dest))
+
+    def translate_many(self, texts: list[str], dest: str = "hi") -> list[str]:
+        """
+        Synchronous wrapper around `atranslate_many` for Flask usage.
+        """
+        return BackgroundEventLoop.shared().run(self.atranslate_many(texts, dest))
+
+    def close(self):
+        """
+        Close the translator session of the background event loop.
+        """
+
+        async def _close():
+            session = self._sessions.pop(asyncio.get_running_loop(), None)
+            if session is not None:
+                await session.client.aclose()
+
+        BackgroundEventLoop.shared().run(_close())
 
 
 class DummyTranslator:
@@ -91,9 +198,14 @@ class DummyTranslator:
     Dummy translation class for testing or development purposes.
 
     Simulates translation by adding language-specific prefixes.
+
+    Attributes
+    ----------
+    memo : TranslationCache or None
+        Translation memo consulted before "translating".
     """
 
-    def __init__(self):
+    def __init__(self, memo: TranslationCache | None = None):
         self.lang_to_code = {
             "English": "en",
             "Hindi": "hi",
@@ -119,9 +231,30 @@ class DummyTranslator:
         }
 
         self.code_to_lang = {code: lang for lang, code in self.lang_to_code.items()}
+        self.memo = memo if memo is not None else _default_memo()
 
     def translate(self, text: str, language: str) -> str:
-        return "[Translation] " + text
+        if self.memo is not None:
+            translated = self.memo.get(text, language)
+            if translated is not None:
+                return translated
+
+        translated = "[Translation] " + text
+        if self.memo is not None:
+            self.memo.put(text, language, translated)
+        return translated
+
+    def translate_many(self, texts: list[str], language: str) -> list[str]:
+        return [self.translate(text, language) for text in texts]
+
+    async def atranslate(self, text: str, language: str) -> str:
+        return self.translate(text, language)
+
+    async def atranslate_many(self, texts: list[str], language: str) -> list[str]:
+        return self.translate_many(texts, language)
+
+    def close(self):
+        pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1,188 @@
+"""
+translation_cache.py
+
+Content-addressed memo cache for translations.
+
+The same English sentence is translated again for every user who receives
+it (the dummy predictor only has 36 distinct sentences). This module memoizes
+translations by a hash of the normalized source text plus the destination
+language code, independently of the per-user insight cache.
+
+Classes
+-------
+TranslationCache
+    Two-tier memo: bounded in-memory LRU in front of a persistent
+    `LogStructuredStore`, with hit/miss counters.
+"""
+
+import hashlib
+import threading
+import unicodedata
+from collections import OrderedDict
+
+from config.config import Config
+from src.cache.cache import Cache
+from src.cache.log_store import LogLockedError, LogStructuredStore
+from src.cache.sqlite_store import SqliteStore
+
+
+class TranslationCache:
+    """
+    Memo cache of translations keyed on (text hash, target language).
+
+    Lookups check the in-memory LRU tier first, then the on-disk tier;
+    disk hits are promoted into memory. Writes go to both tiers.
+
+    Use `TranslationCache.shared()` to get the process-wide instance backed
+    by `Config.TRANSLATION_CACHE["FILE"]`, so that all translators in a
+    process share one log file. With the "sqlite" cache backend (alone or
+    as the delta of the "snapshot" backend), the persistent tier is a table
+    of `Config.CACHE_SQLITE_FILE` instead, so that worker processes share it
+    safely. If another process already owns the log file, the shared memo
+    falls back to memory only instead of failing.
+
+    Attributes
+    ----------
+    max_entries : int
+        Capacity of the in-memory LRU tier.
+    store : LogStructuredStore, SqliteStore or None
+        Persistent tier, or None for a memory-only cache.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_entries: int = 10_000,
+        store=None,
+    ):
+        """
+        Parameters
+        ----------
+        path : str, optional
+            Log file of the persistent tier. None keeps the cache in memory only.
+        max_entries : int, optional
+            Capacity of the in-memory LRU tier (default: 10,000).
+        store : optional
+            Ready-made persistent tier, used instead of opening ``path``.
+        """
+
+        self.max_entries = max_entries
+        if store is None and path:
+            store = LogStructuredStore(
+                path, compaction_interval=Config.CACHE_LOG["COMPACTION_INTERVAL"]
+            )
+        self.store = store
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+    @classmethod
+    def shared(cls) -> "TranslationCache":
+        """
+        Returns
+        -------
+        TranslationCache
+            The process-wide cache configured by `Config.TRANSLATION_CACHE`.
+        """
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                store = None
+                if Cache.writable_backend() == "sqlite":
+                    store = SqliteStore(
+                        Config.CACHE_SQLITE_FILE,
+                        table="translations",
+                        busy_timeout=Config.CACHE_SQLITE["BUSY_TIMEOUT"],
+                    )
+                max_entries = Config.TRANSLATION_CACHE["MAX_MEMORY_ENTRIES"]
+                try:
+                    cls._shared = cls(
+                        Config.TRANSLATION_CACHE["FILE"],
+                        max_entries=max_entries,
+                        store=store,
+                    )
+                except LogLockedError as e:
+                    print(f"Translation memo kept in memory only: {e}")
+                    cls._shared = cls(None, max_entries=max_entries)
+            return cls._shared
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Canonicalize text so trivially different copies share a cache entry:
+        Unicode NFC, surrounding whitespace stripped, inner whitespace collapsed.
+        """
+
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    @classmethod
+    def key(cls, text: str, dest: str) -> str:
+        """
+        Returns
+        -------
+        str
+            ``<sha256 of normalized text>:<dest>``.
+        """
+
+        digest = hashlib.sha256(cls.normalize(text).encode("utf-8")).hexdigest()
+        return f"{digest}:{dest}"
+
+    def get(self, text: str, dest: str) -> str | None:
+        """
+        Look up a memoized translation.
+
+        Returns
+        -------
+        str or None
+            The translated text, or None on a miss.
+        """
+
+        key = self.key(text, dest)
+        with self._lock:
+            translated = self._memory.get(key)
+            if translated is not None:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return translated
+
+        value = self.store.get(key) if self.store is not None else None
+        with self._lock:
+            if value is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._remember(key, value["text"])
+        return value["text"]
+
+    def put(self, text: str, dest: str, translated: str):
+        """
+        Memoize a translation in both tiers.
+        """
+
+        key = self.key(text, dest)
+        if self.store is not None:
+            self.store.put(key, {"text": translated})
+        with self._lock:
+            self._counters["stores"] += 1
+            self._remember(key, translated)
+
+    def stats(self) -> dict:
+        """
+        Returns
+        -------
+        dict
+            Memory/disk hit, miss and store counters plus the memory tier size.
+        """
+
+        with self._lock:
+            return {**self._counters, "memory_entries": len(self._memory)}
+
+    def _remember(self, key: str, translated: str):
+        # Expects self._lock to be held.
+        self._memory[key] = translated
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
@@ -0,0 +1,119 @@
+"""
+event_loop.py
+
+A long-lived asyncio event loop running in a background daemon thread.
+
+Lets synchronous code (Flask request threads) run coroutines without paying
+for `asyncio.run` on every call, and lets async clients keep their network
+sessions alive across requests because they always run on the same loop.
+
+Classes
+-------
+BackgroundEventLoop
+    Owns the loop thread and submits coroutines to it from any thread.
+"""
+
+import asyncio
+import os
+import threading
+
+
+class BackgroundEventLoop:
+    """
+    Event loop running forever in its own daemon thread.
+
+    Use `BackgroundEventLoop.shared()` to get the process-wide instance. The
+    shared instance is recreated after `fork()`, because the loop thread does
+    not survive into the child process (e.g. gunicorn pre-fork workers).
+
+    Attributes
+    ----------
+    loop : asyncio.AbstractEventLoop
+        The event loop driven by the background thread.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, name: str = "background-event-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @classmethod
+    def shared(cls) -> "BackgroundEventLoop":
+        """
+        Returns
+        -------
+        BackgroundEventLoop
+            The process-wide loop, started on first use.
+        """
+
+        with cls._shared_lock:
+            if cls._shared is None or cls._shared._pid != os.getpid():
+                cls._shared = cls()
+            return cls._shared
+
+    def in_loop_thread(self) -> bool:
+        """
+        Returns
+        -------
+        bool
+            True when called from the loop's own thread, where blocking on a
+            coroutine result would deadlock.
+        """
+
+        return threading.current_thread() is self._thread
+
+    def submit(self, coro):
+        """
+        Schedule a coroutine on the loop from any thread.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future resolving to the coroutine's result.
+        """
+
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: float | None = None):
+        """
+        Run a coroutine on the loop and block the calling thread for its result.
+
+        Parameters
+        ----------
+        coro : Coroutine
+            Coroutine to run.
+        timeout : float, optional
+            Seconds to wait before cancelling the coroutine and raising `TimeoutError`.
+
+        Raises
+        ------
+        RuntimeError
+            If called from the loop thread itself.
+        """
+
+        if self.in_loop_thread():
+            coro.close()
+            raise RuntimeError("Cannot block on the background loop from its thread")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def stop(self):
+        """
+        Stop the loop and wait for its thread to exit.
+        """
+
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
@@ -0,0 +1,383 @@
+"""
+job_manager.py
+
+Background jobs for requests that should not hold their connection open.
+
+A cache miss on `/predict` waits for the LLM and the translator; with the
+job mode on, the request is answered at once with a job id and the work runs
+on a bounded pool of background threads. Clients fetch the outcome with
+``GET /jobs/<id>``, optionally long-polling until it is ready.
+
+Jobs live in the memory of the process that runs them. When a shared store
+is given (a table of the "sqlite" cache database), every state change is also
+written there, so with several server workers a poll answered by another
+worker process still sees the job.
+
+Classes
+-------
+JobQueueFullError
+    The job was refused because too many jobs are already waiting.
+Job
+    State and outcome of one background job.
+JobManager
+    Bounded worker pool, job registry and long-poll support.
+"""
+
+import secrets
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config import Config
+from src.cache.cache import Cache
+from src.cache.sqlite_store import SqliteStore
+from src.utils.metrics import Metrics
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+class JobQueueFullError(Exception):
+    """
+    Raised by `JobManager.submit` when ``max_pending`` jobs are already
+    queued or running.
+
+    Attributes
+    ----------
+    retry_after : float
+        Seconds after which the client may try again.
+    """
+
+    def __init__(self, retry_after: float = 1.0):
+        super().__init__("Too many pending jobs, retry later")
+        self.retry_after = retry_after
+
+
+class Job:
+    """
+    One background job.
+
+    Attributes
+    ----------
+    id : str
+        Unguessable identifier handed to the client.
+    key : str
+        Identity of the work; concurrent submissions with the same key share
+        one job.
+    status : str
+        "pending", "running", "done" or "failed".
+    result : object
+        Return value of the job function, once done.
+    error : str or None
+        Error message, once failed.
+    created : float
+        Submission time (epoch seconds).
+    finished : float or None
+        Completion time (epoch seconds).
+    """
+
+    __slots__ = (
+        "id",
+        "key",
+        "status",
+        "result",
+        "error",
+        "created",
+        "finished",
+        "done",
+    )
+
+    def __init__(self, key: str):
+        self.id = secrets.token_urlsafe(16)
+        self.key = key
+        self.status = PENDING
+        self.result = None
+        self.error = None
+        self.created = time.time()
+        self.finished = None
+        self.done = threading.Event()
+
+    def to_dict(self) -> dict:
+        """
+        Returns
+        -------
+        dict
+            {"job_id", "status"}, plus "result" once done or "error" once failed.
+        """
+
+        record = {"job_id": self.id, "status": self.status}
+        if self.status == DONE:
+            record["result"] = self.result
+        elif self.status == FAILED:
+            record["error"] = self.error
+        return record
+
+
+class JobManager:
+    """
+    Run functions on a bounded pool of background threads and keep their
+    outcome for a while.
+
+    - At most ``max_workers`` jobs run at once; at most ``max_pending`` are
+      queued or running, further submissions raise `JobQueueFullError`.
+    - Submitting a key whose job is still queued or running returns that job
+      instead of starting another one.
+    - Finished jobs are kept for ``result_ttl`` seconds.
+    - With a shared ``store``, job states are also written to it and looked
+      up there for ids this process does not know. A job that is still
+      unfinished in the store after ``timeout`` seconds is considered lost
+      (e.g. its worker process was restarted) and reported as unknown.
+
+    The thread pool is created on the first submission, so an instance
+    built before ``fork()`` (preloaded server app) is usable in every worker.
+
+    Use `JobManager.shared()` to get the process-wide instance configured by
+    `Config.JOBS`.
+
+    Attributes
+    ----------
+    max_workers : int
+        Threads running jobs.
+    max_pending : int
+        Maximum queued plus running jobs.
+    result_ttl : float
+        Seconds a finished job stays available.
+    timeout : float
+        Seconds after which an unfinished job found in the store is dropped.
+    store : SqliteStore or None
+        Shared record of job states, or None for jobs private to the process.
+    poll_interval : float
+        Seconds between store reads while long-polling a job of another process.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        max_workers: int = 8,
+        max_pending: int = 1000,
+        result_ttl: float = 600.0,
+        timeout: float = 300.0,
+        store=None,
+        poll_interval: float = 0.25,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.timeout = timeout
+        self.store = store
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._jobs: dict[str, Job] = {}
+        self._by_key: dict[str, Job] = {}  # key -> unfinished job
+        self._finished = deque()  # (expiry, job id), oldest first
+        self._pending = 0
+
+        metrics = Metrics.shared()
+        self._jobs_total = metrics.counter(
+            "jobs_total", "Background jobs, by outcome.", ("status",)
+        )
+        self._queue_depth = metrics.gauge(
+            "jobs_pending", "Background jobs queued or running."
+        )
+        self._job_seconds = metrics.histogram(
+            "job_duration_seconds", "Time from job submission to completion."
+        )
+
+    @classmethod
+    def shared(cls) -> "JobManager":
+        """
+        Returns
+        -------
+        JobManager
+            The process-wide manager configured by `Config.JOBS`. Job states
+            are shared through a table of `Config.CACHE_SQLITE_FILE` when the
+            insight cache lives there.
+        """
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                settings = Config.JOBS
+                store = None
+                if Cache.writable_backend() == "sqlite":
+                    store = SqliteStore(
+                        Config.CACHE_SQLITE_FILE,
+                        table="jobs",
+                        busy_timeout=Config.CACHE_SQLITE["BUSY_TIMEOUT"],
+                        maintenance_interval=Config.CACHE_SQLITE[
+                            "MAINTENANCE_INTERVAL"
+                        ],
+                    )
+                cls._shared = cls(
+                    max_workers=settings["WORKERS"],
+                    max_pending=settings["MAX_PENDING"],
+                    result_ttl=settings["RESULT_TTL"],
+                    timeout=settings["TIMEOUT"],
+                    store=store,
+                    poll_interval=settings["POLL_INTERVAL"],
+                )
+            return cls._shared
+
+    def submit(self, key: str, fn, *args, **kwargs) -> Job:
+        """
+        Run ``fn(*args, **kwargs)`` in the background, unless a job for
+        ``key`` is already queued or running.
+
+        Parameters
+        ----------
+        key : str
+            Identity of the work.
+        fn : callable
+            Function to run; its return value becomes the job result and
+            must be JSON-serializable when a store is used.
+
+        Returns
+        -------
+        Job
+            The new job, or the unfinished job already submitted for ``key``.
+
+        Raises
+        ------
+        JobQueueFullError
+            If ``max_pending`` jobs are queued or running.
+        """
+
+        with self._lock:
+            self._prune(time.time())
+            job = self._by_key.get(key)
+            if job is not None:
+                return job
+            if self._pending >= self.max_pending:
+                self._jobs_total.inc(status="rejected")
+                raise JobQueueFullError()
+
+            job = Job(key)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self._pending += 1
+            self._queue_depth.set(self._pending)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="job"
+                )
+            executor = self._executor
+
+        self._publish(job)
+        executor.submit(self._run, job, fn, args, kwargs)
+        return job
+
+    def get(self, job_id: str, wait: float = 0.0) -> dict | None:
+        """
+        Look up a job, waiting up to ``wait`` seconds for it to finish.
+
+        Parameters
+        ----------
+        job_id : str
+            Id of a submitted job.
+        wait : float
+            Longest time to wait for an unfinished job (long-poll).
+
+        Returns
+        -------
+        dict or None
+            The job as in `Job.to_dict`, or None if it is unknown or expired.
+        """
+
+        with self._lock:
+            self._prune(time.time())
+            job = self._jobs.get(job_id)
+        if job is not None:
+            if wait > 0:
+                job.done.wait(wait)
+            return job.to_dict()
+
+        deadline = time.monotonic() + wait
+        while True:
+            record = self._lookup(job_id)
+            if record is None or record["status"] in (DONE, FAILED):
+                return record
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return record
+            time.sleep(min(self.poll_interval, remaining))
+
+    def stats(self) -> dict:
+        """
+        Returns
+        -------
+        dict
+            Jobs queued or running, and finished jobs still retained.
+        """
+
+        with self._lock:
+            return {
+                "pending": self._pending,
+                "finished": len(self._jobs) - self._pending,
+            }
+
+    def _run(self, job: Job, fn, args, kwargs):
+        job.status = RUNNING
+        self._publish(job)
+        try:
+            job.result = fn(*args, **kwargs)
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        job.finished = time.time()
+
+        with self._lock:
+            self._by_key.pop(job.key, None)
+            self._pending -= 1
+            self._queue_depth.set(self._pending)
+            self._finished.append((job.finished + self.result_ttl, job.id))
+        self._jobs_total.inc(status=job.status)
+        self._job_seconds.observe(job.finished - job.created)
+        self._publish(job)
+        job.done.set()
+
+    def _prune(self, now: float):
+        # Expects self._lock to be held.
+        while self._finished and self._finished[0][0] <= now:
+            _, job_id = self._finished.popleft()
+            self._jobs.pop(job_id, None)
+
+    def _publish(self, job: Job):
+        """
+        Write the state of ``job`` to the shared store, if any.
+        """
+
+        if self.store is None:
+            return
+        record = job.to_dict()
+        if job.finished is None:
+            record["expires_at"] = job.created + self.timeout
+        else:
+            record["expires_at"] = job.finished + self.result_ttl
+        try:
+            self.store.put(job.id, record)
+        except Exception as e:
+            print(f"Failed to record job {job.id}: {e}")
+
+    def _lookup(self, job_id: str) -> dict | None:
+        """
+        Returns
+        -------
+        dict or None
+            The job record from the shared store, or None if there is no
+            store or the job is unknown, expired or lost.
+        """
+
+        if self.store is None:
+            return None
+        try:
+            record = self.store.get(job_id)
+        except Exception as e:
+            print(f"Failed to read job {job_id}: {e}")
+            return None
+        if record is None or record.pop("expires_at", 0) <= time.time():
+            return None
+        return record
@@ -0,0 +1,448 @@
+"""
+metrics.py
+
+In-process metrics with Prometheus text exposition.
+
+Every series (metric plus label values) is a small object guarded by its
+own lock, so recording a value into a series bound beforehand costs a lock
+and a few additions (well under a microsecond) and can stay enabled in
+production. Values are rendered in the Prometheus text format (version
+0.0.4) when scraped.
+
+Each process keeps its own values: in production mode every gunicorn
+worker reports the requests it served, and a scrape reaches one worker.
+
+Classes
+-------
+Counter
+    Monotonically increasing count, optionally split by labels.
+Gauge
+    Value that can go up and down, e.g. a cache size read at scrape time.
+Histogram
+    Distribution of observations (e.g. latencies) over fixed buckets.
+Metrics
+    Registry of the metrics above, with the process-wide instance returned
+    by `Metrics.shared()`.
+
+Example
+-------
+>>> metrics = Metrics.shared()
+>>> stages = metrics.histogram("stage_seconds", "Stage latency.", ("stage",))
+>>> with metrics.timer(stages.labels(stage="cache_lookup")):
+...     ...
+>>> print(metrics.render())
+"""
+
+import threading
+import time
+from bisect import bisect_left
+
+DEFAULT_BUCKETS = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _format_labels(names, values, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """
+    Shared parts of all metric types: name, help text and label handling.
+
+    Every distinct combination of label values is a series. `labels` returns
+    the series object for a combination, created on first use; callers on a
+    hot path should bind it once and reuse it, which skips the label lookup.
+    """
+
+    type = None
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+        if not self.labelnames:
+            self.labels()  # an unlabelled metric is exported from the start
+
+    def labels(self, **labels):
+        """
+        Returns
+        -------
+        series
+            The series of this metric selected by ``labels``.
+        """
+
+        try:
+            key = tuple([labels[name] for name in self.labelnames])
+        except KeyError:
+            key = None
+        if key is None or len(labels) != len(key):
+            raise ValueError(
+                f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}"
+            )
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.get(key)
+                if series is None:
+                    series = self._series[key] = self._new_series()
+        return series
+
+    def _new_series(self):
+        raise NotImplementedError
+
+    def _sorted_series(self) -> list[tuple]:
+        with self._lock:
+            series = list(self._series.items())
+        return sorted(series, key=lambda item: [str(v) for v in item[0]])
+
+    def _header(self) -> list[str]:
+        return [
+            f"# HELP {self.name} {_escape(self.documentation)}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        for key, values in self._sorted_series():
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}{labels} {_format_value(values.value())}")
+        return lines
+
+
+class _Value:
+    """
+    One counter or gauge series.
+    """
+
+    __slots__ = ("_lock", "_value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 0
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self._value += amount
+
+    def set(self, value: float):
+        with self._lock:
+            self._value = value
+
+    def value(self) -> float:
+        with self._lock:
+            return self._value
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count.
+
+    Example
+    -------
+    >>> lookups = Counter("cache_lookups_total", "Cache lookups.", ("result",))
+    >>> lookups.inc(result="hit")
+    >>> hits = lookups.labels(result="hit")  # bound once, for hot paths
+    >>> hits.inc()
+    """
+
+    type = "counter"
+
+    def _new_series(self):
+        return _Value()
+
+    def inc(self, amount: float = 1, **labels):
+        """
+        Add ``amount`` (non-negative) to the series selected by ``labels``.
+        """
+
+        self.labels(**labels).inc(amount)
+
+    def value(self, **labels) -> float:
+        return self.labels(**labels).value()
+
+
+class Gauge(_Metric):
+    """
+    Value that can be set to anything, e.g. a size sampled at scrape time.
+    """
+
+    type = "gauge"
+
+    def _new_series(self):
+        return _Value()
+
+    def set(self, value: float, **labels):
+        self.labels(**labels).set(value)
+
+    def value(self, **labels) -> float:
+        return self.labels(**labels).value()
+
+
+class _Timer:
+    """
+    Context manager observing its elapsed wall time into a histogram series.
+    """
+
+    __slots__ = ("_series", "_start")
+
+    def __init__(self, series):
+        self._series = series
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._series.observe(time.perf_counter() - self._start)
+        return False
+
+
+class _NullTimer:
+    """
+    Stand-in for `_Timer` when timing is disabled.
+    """
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _Distribution:
+    """
+    One histogram series: a count per bucket plus the sum of observations.
+    """
+
+    __slots__ = ("_lock", "_bounds", "_counts", "_sum")
+
+    def __init__(self, bounds: tuple):
+        self._lock = threading.Lock()
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)  # last one is +Inf
+        self._sum = 0.0
+
+    def observe(self, value: float):
+        index = bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def time(self) -> _Timer:
+        """
+        Returns
+        -------
+        _Timer
+            Context manager observing the seconds spent inside it.
+        """
+
+        return _Timer(self)
+
+    def snapshot(self) -> tuple[list[int], float]:
+        """
+        Returns
+        -------
+        tuple[list[int], float]
+            Per-bucket (non-cumulative) counts and the sum of observations.
+        """
+
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observations over fixed upper bounds.
+
+    Each series keeps one count per bucket plus the sum of all observations;
+    cumulative bucket counts are only computed when rendered.
+
+    Attributes
+    ----------
+    buckets : tuple[float, ...]
+        Sorted upper bounds, without the implicit ``+Inf`` bucket.
+    """
+
+    type = "histogram"
+
+    def __init__(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self):
+        return _Distribution(self.buckets)
+
+    def observe(self, value: float, **labels):
+        """
+        Record one observation in the series selected by ``labels``.
+        """
+
+        self.labels(**labels).observe(value)
+
+    def time(self, **labels) -> _Timer:
+        """
+        Returns
+        -------
+        _Timer
+            Context manager observing the seconds spent inside it.
+        """
+
+        return self.labels(**labels).time()
+
+    def render(self) -> list[str]:
+        lines = self._header()
+        bounds = [*self.buckets, float("inf")]
+        for key, distribution in self._sorted_series():
+            counts, total = distribution.snapshot()
+            cumulative = 0
+            for bound, count in zip(bounds, counts):
+                cumulative += count
+                labels = _format_labels(
+                    self.labelnames, key, f'le="{_format_value(float(bound))}"'
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Metrics:
+    """
+    Registry of named metrics.
+
+    Metrics are created on first request and returned as-is afterwards, so
+    modules can declare the metrics they record at import time without
+    coordinating with each other.
+
+    Attributes
+    ----------
+    namespace : str
+        Prefix prepended to every metric name.
+    enabled : bool
+        When False, `timer` returns a no-op context manager, so stage timing
+        costs nothing. Counters keep counting.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, namespace: str = "", enabled: bool = True):
+        self.namespace = namespace
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._metrics: dict[str, _Metric] = {}
+
+    @classmethod
+    def shared(cls):
+        """
+        Returns
+        -------
+        Metrics
+            The process-wide registry, configured from `Config.METRICS`.
+        """
+
+        if cls._shared is None:
+            with cls._shared_lock:
+                if cls._shared is None:
+                    from config.config import Config
+
+                    cls._shared = cls(
+                        namespace=Config.METRICS["NAMESPACE"],
+                        enabled=Config.METRICS["ENABLED"],
+                    )
+        return cls._shared
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._get(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames=()) -> Gauge:
+        return self._get(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._get(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def timer(self, series):
+        """
+        Parameters
+        ----------
+        series : Histogram or histogram series
+            Unlabelled histogram, or a series returned by `Histogram.labels`.
+
+        Returns
+        -------
+        context manager
+            Times its block into ``series``, or does nothing when disabled.
+        """
+
+        if not self.enabled:
+            return NULL_TIMER
+        return series.time()
+
+    def render(self) -> str:
+        """
+        Returns
+        -------
+        str
+            Every metric in the Prometheus text exposition format.
+        """
+
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _get(self, cls, name, documentation, labelnames, **kwargs):
+        name = f"{self.namespace}_{name}" if self.namespace else name
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(
+                    name, documentation, labelnames, **kwargs
+                )
+            elif type(metric) is not cls or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered differently")
+        return metric
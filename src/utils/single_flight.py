@@ -0,0 +1,111 @@
+"""
+single_flight.py
+
+Request coalescing for duplicate concurrent work.
+
+Classes
+-------
+SingleFlight
+    Per-key in-flight registry: the first caller for a key runs the work,
+    concurrent callers for the same key wait for and share its outcome.
+"""
+
+import threading
+
+
+class _Call:
+    """
+    State of one in-flight call shared between the leader and its waiters.
+    """
+
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls that share the same key into a single execution.
+
+    The first thread to call `do` for a key becomes the leader and runs the
+    function. Threads arriving while the leader is still running block until
+    it finishes and receive the same return value, or the same exception if
+    it raised. Once the call completes the key is forgotten, so the next call
+    starts fresh.
+
+    Safe to use from any number of threads (Flask threaded server, gunicorn
+    threaded workers).
+
+    Example
+    -------
+    >>> flight = SingleFlight()
+    >>> result, shared = flight.do("Ritika_1995-08-20", expensive_fn, "Ritika")
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, _Call] = {}
+
+    def do(self, key: str, fn, *args, **kwargs):
+        """
+        Run ``fn(*args, **kwargs)`` once for all concurrent callers of ``key``.
+
+        Parameters
+        ----------
+        key : str
+            Identity of the work; calls with equal keys are coalesced.
+        fn : callable
+            Function to execute if no call for ``key`` is in flight.
+
+        Returns
+        -------
+        tuple[object, bool]
+            The function result and whether it was shared from another caller.
+
+        Raises
+        ------
+        Exception
+            Whatever ``fn`` raised, re-raised in the leader and every waiter.
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn(*args, **kwargs)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result, False
+
+    def in_flight(self) -> int:
+        """
+        Returns
+        -------
+        int
+            Number of keys currently being computed.
+        """
+
+        with self._lock:
+            return len(self._calls)
@@ -1,4 +1,7 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from zoneinfo import ZoneInfo
+
+from config.config import Config
 
 
 class Utils:
@@ -11,5 +14,69 @@ class Utils:
             return False
 
     @staticmethod
-    def user_key(name: str, birth_date: str) -> str:
-        return f"{name}_{birth_date}"
+    def user_key(
+        name: str,
+        birth_date: str,
+        birth_time: str | None = None,
+        timezone: str | None = None,
+    ) -> str:
+        """
+        Cache key of a user's insight.
+
+        With `Config.ZODIAC["EXACT"]` on, the sign also depends on the birth
+        time and the timezone of the birth place, so both are part of the key
+        (as in `ModelInference.get_zodiac_sign`, an unknown timezone stands
+        for `Config.ZODIAC["DEFAULT_TIMEZONE"]`).
+
+        Parameters
+        ----------
+        name : str
+            Name of the user.
+        birth_date : str
+            Date of birth in YYYY-MM-DD format.
+        birth_time : str, optional
+            Local time of birth.
+        timezone : str, optional
+            IANA timezone of the birth place, if known.
+
+        Returns
+        -------
+        str
+            ``name_birthdate``, or ``name_birthdate_birthtime_timezone`` when
+            the sign is resolved exactly.
+        """
+
+        if not (Config.ZODIAC["EXACT"] and birth_time):
+            return f"{name}_{birth_date}"
+        timezone = timezone or Config.ZODIAC["DEFAULT_TIMEZONE"]
+        return f"{name}_{birth_date}_{birth_time}_{timezone}"
+
+    @staticmethod
+    def birth_instant(birth_date: str, birth_time: str, tz_name: str):
+        """
+        Combine a local birth date and time into a UTC instant.
+
+        Parameters
+        ----------
+        birth_date : str
+            Date of birth in YYYY-MM-DD format.
+        birth_time : str
+            Local time of birth as HH:MM or HH:MM:SS.
+        tz_name : str
+            IANA timezone of the birth place.
+
+        Returns
+        -------
+        datetime or None
+            Timezone-aware UTC datetime, or None if the time cannot be parsed.
+        """
+
+        for fmt in ("%Y-%m-%d %H:%M", "%Y-%m-%d %H:%M:%S"):
+            try:
+                local = datetime.strptime(f"{birth_date} {birth_time}", fmt)
+                break
+            except (TypeError, ValueError):
+                continue
+        else:
+            return None
+        return local.replace(tzinfo=ZoneInfo(tz_name)).astimezone(timezone.utc)
@@ -0,0 +1,113 @@
+"""
+ingress.py
+
+Exact zodiac sign lookup from the precomputed sun-ingress table.
+
+The fixed calendar boundaries of `Zodiac.ZODIAC_DATES` are off by a day for
+people born on cusp days, depending on the year and hour. The table built by
+`src.zodiac.build_ingress_table` lists the exact UTC instants at which the
+sun enters each sign from 1900 to 2100; finding the sign of a birth instant
+is a binary search over it.
+
+Classes
+-------
+SunIngressTable
+    Memory-mapped, array-backed table of sun-ingress instants.
+"""
+
+import bisect
+import mmap
+import sys
+import threading
+from array import array
+from datetime import datetime
+
+from src.zodiac.build_ingress_table import DEFAULT_PATH, HEADER, MAGIC
+
+
+class SunIngressTable:
+    """
+    Sun-ingress instants, memory-mapped from the binary table file.
+
+    The file is mapped read-only, so every worker process shares the same
+    physical pages and opening the table costs no parsing.
+
+    Attributes
+    ----------
+    path : str
+        Path of the binary table file.
+    first_sign : int
+        Index in `Zodiac.SIGNS` of the sign entered at the first instant.
+    instants : Sequence[int]
+        Ingress instants as UNIX seconds (UTC), ascending.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, self.first_sign, count = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a sun-ingress table")
+
+        body = memoryview(self._mmap)[HEADER.size : HEADER.size + 8 * count]
+        if sys.byteorder == "little":
+            self.instants = body.cast("q")
+        else:
+            self.instants = array("q", body.tobytes())
+            self.instants.byteswap()
+
+    @classmethod
+    def shared(cls) -> "SunIngressTable":
+        """
+        Returns
+        -------
+        SunIngressTable
+            The process-wide table loaded from the bundled file.
+        """
+
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    def covers(self, unix_seconds: float) -> bool:
+        """
+        Returns
+        -------
+        bool
+            True if the instant lies within the table's range.
+        """
+
+        return self.instants[0] <= unix_seconds < self.instants[-1]
+
+    def sign_index(self, unix_seconds: float) -> int | None:
+        """
+        Find the sign the sun is in at a given instant.
+
+        Parameters
+        ----------
+        unix_seconds : float
+            Instant as UNIX seconds (UTC).
+
+        Returns
+        -------
+        int or None
+            Index in `Zodiac.SIGNS`, or None if the instant is outside the table.
+        """
+
+        if not self.covers(unix_seconds):
+            return None
+        position = bisect.bisect_right(self.instants, unix_seconds) - 1
+        return (self.first_sign + position) % 12
+
+    def sign_index_at(self, instant: datetime) -> int | None:
+        """
+        Same as `sign_index` for a timezone-aware datetime.
+        """
+
+        return self.sign_index(instant.timestamp())
@@ -6,10 +6,16 @@ Module to determine a person's zodiac sign based on birth date.
 Classes
 -------
 Zodiac
-    Provides a method to infer the zodiac sign from a given date string.
+    Provides methods to infer the zodiac sign from a given date string, from
+    many dates at once in a single vectorized pass, or from an exact birth
+    instant via the sun-ingress table.
 """
 
-from datetime import datetime
+from datetime import date, datetime
+
+# Day-of-year offset of the first day of each month in a leap year, so that
+# every (month, day) pair, Feb 29 included, maps to a unique index in 0..365.
+_MONTH_OFFSETS = (0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
 
 
 class Zodiac:
@@ -18,14 +24,34 @@ class Zodiac:
 
     Attributes
     ----------
+    SIGNS : tuple[str, ...]
+        The twelve zodiac signs in order, starting from Aries.
     ZODIAC_DATES : list[tuple[str, tuple[int, int], tuple[int, int]]]
         List of zodiac signs with their start and end dates.
         Each entry is a tuple of:
         - Zodiac name (str)
         - Start date (month, day)
         - End date (month, day)
+    DAY_OF_YEAR_SIGNS : tuple[int, ...]
+        366-entry lookup table, built from `ZODIAC_DATES`, mapping the leap-year
+        day-of-year index of a (month, day) to the index of its sign in `SIGNS`.
     """
 
+    SIGNS = (
+        "Aries",
+        "Taurus",
+        "Gemini",
+        "Cancer",
+        "Leo",
+        "Virgo",
+        "Libra",
+        "Scorpio",
+        "Sagittarius",
+        "Capricorn",
+        "Aquarius",
+        "Pisces",
+    )
+
     ZODIAC_DATES = [
         ("Capricorn", (1, 1), (1, 19)),
         ("Aquarius", (1, 20), (2, 18)),
@@ -56,7 +82,11 @@ class Zodiac:
         -------
         str
             The zodiac sign corresponding to the given date.
-            Returns "Unknown" if the date does not match any zodiac range.
+
+        Raises
+        ------
+        ValueError
+            If ``date_str`` is not a valid 'YYYY-MM-DD' date.
 
         Example
         -------
@@ -64,9 +94,109 @@ class Zodiac:
         'Leo'
         """
 
-        date_obj = datetime.strptime(date_str, "%Y-%m-%d")
-        month, day = date_obj.month, date_obj.day
+        year, month, day = date_str.split("-")
+        date_obj = date(int(year), int(month), int(day))  # validates the date
+        day_of_year = _MONTH_OFFSETS[date_obj.month - 1] + date_obj.day - 1
+        return cls.SIGNS[cls.DAY_OF_YEAR_SIGNS[day_of_year]]
+
+    @classmethod
+    def get_zodiac_exact(
+        cls, birth_instant: datetime, birth_date: str | None = None
+    ) -> str:
+        """
+        Determine the zodiac sign from the exact birth instant.
+
+        Uses the precomputed sun-ingress table, so people born on cusp days get
+        the sign the sun was actually in at their time of birth. Instants outside
+        the table's range (1900-2100) fall back to the calendar boundaries of
+        the local birth date, as `get_zodiac` would.
+
+        Parameters
+        ----------
+        birth_instant : datetime
+            Timezone-aware birth instant.
+        birth_date : str, optional
+            Local date of birth (YYYY-MM-DD) for the fallback. Defaults to the
+            date of ``birth_instant`` in its own timezone, which differs from
+            the local date near midnight when the instant is in UTC.
+
+        Returns
+        -------
+        str
+            The zodiac sign at that instant.
+
+        Example
+        -------
+        >>> from datetime import timezone
+        >>> Zodiac.get_zodiac_exact(datetime(2020, 1, 20, 15, tzinfo=timezone.utc))
+        'Aquarius'
+        """
+
+        from src.zodiac.ingress import SunIngressTable
+
+        sign = SunIngressTable.shared().sign_index_at(birth_instant)
+        if sign is None:
+            return cls.get_zodiac(birth_date or birth_instant.date().isoformat())
+        return cls.SIGNS[sign]
+
+    @classmethod
+    def get_zodiac_many(cls, dates, as_index: bool = False):
+        """
+        Determine the zodiac signs of many birth dates in one vectorized pass.
+
+        Parameters
+        ----------
+        dates : list[str] or numpy.ndarray
+            ISO dates ('YYYY-MM-DD') or `numpy.datetime64` values. NaT entries
+            are reported as "Unknown" (index -1).
+        as_index : bool, optional
+            Return sign indices into `Zodiac.SIGNS` instead of names (default False).
+
+        Returns
+        -------
+        numpy.ndarray
+            Sign names (dtype str) or sign indices (dtype int8), one per date.
+
+        Raises
+        ------
+        ValueError
+            If a string cannot be parsed as an ISO date.
+
+        Example
+        -------
+        >>> Zodiac.get_zodiac_many(["1995-08-20", "2000-01-05"]).tolist()
+        ['Leo', 'Capricorn']
+        """
+
+        import numpy as np
+
+        days = np.asarray(dates).astype("datetime64[D]")
+        months = days.astype("datetime64[M]")
+        month_index = months.astype(np.int64) % 12
+        day_index = (days - months.astype("datetime64[D]")).astype(np.int64)
+
+        table = np.asarray(cls.DAY_OF_YEAR_SIGNS, dtype=np.int8)
+        offsets = np.asarray(_MONTH_OFFSETS, dtype=np.int64)
+        day_of_year = offsets[month_index] + day_index
+        unknown = np.isnat(days)
+        day_of_year[unknown] = 0
+        signs = table[day_of_year]
+        signs[unknown] = -1
+
+        if as_index:
+            return signs
+        # Index -1 selects the trailing "Unknown".
+        return np.asarray(cls.SIGNS + ("Unknown",))[signs]
+
+    @classmethod
+    def _build_day_of_year_table(cls) -> tuple[int, ...]:
+        table = [None] * 366
         for sign, (sm, sd), (em, ed) in cls.ZODIAC_DATES:
-            if (month == sm and day >= sd) or (month == em and day <= ed):
-                return sign
-        return "Unknown"
+            start = _MONTH_OFFSETS[sm - 1] + sd - 1
+            end = _MONTH_OFFSETS[em - 1] + ed - 1
+            for day_of_year in range(start, end + 1):
+                table[day_of_year] = cls.SIGNS.index(sign)
+        return tuple(table)
+
+
+Zodiac.DAY_OF_YEAR_SIGNS = Zodiac._build_day_of_year_table()
@@ -0,0 +1,49 @@
+import pytest
+
+from config.config import Config
+from src.cache.response_cache import ResponseCache
+from src.interface.ui_backend import UIInterface
+from src.models.model_infer import ModelInference
+from src.translator.translation_cache import TranslationCache
+from src.utils.job_manager import JobManager
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """
+    Point every cache file of `Config` at a temporary directory and reset the
+    process-wide caches, so each test starts from empty stores.
+    """
+
+    monkeypatch.setattr(Config, "CACHE_FILE", str(tmp_path / "cache.json"))
+    monkeypatch.setattr(Config, "CACHE_LOG_FILE", str(tmp_path / "cache.log"))
+    monkeypatch.setattr(Config, "CACHE_SQLITE_FILE", str(tmp_path / "cache.sqlite3"))
+    for name, file in (
+        ("CACHE_SNAPSHOT", "cache.snap"),
+        ("SIGN_TEMPLATES", "sign_templates.json"),
+        ("PROMPT_CACHE", "responses.log"),
+        ("TRANSLATION_CACHE", "translations.log"),
+    ):
+        monkeypatch.setattr(
+            Config, name, {**getattr(Config, name), "FILE": str(tmp_path / file)}
+        )
+    for cls in (ResponseCache, TranslationCache, JobManager):
+        monkeypatch.setattr(cls, "_shared", None)
+    yield tmp_path
+
+
+@pytest.fixture
+def client(cache_dir, monkeypatch):
+    """
+    Test client of the Flask app with the dummy predictor and translator.
+    """
+
+    monkeypatch.setattr(Config, "USE_DUMMY_LLM", True)
+    monkeypatch.setattr(Config, "USE_DUMMY_TRANSLATION", True)
+
+    class Setup:
+        llm = None
+
+    ui = UIInterface(ModelInference(Setup()))
+    yield ui.app.test_client()
+    ui.cache.close()
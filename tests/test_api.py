@@ -0,0 +1,68 @@
+PAYLOAD = {
+    "name": "Priya",
+    "birth_date": "1995-08-20",
+    "birth_time": "14:30",
+    "birth_place": "Jaipur, India",
+    "language": "English",
+}
+
+
+def test_predict_answers_then_serves_from_cache(client):
+    first = client.post("/predict", json=PAYLOAD)
+    assert first.status_code == 200
+    assert first.json["zodiac"] == "Leo"
+    assert first.json["cached"] is False
+
+    second = client.post("/predict", json=PAYLOAD)
+    assert second.json["cached"] is True
+    assert second.json["insight"] == first.json["insight"]
+
+
+def test_predict_rejects_fields_that_are_not_strings(client):
+    response = client.post("/predict", json={**PAYLOAD, "birth_date": 19950820})
+    assert response.status_code == 400
+    assert response.json == {"error": "Fields must be strings"}
+
+
+def test_batch_reports_invalid_items_without_failing_the_batch(client):
+    items = [
+        PAYLOAD,
+        {**PAYLOAD, "birth_date": 19900101},
+        {**PAYLOAD, "language": ["en"]},
+        {**PAYLOAD, "name": ""},
+        {**PAYLOAD, "birth_date": "1995-13-40"},
+        "not an object",
+        {**PAYLOAD, "name": "Arjun"},
+    ]
+    response = client.post("/predict_batch", json=items)
+    assert response.status_code == 200
+
+    results = response.json["results"]
+    assert [result.get("error") for result in results] == [
+        None,
+        "Fields must be strings",
+        "Fields must be strings",
+        "Missing required fields",
+        "Invalid date format",
+        "Payload must be a JSON object",
+        None,
+    ]
+    assert results[0]["zodiac"] == results[6]["zodiac"] == "Leo"
+
+
+def test_exact_sign_is_cached_per_birth_time(client):
+    morning = {**PAYLOAD, "name": "Ritika", "birth_date": "2020-07-22"}
+    evening = {**morning, "birth_time": "23:00"}
+    morning["birth_time"] = "08:00"
+
+    first = client.post("/predict", json=morning)
+    assert first.json["zodiac"] == "Cancer"
+    second = client.post("/predict", json=evening)
+    assert second.json["zodiac"] == "Leo"
+    assert second.json["cached"] is False
+
+    batch = client.post("/predict_batch", json=[morning, evening]).json["results"]
+    assert [(r["zodiac"], r["cached"]) for r in batch] == [
+        ("Cancer", True),
+        ("Leo", True),
+    ]
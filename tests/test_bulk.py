@@ -0,0 +1,75 @@
+import json
+
+import pytest
+
+from config.config import Config
+from src.interface import bulk
+from src.interface.bulk import BulkRunner
+
+ROW = {
+    "name": "Priya",
+    "birth_date": "1995-08-20",
+    "birth_time": "14:30",
+    "birth_place": "Jaipur, India",
+}
+
+
+@pytest.fixture
+def runner(cache_dir, monkeypatch):
+    """
+    Build a `BulkRunner` generating in a thread of this process with the
+    dummy predictor, leaving the settings its worker changes untouched.
+    """
+
+    monkeypatch.setattr(Config, "USE_DUMMY_LLM", True)
+    monkeypatch.setattr(Config, "USE_DUMMY_TRANSLATION", True)
+    for name in ("LLM_ASYNC", "LLM_QUOTA"):
+        monkeypatch.setattr(Config, name, dict(getattr(Config, name)))
+    monkeypatch.setattr(bulk, "_worker", None)
+
+    def build(rows):
+        source = cache_dir / "input.jsonl"
+        source.write_text("".join(json.dumps(row) + "\n" for row in rows))
+        return BulkRunner(
+            str(source), str(cache_dir / "output.jsonl"), processes=0, chunk_size=2
+        )
+
+    return build
+
+
+def read_output(runner):
+    with open(runner.output_path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_invalid_rows_are_reported_without_aborting_the_run(runner):
+    run = runner(
+        [
+            ROW,
+            {**ROW, "birth_date": 19950820},
+            {**ROW, "language": ["en"]},
+            {**ROW, "name": ""},
+            "not an object",
+            {**ROW, "name": "Arjun"},
+        ]
+    )
+    summary = run.run()
+    assert (summary["generated"], summary["errors"]) == (2, 4)
+
+    records = read_output(run)
+    assert [record["row"] for record in records] == list(range(6))
+    assert [record.get("error") for record in records] == [
+        None,
+        "Fields must be strings",
+        "Fields must be strings",
+        "Missing required fields",
+        "Row must be a JSON object",
+        None,
+    ]
+    run.cache.close()
+
+    # The checkpoint is past every row, so a resumed run has nothing to do.
+    resumed = BulkRunner(run.input_path, run.output_path, processes=0)
+    assert resumed.run()["rows"] == 0
+    assert len(read_output(resumed)) == 6
+    resumed.cache.close()
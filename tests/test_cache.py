@@ -0,0 +1,20 @@
+import json
+import time
+
+from config.config import Config
+from src.cache.cache import Cache
+
+
+def test_entries_without_expiry_are_kept_until_the_next_boundary(
+    tmp_path, monkeypatch
+):
+    monkeypatch.setitem(Config.CACHE_POLICY, "DAY_BOUNDARY", True)
+    path = tmp_path / "cache.json"
+    legacy = {"zodiac": "Leo", "insight": "Bright day.", "language": "en"}
+    path.write_text(json.dumps({"Ritika_2020-07-22": legacy}))
+
+    cache = Cache("json", str(path))
+    assert cache.get("Ritika_2020-07-22") == legacy
+    assert cache.store.get("Ritika_2020-07-22")["expires_at"] > time.time()
+    assert cache.stats()["expirations"] == 0
+    cache.close()
@@ -0,0 +1,80 @@
+import pytest
+
+from src.geo.gazetteer import Gazetteer
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return Gazetteer()
+
+
+def resolve(gazetteer, query):
+    place = gazetteer.lookup(query)
+    return place and (place.name, place.country_code, place.timezone)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("Jaipur", ("Jaipur", "IN", "Asia/Kolkata")),  # exact
+        ("  jaipur ", ("Jaipur", "IN", "Asia/Kolkata")),  # normalized
+        ("Bombay", ("Mumbai", "IN", "Asia/Kolkata")),  # alternate name
+        ("jaipu", ("Jaipur", "IN", "Asia/Kolkata")),  # prefix
+        ("Jiapur", ("Jaipur", "IN", "Asia/Kolkata")),  # fuzzy
+        ("Atlantis", None),
+        ("", None),
+    ],
+)
+def test_name_matching(gazetteer, query, expected):
+    assert resolve(gazetteer, query) == expected
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("Hyderabad", ("Hyderabad", "IN", "Asia/Kolkata")),  # larger population
+        ("Hyderabad, Pakistan", ("Hyderabad", "PK", "Asia/Karachi")),
+        ("Hyderabad, Sindh", ("Hyderabad", "PK", "Asia/Karachi")),
+        ("Hyderabad, Telangana, IN", ("Hyderabad", "IN", "Asia/Kolkata")),
+        ("London, UK", ("London", "GB", "Europe/London")),
+        ("New York, USA", ("New York", "US", "America/New_York")),
+    ],
+)
+def test_qualifiers_pick_among_places(gazetteer, query, expected):
+    assert resolve(gazetteer, query) == expected
+
+
+@pytest.mark.parametrize(
+    "query", ["Paris, Texas", "London, Ontario", "Paris, USA", "Jiapur, Texas"]
+)
+def test_contradicting_qualifiers_resolve_to_nothing(gazetteer, query):
+    assert gazetteer.lookup(query) is None
+    assert gazetteer.timezone_for(query) is None
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("New York, NY", "America/New_York"),
+        ("Los Angeles, CA", "America/Los_Angeles"),  # "CA" is also Canada
+        ("Sydney, NSW", "Australia/Sydney"),
+    ],
+)
+def test_unknown_qualifiers_are_ignored(gazetteer, query, expected, capsys):
+    name = query.split(",")[0]
+    assert gazetteer.lookup(query) == gazetteer.lookup(name)
+    assert gazetteer.timezone_for(query) == expected
+    assert capsys.readouterr().out == ""
+
+
+def test_unknown_qualifier_does_not_override_a_matching_one(gazetteer):
+    assert resolve(gazetteer, "Hyderabad, Sindh, Atlantis") == (
+        "Hyderabad",
+        "PK",
+        "Asia/Karachi",
+    )
+    assert resolve(gazetteer, "Hyderabad, Atlantis") == (
+        "Hyderabad",
+        "IN",
+        "Asia/Kolkata",
+    )
@@ -0,0 +1,93 @@
+import threading
+import time
+
+import pytest
+
+from src.cache.sqlite_store import SqliteStore
+from src.utils.job_manager import JobManager, JobQueueFullError
+
+
+def blocked_job(release):
+    def run(value):
+        release.wait(5)
+        return value
+
+    return run
+
+
+def test_long_poll_returns_once_the_job_is_done():
+    jobs = JobManager()
+    release = threading.Event()
+    job = jobs.submit("key", blocked_job(release), {"insight": "done"})
+
+    assert jobs.get(job.id)["status"] in ("pending", "running")
+    threading.Timer(0.1, release.set).start()
+    started = time.monotonic()
+    record = jobs.get(job.id, wait=5)
+    assert time.monotonic() - started < 2
+    assert record == {"job_id": job.id, "status": "done", "result": {"insight": "done"}}
+
+
+def test_long_poll_gives_up_after_wait():
+    jobs = JobManager()
+    release = threading.Event()
+    job = jobs.submit("key", blocked_job(release), None)
+
+    assert jobs.get(job.id, wait=0.05)["status"] in ("pending", "running")
+    release.set()
+
+
+def test_submissions_with_the_same_key_share_one_job():
+    jobs = JobManager()
+    release = threading.Event()
+    first = jobs.submit("key", blocked_job(release), 1)
+    assert jobs.submit("key", blocked_job(release), 2) is first
+    release.set()
+    assert jobs.get(first.id, wait=5)["result"] == 1
+
+    assert jobs.submit("key", blocked_job(release), 3) is not first
+
+
+def test_full_queue_is_refused():
+    jobs = JobManager(max_workers=1, max_pending=2)
+    release = threading.Event()
+    jobs.submit("a", blocked_job(release), None)
+    jobs.submit("b", blocked_job(release), None)
+    with pytest.raises(JobQueueFullError):
+        jobs.submit("c", blocked_job(release), None)
+    release.set()
+
+
+def test_failed_job_reports_its_error_and_results_expire():
+    jobs = JobManager(result_ttl=0.1)
+
+    def fail():
+        raise RuntimeError("LLM unavailable")
+
+    job = jobs.submit("key", fail)
+    assert jobs.get(job.id, wait=5) == {
+        "job_id": job.id,
+        "status": "failed",
+        "error": "LLM unavailable",
+    }
+    time.sleep(0.15)
+    assert jobs.get(job.id) is None
+    assert jobs.get("unknown") is None
+
+
+def test_job_of_another_worker_is_long_polled_through_the_store(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    worker = JobManager(store=SqliteStore(path, table="jobs"))
+    other = JobManager(store=SqliteStore(path, table="jobs"), poll_interval=0.02)
+    release = threading.Event()
+    job = worker.submit("key", blocked_job(release), "result")
+
+    assert other.get(job.id)["status"] in ("pending", "running")
+    threading.Timer(0.1, release.set).start()
+    assert other.get(job.id, wait=5) == {
+        "job_id": job.id,
+        "status": "done",
+        "result": "result",
+    }
+    worker.store.close()
+    other.store.close()
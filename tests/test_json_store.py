@@ -0,0 +1,64 @@
+import json
+import time
+
+from src.cache.json_store import JsonFileStore
+
+
+def test_strict_updates_are_written_before_returning(tmp_path):
+    path = tmp_path / "cache.json"
+    store = JsonFileStore(str(path))
+    store.put("a", {"insight": "one"})
+    assert json.loads(path.read_text()) == {"a": {"insight": "one"}}
+
+    store.delete("a")
+    assert json.loads(path.read_text()) == {}
+    store.close()
+
+
+def test_write_behind_flushes_on_close(tmp_path):
+    path = tmp_path / "cache.json"
+    store = JsonFileStore(str(path), durability="relaxed", flush_interval=60)
+    store.put("a", {"insight": "one"})
+    assert json.loads(path.read_text()) == {}
+    store.close()
+    assert json.loads(path.read_text()) == {"a": {"insight": "one"}}
+
+
+def test_write_behind_flushes_once_enough_updates_are_pending(tmp_path):
+    path = tmp_path / "cache.json"
+    store = JsonFileStore(
+        str(path), durability="relaxed", flush_interval=60, flush_max_dirty=3
+    )
+    for i in range(3):
+        store.put(f"k{i}", {"insight": str(i)})
+
+    deadline = time.monotonic() + 5
+    while len(json.loads(path.read_text())) < 3 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(json.loads(path.read_text())) == 3
+    store.close()
+
+
+def test_interrupted_rewrite_leaves_the_previous_file(tmp_path):
+    path = tmp_path / "cache.json"
+    store = JsonFileStore(str(path))
+    store.put("a", {"insight": "one"})
+    store.close()
+    (tmp_path / "cache.json.tmp").write_text('{"a": {"insight": "tw')
+
+    store = JsonFileStore(str(path))
+    assert store.get("a") == {"insight": "one"}
+    assert not (tmp_path / "cache.json.tmp").exists()
+    store.close()
+
+
+def test_corrupt_file_is_moved_aside(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text('{"a": {"insight": "one"')
+
+    store = JsonFileStore(str(path))
+    assert len(store) == 0
+    moved = list(tmp_path.glob("cache.json.corrupt-*"))
+    assert [p.read_text() for p in moved] == ['{"a": {"insight": "one"']
+    assert json.loads(path.read_text()) == {}
+    store.close()
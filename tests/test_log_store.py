@@ -0,0 +1,95 @@
+import pytest
+
+from src.cache.log_store import LogStructuredStore
+
+
+def open_store(path, **kwargs):
+    kwargs.setdefault("compaction_interval", 0)
+    return LogStructuredStore(str(path), **kwargs)
+
+
+def test_put_get_delete_survive_reopen(tmp_path):
+    path = tmp_path / "cache.log"
+    store = open_store(path)
+    store.put("a", {"insight": "one"})
+    store.put("b", {"insight": "two"})
+    store.put("a", {"insight": "three"})
+    store.delete("b")
+    store.close()
+
+    store = open_store(path)
+    assert store.get("a") == {"insight": "three"}
+    assert store.get("b") is None
+    assert store.keys() == ["a"]
+    store.close()
+
+
+def test_recovery_truncates_torn_tail_and_skips_corrupt_records(tmp_path):
+    path = tmp_path / "cache.log"
+    store = open_store(path)
+    store.put("a", {"insight": "one"})
+    store.put("b", {"insight": "two"})
+    store.close()
+
+    data = path.read_bytes()
+    first, second = data.splitlines(True)
+    corrupt = first[:9] + first[9:].replace(b"one", b"ONE")
+    path.write_bytes(corrupt + second + b'0000abcd ["c", {"insi')
+
+    store = open_store(path)
+    assert store.get("a") is None
+    assert store.get("b") == {"insight": "two"}
+    assert store.get("c") is None
+    store.close()
+    assert path.read_bytes() == corrupt + second
+
+
+def test_compaction_keeps_live_records_and_drops_garbage(tmp_path):
+    path = tmp_path / "cache.log"
+    store = open_store(path, compaction_min_bytes=0)
+    for i in range(100):
+        store.put(f"k{i % 10}", {"insight": f"v{i}"})
+    store.delete("k0")
+    assert store.needs_compaction()
+
+    before = store.stats()["log_bytes"]
+    store.compact()
+    stats = store.stats()
+    assert stats["log_bytes"] < before
+    assert stats["garbage_bytes"] == 0
+    assert store.get("k0") is None
+    assert store.get("k9") == {"insight": "v99"}
+    store.put("k1", {"insight": "after"})
+    store.close()
+
+    store = open_store(path)
+    assert store.get("k1") == {"insight": "after"}
+    assert len(store) == 9
+    store.close()
+
+
+def test_get_returns_miss_when_index_points_at_another_key(tmp_path):
+    path = tmp_path / "cache.log"
+    store = open_store(path)
+    store.put("prompt-A", {"text": "reply A"})
+
+    # Rewrite the file behind the store's back so the indexed offset now
+    # holds a record for another key.
+    record = LogStructuredStore._encode("prompt-B", {"text": "reply B"})
+    path.write_bytes(record)
+    assert store.get("prompt-A") is None
+    store.close()
+
+
+def test_second_store_on_the_same_file_is_refused(tmp_path):
+    path = tmp_path / "responses.log"
+    first = open_store(path)
+    first.put("prompt-A", {"text": "reply A"})
+
+    with pytest.raises(RuntimeError, match="single writer"):
+        open_store(path)
+
+    first.close()
+    second = open_store(path)  # the lock is released on close
+    assert second.get("prompt-A") == {"text": "reply A"}
+    second.close()
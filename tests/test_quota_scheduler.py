@@ -0,0 +1,92 @@
+import threading
+import time
+
+import pytest
+
+from src.llms.quota_scheduler import (
+    BATCH,
+    INTERACTIVE,
+    PREWARM,
+    QuotaExceededError,
+    QuotaScheduler,
+    ScheduledLLM,
+    llm_priority,
+)
+from src.models.model_infer import ModelInference
+from src.prompts.prompt import NAME_PLACEHOLDER
+
+
+def drained_scheduler(requests_per_minute):
+    scheduler = QuotaScheduler(requests_per_minute, None, burst_seconds=0)
+    scheduler.acquire(0)  # takes the only request of the burst
+    return scheduler
+
+
+def test_queued_calls_are_granted_by_priority_then_arrival():
+    scheduler = drained_scheduler(240)  # one grant every 0.25 s
+    granted = []
+
+    def call(priority, label):
+        with llm_priority(priority, max_wait=None):
+            scheduler.acquire(0)
+        granted.append(label)
+
+    threads = []
+    for priority, label in (
+        (PREWARM, "prewarm-1"),
+        (PREWARM, "prewarm-2"),
+        (BATCH, "batch"),
+        (INTERACTIVE, "interactive"),
+    ):
+        thread = threading.Thread(target=call, args=(priority, label))
+        thread.start()
+        threads.append(thread)
+        while sum(scheduler.stats()["queued"].values()) < len(threads):
+            time.sleep(0.001)
+    for thread in threads:
+        thread.join()
+
+    assert granted == ["interactive", "batch", "prewarm-1", "prewarm-2"]
+
+
+def test_call_that_would_wait_too_long_is_refused_with_retry_after():
+    scheduler = drained_scheduler(60)
+
+    with llm_priority(BATCH, max_wait=0.1):
+        with pytest.raises(QuotaExceededError) as refused:
+            scheduler.acquire(0)
+    assert refused.value.priority == BATCH
+    assert 0.5 < refused.value.retry_after <= 1.0
+    assert scheduler.stats()["queued"][BATCH] == 0
+
+
+def test_unknown_priority_is_rejected():
+    with pytest.raises(ValueError):
+        with llm_priority("urgent"):
+            pass
+
+
+class RecordingScheduler(QuotaScheduler):
+    def __init__(self):
+        super().__init__(None, None)
+        self.priorities = []
+
+    def acquire(self, tokens, priority=None, *args):
+        self.priorities.append(self._options(priority, None)[0])
+        super().acquire(tokens, priority, *args)
+
+
+class TemplateLLM:
+    def generate_text(self, prompt, **kwargs):
+        return f"Dear {NAME_PLACEHOLDER}, the stars are kind today."
+
+
+def test_sign_templates_are_precomputed_at_prewarm_priority(cache_dir):
+    scheduler = RecordingScheduler()
+
+    class Setup:
+        llm = ScheduledLLM(TemplateLLM(), scheduler)
+
+    stored = ModelInference(Setup()).precompute_sign_templates(["English"])
+    assert stored == 12
+    assert scheduler.priorities == [PREWARM] * 12
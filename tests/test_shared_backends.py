@@ -0,0 +1,141 @@
+import importlib
+import sys
+
+import pytest
+
+from config.config import Config
+from src.cache.cache import Cache
+from src.cache.log_store import LogStructuredStore
+from src.cache.response_cache import ResponseCache
+from src.cache.sqlite_store import SqliteStore
+from src.interface.server import ProductionServer
+from src.models.model_infer import ModelInference
+from src.translator.translation_cache import TranslationCache
+from src.utils.job_manager import JobManager
+
+
+def use_backend(monkeypatch, backend, delta="log"):
+    monkeypatch.setattr(Config, "CACHE_BACKEND", backend)
+    monkeypatch.setattr(
+        Config, "CACHE_SNAPSHOT", {**Config.CACHE_SNAPSHOT, "DELTA": delta}
+    )
+
+
+@pytest.mark.parametrize(
+    "backend, delta, expected",
+    [
+        ("sqlite", "log", "sqlite"),
+        ("snapshot", "sqlite", "sqlite"),
+        ("snapshot", "log", "log"),
+        ("log", "sqlite", "log"),
+    ],
+)
+def test_writable_backend_resolves_the_snapshot_delta(
+    monkeypatch, backend, delta, expected
+):
+    use_backend(monkeypatch, backend, delta)
+    assert Cache.writable_backend() == expected
+
+
+def test_snapshot_with_sqlite_delta_shares_memo_caches(cache_dir, monkeypatch):
+    use_backend(monkeypatch, "snapshot", "sqlite")
+
+    responses = ResponseCache.shared()
+    translations = TranslationCache.shared()
+    jobs = JobManager.shared()
+    assert isinstance(responses.store, SqliteStore)
+    assert isinstance(translations.store, SqliteStore)
+    assert isinstance(jobs.store, SqliteStore)
+    assert not (cache_dir / "responses.log").exists()
+    assert not (cache_dir / "translations.log").exists()
+
+    ProductionServer.check_cache_backend(4)  # does not raise
+    for store in (responses.store, translations.store, jobs.store):
+        store.close()
+
+
+def test_check_cache_backend_refuses_a_private_snapshot_delta(monkeypatch):
+    use_backend(monkeypatch, "snapshot", "log")
+    ProductionServer.check_cache_backend(1)
+    with pytest.raises(ValueError):
+        ProductionServer.check_cache_backend(2)
+
+
+def test_two_sqlite_stores_on_one_file_see_each_others_writes(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    first = SqliteStore(path, table="responses")
+    second = SqliteStore(path, table="responses")
+
+    first.put("prompt-A", {"text": "reply A"})
+    second.put("prompt-B", {"text": "reply B"})
+    assert second.get("prompt-A") == {"text": "reply A"}
+    assert first.get("prompt-B") == {"text": "reply B"}
+
+    second.put("prompt-A", {"text": "reply A2"})
+    assert first.get("prompt-A") == {"text": "reply A2"}
+    first.delete("prompt-B")
+    assert second.get("prompt-B") is None
+    assert len(first) == len(second) == 1
+
+    first.close()
+    second.close()
+
+
+def test_memo_caches_of_two_workers_share_one_database(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    workers = [
+        ResponseCache(store=SqliteStore(path, table="responses")) for _ in range(2)
+    ]
+    key = ResponseCache.key("prompt", "model")
+
+    workers[0].put(key, "reply")
+    assert workers[1].get(key) == "reply"
+    assert workers[1].get(ResponseCache.key("other prompt", "model")) is None
+    for worker in workers:
+        worker.store.close()
+
+
+@pytest.mark.parametrize(
+    "cmd_args, argv",
+    [
+        ("--workers 4", ["gunicorn"]),
+        ("", ["gunicorn", "-w", "3", "wsgi:app"]),
+        ("-w 1", ["gunicorn", "--workers=2", "wsgi:app"]),
+    ],
+)
+def test_wsgi_refuses_a_private_backend_with_several_workers(
+    monkeypatch, cmd_args, argv
+):
+    use_backend(monkeypatch, "log")
+    monkeypatch.setenv("GUNICORN_CMD_ARGS", cmd_args)
+    monkeypatch.setattr("sys.argv", argv)
+    monkeypatch.delitem(sys.modules, "wsgi", raising=False)
+
+    with pytest.raises(ValueError, match="cannot be shared"):
+        importlib.import_module("wsgi")
+
+
+def test_memo_caches_fall_back_to_memory_when_their_log_is_owned(cache_dir):
+    owners = [
+        LogStructuredStore(Config.PROMPT_CACHE["FILE"]),
+        LogStructuredStore(Config.TRANSLATION_CACHE["FILE"]),
+    ]  # e.g. held by a running server
+
+    responses = ResponseCache.shared()
+    translations = TranslationCache.shared()
+    assert responses.store is None
+    assert translations.store is None
+    key = ResponseCache.key("prompt", "model")
+    responses.put(key, "reply")
+    assert responses.get(key) == "reply"
+    for owner in owners:
+        owner.close()
+
+
+def test_model_inference_opens_the_prompt_cache_on_first_use(cache_dir):
+    class Setup:
+        llm = None
+
+    model_infer = ModelInference(Setup())
+    assert ResponseCache._shared is None
+    assert model_infer.responses is ResponseCache.shared()
@@ -0,0 +1,100 @@
+import time
+
+from config.config import Config
+from src.cache.cache import Cache
+from src.cache.log_store import LogStructuredStore
+from src.cache.snapshot_store import SnapshotStore, convert_json, write_snapshot
+
+
+def entry(insight, expires_in=3600):
+    return {
+        "zodiac": "Leo",
+        "insight": insight,
+        "language": "en",
+        "expires_at": time.time() + expires_in,
+    }
+
+
+def open_store(tmp_path):
+    delta = LogStructuredStore(str(tmp_path / "cache.log"), compaction_interval=0)
+    return SnapshotStore(str(tmp_path / "cache.snap"), delta)
+
+
+def test_convert_json_round_trips_every_entry(tmp_path):
+    json_path = tmp_path / "cache.json"
+    json_path.write_text('{"a": {"insight": "one"}, "b": {"insight": "two"}}')
+
+    assert convert_json(str(json_path), str(tmp_path / "cache.snap")) == 2
+    store = open_store(tmp_path)
+    assert store.get("a") == {"insight": "one"}
+    assert store.get("b") == {"insight": "two"}
+    assert store.get("c") is None
+    store.close()
+
+
+def test_delta_overrides_and_hides_snapshot_entries(tmp_path):
+    write_snapshot(
+        [("a", entry("old a")), ("b", entry("b"))], str(tmp_path / "cache.snap")
+    )
+    store = open_store(tmp_path)
+
+    store.put("a", entry("new a"))
+    store.delete("b")
+    assert store.get("a")["insight"] == "new a"
+    assert store.get("b") is None
+    assert sorted(store.keys()) == ["a"]
+    store.close()
+
+
+def test_merge_folds_the_delta_and_drops_expired_entries(tmp_path):
+    write_snapshot(
+        [("old", entry("old")), ("stale", entry("stale", expires_in=-1))],
+        str(tmp_path / "cache.snap"),
+    )
+    store = open_store(tmp_path)
+    store.put("new", entry("new"))
+    store.put("newest", entry("newest"))
+
+    assert store.merge(max_entries=2) == 2
+    assert len(store.delta) == 0
+    assert store.get("old") is None
+    assert store.get("stale") is None
+    assert store.get("newest")["insight"] == "newest"
+    store.close()
+
+    store = open_store(tmp_path)  # the merged snapshot is what survives
+    assert sorted(store.keys()) == ["new", "newest"]
+    store.close()
+
+
+def test_log_delta_is_capped_by_the_cache_policy(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "CACHE_BACKEND", "snapshot")
+    monkeypatch.setattr(
+        Config, "CACHE_POLICY", {**Config.CACHE_POLICY, "MAX_ENTRIES": 2}
+    )
+    write_snapshot(
+        [(f"snap{i}", entry(f"snap{i}")) for i in range(5)],
+        Config.CACHE_SNAPSHOT["FILE"],
+    )
+
+    cache = Cache()
+    assert not cache.store.manages_capacity
+    for i in range(4):
+        cache.set(f"new{i}", "Leo", f"insight {i}", "en")
+
+    assert sorted(cache.store.delta.keys()) == ["new2", "new3"]
+    assert cache.get("new0") is None
+    assert cache.get("new3")["insight"] == "insight 3"
+    assert cache.get("snap0")["insight"] == "snap0"  # capped by merge instead
+    cache.close()
+
+
+def test_sqlite_delta_manages_capacity_itself(cache_dir, monkeypatch):
+    monkeypatch.setattr(Config, "CACHE_BACKEND", "snapshot")
+    monkeypatch.setattr(
+        Config, "CACHE_SNAPSHOT", {**Config.CACHE_SNAPSHOT, "DELTA": "sqlite"}
+    )
+
+    cache = Cache()
+    assert cache.store.manages_capacity
+    cache.close()
@@ -0,0 +1,99 @@
+import sqlite3
+import time
+
+from src.cache.sqlite_store import SqliteStore
+
+
+def open_store(path, **kwargs):
+    kwargs.setdefault("maintenance_interval", 0)
+    return SqliteStore(str(path), **kwargs)
+
+
+def scan_totals(path, table="entries"):
+    with sqlite3.connect(str(path)) as db:
+        return db.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {table}"
+        ).fetchone()
+
+
+def test_totals_follow_inserts_updates_and_deletes(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    store = open_store(path)
+    store.put("a", {"insight": "one"})
+    store.put("b", {"insight": "two"})
+    store.put("a", {"insight": "a much longer insight"})
+    store.delete_many(["b", "missing"])
+
+    stats = store.stats()
+    assert (stats["entries"], stats["bytes"]) == scan_totals(path)
+    assert len(store) == 1
+    store.close()
+
+
+def test_totals_are_seeded_for_an_existing_table(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    store = open_store(path)
+    store.put("a", {"insight": "one"})
+    store.put("b", {"insight": "two"})
+    store.close()
+    with sqlite3.connect(str(path)) as db:
+        db.execute("DROP TABLE entries_totals")
+
+    store = open_store(path)
+    assert (store.stats()["entries"], store.stats()["bytes"]) == scan_totals(path)
+    store.close()
+
+
+def test_maintain_reaps_expired_rows_then_evicts_least_recently_used(tmp_path):
+    store = open_store(tmp_path / "cache.sqlite3", max_entries=3, touch_interval=0)
+    now = time.time()
+    store.put("expired", {"insight": "x", "expires_at": now - 1})
+    for i in range(5):
+        store.put(f"k{i}", {"insight": f"v{i}", "expires_at": now + 3600})
+    store.get("k0")  # most recently used now
+
+    store.maintain()
+    assert sorted(store.keys()) == ["k0", "k3", "k4"]
+    stats = store.stats()
+    assert stats["expirations"] == 1
+    assert stats["evictions_entries"] == 2
+    assert stats["entries"] == 3
+    store.close()
+
+
+def test_maintain_enforces_the_byte_cap(tmp_path):
+    store = open_store(tmp_path / "cache.sqlite3", max_bytes=100)
+    for i in range(10):
+        store.put(f"k{i}", {"insight": "x" * 20})
+
+    store.maintain()
+    stats = store.stats()
+    assert stats["bytes"] <= 100
+    assert stats["evictions_bytes"] == 10 - stats["entries"]
+    assert "k9" in store.keys()
+    store.close()
+
+
+def test_expiry_lookup_is_indexed(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    open_store(path).close()
+    with sqlite3.connect(str(path)) as db:
+        plan = db.execute(
+            "EXPLAIN QUERY PLAN DELETE FROM entries WHERE expires_at <= 0"
+        ).fetchall()
+    assert "entries_expires_at" in str(plan)
+
+
+def test_background_thread_maintains_the_table(tmp_path):
+    store = open_store(
+        tmp_path / "cache.sqlite3", max_entries=2, maintenance_interval=0.05
+    )
+    for i in range(5):
+        store.put(f"k{i}", {"insight": f"v{i}"})
+
+    deadline = time.monotonic() + 5
+    while len(store) > 2 and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert len(store) == 2
+    store.close()
+    assert not store._maintainer.is_alive()
@@ -0,0 +1,23 @@
+from config.config import Config
+from src.utils.utils import Utils
+
+
+def test_user_key_includes_birth_time_and_timezone_for_exact_signs(monkeypatch):
+    monkeypatch.setitem(Config.ZODIAC, "EXACT", True)
+    assert Utils.user_key("Ritika", "2020-07-22", "08:00", "Asia/Kolkata") != (
+        Utils.user_key("Ritika", "2020-07-22", "23:00", "Asia/Kolkata")
+    )
+    assert Utils.user_key("Ritika", "2020-07-22", "08:00", "Asia/Kolkata") != (
+        Utils.user_key("Ritika", "2020-07-22", "08:00", "America/New_York")
+    )
+    default = Config.ZODIAC["DEFAULT_TIMEZONE"]
+    assert Utils.user_key("Ritika", "2020-07-22", "08:00") == (
+        Utils.user_key("Ritika", "2020-07-22", "08:00", default)
+    )
+
+
+def test_user_key_is_name_and_date_for_calendar_signs(monkeypatch):
+    monkeypatch.setitem(Config.ZODIAC, "EXACT", False)
+    assert Utils.user_key("Ritika", "2020-07-22", "08:00", "Asia/Kolkata") == (
+        "Ritika_2020-07-22"
+    )
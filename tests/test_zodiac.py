@@ -0,0 +1,11 @@
+from src.utils.utils import Utils
+from src.zodiac.zodiac import Zodiac
+
+
+def test_exact_sign_outside_ingress_table_uses_local_birth_date():
+    # 00:30 in Kolkata is still 20 March in UTC, the last day of Pisces.
+    instant = Utils.birth_instant("1850-03-21", "00:30", "Asia/Kolkata")
+    assert Zodiac.get_zodiac_exact(instant, "1850-03-21") == "Aries"
+    assert Zodiac.get_zodiac_exact(instant, "1850-03-21") == (
+        Zodiac.get_zodiac("1850-03-21")
+    )
@@ -0,0 +1,56 @@
+"""
+wsgi.py
+
+WSGI entry point for running the Astro Insight Generator under an external
+WSGI server, e.g.:
+
+    gunicorn --preload --workers 4 --threads 4 --worker-class gthread wsgi:app
+
+Builds the application once at import time (in the gunicorn master when
+``--preload`` is given). Use the "sqlite" cache backend when running more
+than one worker process; see `src/interface/server.py`. Like the built-in
+production server, importing this module refuses a cache backend private to
+each process when several workers will be forked.
+"""
+
+import argparse
+import os
+import shlex
+import sys
+
+from config.config import Config
+from src.interface.ui_main import UIStarter
+
+
+def worker_count() -> int:
+    """
+    Returns
+    -------
+    int
+        Worker processes the WSGI server will fork: ``-w`` / ``--workers``
+        from gunicorn's command line or ``GUNICORN_CMD_ARGS`` (the command line
+        wins), else ``WEB_CONCURRENCY``, else gunicorn's default of 1 when
+        started by gunicorn and `Config.SERVER["WORKERS"]` otherwise.
+    """
+
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument("-w", "--workers", type=int)
+    args = shlex.split(os.environ.get("GUNICORN_CMD_ARGS", "")) + sys.argv[1:]
+    workers = parser.parse_known_args(args)[0].workers
+    if workers is not None:
+        return workers
+    if os.environ.get("WEB_CONCURRENCY"):
+        return int(os.environ["WEB_CONCURRENCY"])
+    if "gunicorn" in os.path.basename(sys.argv[0]):
+        return 1
+    return Config.SERVER["WORKERS"]
+
+
+workers = worker_count()
+if workers > 1:
+    # Imported here: gunicorn is POSIX-only and unused by single-process servers.
+    from src.interface.server import ProductionServer
+
+    ProductionServer.check_cache_backend(workers)
+
+app = UIStarter().ui_interface.app